@@ -6,13 +6,21 @@ from PIL import Image, ImageTk
 import cv2
 import os
 import numpy as np
-from keras.models import model_from_json
-import operator
 import difflib
 from string import ascii_uppercase
 import threading
 import time
+from collections import OrderedDict
 import config
+from image_processing import roi_box
+from backends import TFLiteModel, ConcatModel, fuse_keras_models, load_keras_model
+import numpy_engine
+from pipeline import FrameGrabber, InferenceWorker, RateCounter, ChangeGate
+from metrics import Metrics, MetricsFileWriter, MetricsServer, Stopwatch
+from blank_detector import load_detector
+from temporal import TemporalAggregator, SYMBOLS
+from beam_decoder import BeamDecoder
+from word_index import PrefixIndex, FuzzyIndex, edit_distance, file_digest, words_digest, save_compiled, load_compiled
 
 # Optional: enchant dictionary for better suggestions
 try:
@@ -23,7 +31,8 @@ except Exception:
 
 # Optional: wordfreq for a large high-quality frequency list
 try:
-    from wordfreq import top_n_list
+    from wordfreq import top_n_list, get_frequency_dict
+    from importlib.metadata import version as _package_version
     WORDFREQ_AVAILABLE = True
 except Exception:
     WORDFREQ_AVAILABLE = False
@@ -40,7 +49,8 @@ FALLBACK_WORDS = [
     'day', 'most', 'us', 'hello', 'world', 'thanks', 'bye', 'yes', 'no', 'please'
 ]
 
-# Frequency map to bias ranking (extend if required)
+# Frequency map (roughly occurrences per million words) used when the wordlist source
+# carries no frequencies of its own
 WORD_FREQ = {
     'the': 10000, 'be': 8000, 'to': 8000, 'of': 7600, 'and': 7500, 'a': 7400,
     'in': 7200, 'that': 4800, 'have': 4600, 'i': 4500, 'it': 4400, 'for': 4300,
@@ -55,75 +65,210 @@ for _w in FALLBACK_WORDS:
 
 # How many suggestion buttons to display
 SUGGESTION_COUNT = 8
+# How many prefix / substring matches are handed to the ranker
+SUGGESTION_POOL_SIZE = 50
+# Largest edit distance for fuzzy (misspelling) candidates
+FUZZY_MAX_DISTANCE = 2
+# How many prefixes keep their suggestions cached
+SUGGESTION_CACHE_SIZE = 256
+
+
+# Positions of D, R and U in the main model's outputs
+DRU_INDEX = [SYMBOLS.index(c) for c in 'DRU']
+BLANK_PROBA = np.eye(len(SYMBOLS), dtype=np.float32)[0]
 
 
 class SignLanguagePredictor:
-    def __init__(self, model_dir=config.MODEL_DIR):
+    def __init__(self, model_dir=config.MODEL_DIR, backend=config.PREDICTOR_BACKEND,
+                 num_threads=config.TFLITE_NUM_THREADS, blank_detector=config.BLANK_DETECTOR_ENABLED,
+                 confirm=config.CONFIRM_MODE, confirm_frames=config.CONFIRM_FRAMES, hold_ms=config.CONFIRM_HOLD_MS):
         self.model_dir = model_dir
+        self.backend = backend
+        self.num_threads = num_threads
+        self.confirm = confirm
+        self.confirm_frames = confirm_frames
+        self.hold_ms = hold_ms
         self.loaded_model = None
         self.loaded_model_dru = None
+        # One call returns the 27 main-model outputs followed by the D/R/U outputs
+        self.fused_model = None
+        # Model input tensor and resize buffer, reused from frame to frame
+        self._input = None
+        self._resized = None
+        # Optional metrics.Metrics: predict_batch then records its preprocess/model/decode times
+        self.metrics = None
+        # Obvious blanks are answered without the model (blank_detector.py); None runs the model on everything
+        self.blank_detector = load_detector() if blank_detector is True else (blank_detector or None)
         self._load_models()
-        self.ct = {char: 0 for char in list(ascii_uppercase) + ['blank']}
-        self.history = []
-        self.char_accepted_flag = False
+        # Models trained at another resolution (e.g. a distilled student) bring their own input size
+        input_shape = getattr(self.fused_model, 'input_shape', None)
+        self.input_size = int(input_shape[1]) if input_shape and input_shape[1] else config.IMG_SIZE
+        self.reset_state()
         
     def _load_models(self):
-        def load_single_model(json_path, weights_path):
-            if not os.path.exists(json_path) or not os.path.exists(weights_path):
-                raise FileNotFoundError(f"Missing model files: {json_path} or {weights_path}")
-            with open(json_path, 'r') as jf:
-                model_json = jf.read()
-            model = model_from_json(model_json)
-            model.load_weights(weights_path)
-            return model
+        def load_tflite_model(path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Missing model file: {path} (run export_tflite.py)")
+            return TFLiteModel(path, num_threads=self.num_threads)
 
         try:
-            self.loaded_model = load_single_model(config.MODEL_BW_JSON, config.MODEL_BW_H5)
-            self.loaded_model_dru = load_single_model(config.MODEL_BW_DRU_JSON, config.MODEL_BW_DRU_H5)
-            print("All models loaded successfully.")
+            if self.backend == 'keras':
+                self.loaded_model = load_keras_model(config.MODEL_BW_JSON, config.MODEL_BW_H5)
+                self.loaded_model_dru = load_keras_model(config.MODEL_BW_DRU_JSON, config.MODEL_BW_DRU_H5)
+                self.fused_model = fuse_keras_models([self.loaded_model, self.loaded_model_dru])
+            elif self.backend == 'numpy':
+                self.loaded_model = numpy_engine.load_model(
+                    config.MODEL_BW_NPZ, config.MODEL_BW_JSON, config.MODEL_BW_H5)
+                self.loaded_model_dru = numpy_engine.load_model(
+                    config.MODEL_BW_DRU_NPZ, config.MODEL_BW_DRU_JSON, config.MODEL_BW_DRU_H5)
+                self.fused_model = numpy_engine.FusedModel([self.loaded_model, self.loaded_model_dru])
+            elif self.backend in ('tflite', 'tflite_int8'):
+                if self.backend == 'tflite':
+                    paths = config.MODEL_FUSED_TFLITE, config.MODEL_BW_TFLITE, config.MODEL_BW_DRU_TFLITE
+                else:
+                    paths = config.MODEL_FUSED_INT8_TFLITE, config.MODEL_BW_INT8_TFLITE, config.MODEL_BW_DRU_INT8_TFLITE
+                fused_path, main_path, dru_path = paths
+                if os.path.exists(fused_path):
+                    self.fused_model = load_tflite_model(fused_path)
+                else:
+                    print(f"{fused_path} not found, running the two TFLite models back to back")
+                    self.loaded_model = load_tflite_model(main_path)
+                    self.loaded_model_dru = load_tflite_model(dru_path)
+                    self.fused_model = ConcatModel([self.loaded_model, self.loaded_model_dru])
+            else:
+                raise ValueError(f"Unknown predictor backend: {self.backend}")
+            print(f"All models loaded successfully ({self.backend} backend).")
         except Exception as e:
             print(f"FATAL: Model loading failed. Error: {e}")
             # We might want to handle this gracefully in UI, but for now raise
             raise
 
-    def predict(self, test_image):
+    def predict(self, test_image, with_proba=False):
         if test_image is None or getattr(test_image, "size", 0) == 0:
-            return None, 0.0
-
-        test_image = cv2.resize(test_image, (config.IMG_SIZE, config.IMG_SIZE))
-        arr = test_image.reshape(1, config.IMG_SIZE, config.IMG_SIZE, 1).astype('float32') / 255.0
+            return (None, 0.0, None) if with_proba else (None, 0.0)
+        return self.predict_batch([test_image], with_proba)[0]
 
-        result = self.loaded_model.predict(arr, verbose=0)
-        prediction = {ascii_uppercase[i]: float(result[0][i + 1]) for i in range(26)}
-        prediction['blank'] = float(result[0][0])
+    def predict_batch(self, images, with_proba=False):
+        """(symbol, prob) for each thresholded ROI, with one model call for the whole batch.
 
-        prediction_sorted = sorted(prediction.items(), key=operator.itemgetter(1), reverse=True)
-        top_symbol = prediction_sorted[0][0]
-        top_prob = prediction_sorted[0][1]
-
-        if top_symbol in ('D', 'R', 'U'):
-            result_dru = self.loaded_model_dru.predict(arr, verbose=0)
-            pred2 = {'D': float(result_dru[0][0]), 'R': float(result_dru[0][1]), 'U': float(result_dru[0][2])}
-            top_symbol = max(pred2, key=pred2.get)
-            top_prob = pred2[top_symbol]
-
-        return top_symbol, top_prob
+        with_proba=True appends each ROI's probability vector over temporal.SYMBOLS, the input
+        of the time-based confirmation.
+        """
+        if not images:
+            return []
+        if self.blank_detector is None:
+            return self._predict_model(images, with_proba)
+        watch = Stopwatch()
+        blank = self.blank_detector.blank_mask(images)
+        watch.lap(self.metrics, 'predict.blank_check')
+        hands = [i for i, is_blank in enumerate(blank) if not is_blank]
+        if self.metrics is not None and len(hands) < len(images):
+            self.metrics.increment('blank_early_exits', len(images) - len(hands))
+        results = [('blank', 1.0, BLANK_PROBA) if with_proba else ('blank', 1.0)] * len(images)
+        if hands:
+            for i, result in zip(hands, self._predict_model([images[i] for i in hands], with_proba)):
+                results[i] = result
+        return results
+
+    def _model_input(self, images):
+        """The reused float32 input tensor, filled with the resized images scaled to [0, 1]."""
+        size, n = self.input_size, len(images)
+        if self._input is None or len(self._input) < n:
+            self._input = np.empty((n, size, size, 1), dtype=np.float32)
+            self._resized = np.empty((size, size), dtype=np.uint8)
+        arr = self._input[:n]
+        for i, img in enumerate(images):
+            if img.shape[:2] != (size, size):
+                img = cv2.resize(img, (size, size), dst=self._resized)
+            arr[i, :, :, 0] = img
+        np.divide(arr, 255.0, out=arr)
+        return arr
+
+    def _predict_model(self, images, with_proba=False):
+        watch = Stopwatch()
+        arr = self._model_input(images)
+        watch.lap(self.metrics, 'predict.preprocess')
+
+        # Both heads come out of one call, so a D/R/U frame costs the same as any other
+        outputs = np.asarray(self.fused_model.predict(arr, verbose=0))
+        watch.lap(self.metrics, 'predict.model')
+        decoded = [self._decode(output) for output in outputs]
+        if with_proba:
+            decoded = [d + (p,) for d, p in zip(decoded, self._probabilities(outputs))]
+        watch.lap(self.metrics, 'predict.decode')
+        return decoded
+
+    @staticmethod
+    def _probabilities(outputs):
+        """Main-model outputs with D/R/U split by the second model, ranked the same way as _decode.
+
+        The D/R/U entries become the best of the three main-model scores, scaled by the second
+        model's relative confidence, so the argmax is always the symbol _decode picks.
+        """
+        proba = outputs[:, :27].copy()
+        dru = outputs[:, 27:30]
+        best = proba[:, DRU_INDEX].max(axis=1, keepdims=True)
+        proba[:, DRU_INDEX] = best * dru / np.maximum(dru.max(axis=1, keepdims=True), 1e-12)
+        return proba
+
+    @staticmethod
+    def _decode(output):
+        # Top class straight from the output row; on a tie a letter beats blank, as it always has
+        top = int(np.argmax(output[1:27])) + 1
+        if output[0] > output[top]:
+            top = 0
+        if top in DRU_INDEX:
+            j = int(np.argmax(output[27:30]))
+            return 'DRU'[j], float(output[27 + j])
+        return SYMBOLS[top], float(output[top])
+
+    def reset_state(self):
+        """Forget the debouncing counters and letter history, e.g. between recordings."""
+        self.ct = {char: 0 for char in list(ascii_uppercase) + ['blank']}
+        self.history = []
+        self.char_accepted_flag = False
+        self.aggregator = TemporalAggregator(hold_ms=self.hold_ms) if self.confirm == 'time' else None
+        # Probability vector behind the last confirmed letter, for beam_decoder.py
+        self.letter_evidence = None
+        # Frame counting: summed probability vectors since the last blank
+        self._run_evidence = np.zeros(len(SYMBOLS), dtype=np.float32)
+        self._run_frames = 0
+
+    def process_prediction(self, top_symbol, proba=None, timestamp=None):
+        """Letter confirmed by this frame, or None.
+
+        With CONFIRM_MODE 'time' and a probability vector from predict(..., with_proba=True),
+        confirmation is based on time (temporal.TemporalAggregator); timestamp defaults to
+        time.monotonic(). Otherwise a letter needs confirm_frames frames in a row, and the
+        probability vectors passed along are summed into letter_evidence.
+        """
+        if self.aggregator is not None and proba is not None:
+            symbol = self.aggregator.update(proba, time.monotonic() if timestamp is None else timestamp)
+            if symbol is None or (self.history and self.history[-1] == symbol):
+                return None
+            self.history.append(symbol)
+            self.letter_evidence = self.aggregator.confirmed_evidence
+            return symbol
 
-    def process_prediction(self, top_symbol):
-        THRESHOLD_COUNT = 15
         confirmed_char = None
         
         if top_symbol != 'blank':
             self.ct[top_symbol] += 1
-            if self.ct[top_symbol] > THRESHOLD_COUNT and not self.char_accepted_flag:
+            if proba is not None:
+                np.add(self._run_evidence, proba, out=self._run_evidence)
+                self._run_frames += 1
+            if self.ct[top_symbol] > self.confirm_frames and not self.char_accepted_flag:
                 if len(self.history) == 0 or self.history[-1] != top_symbol:
                     confirmed_char = top_symbol
                     self.history.append(top_symbol)
+                    self.letter_evidence = self._run_evidence / self._run_frames if self._run_frames else None
                 self.char_accepted_flag = True
         else:
             for char in self.ct:
                 self.ct[char] = 0
             self.char_accepted_flag = False
+            self._run_evidence.fill(0)
+            self._run_frames = 0
             
         return confirmed_char
 
@@ -133,6 +278,15 @@ class SuggestionEngine:
         self.model_dir = model_dir
         self.suggestion_engine = None
         self.wordlist = []
+        self.freqs = None    # np.float32 per word id, occurrences per million
+        self.lengths = None  # np.int32 per word id
+        self.index = None
+        self.fuzzy = None
+        # prefix -> (suggestions, every prefix-match id or None when the match set was truncated)
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.refinements = 0
         self._init_backend()
 
     def _init_backend(self):
@@ -145,13 +299,17 @@ class SuggestionEngine:
                 self.suggestion_engine = None
 
         candidate_wordlist = None
+        candidate_freqs = None  # word -> occurrences per million, when the source has them
+        source_key = None
 
         # 1) custom wordlist in model dir
         wl_path = os.path.join(self.model_dir, 'wordlist.txt')
         if os.path.exists(wl_path):
+            source_key = file_digest(wl_path)
+            if self._load_compiled(source_key):
+                return
             try:
-                with open(wl_path, 'r', encoding='utf-8') as f:
-                    candidate_wordlist = [w.strip().lower() for w in f if w.strip()]
+                candidate_wordlist, candidate_freqs = self._read_custom_wordlist(wl_path)
                 print(f"Loaded custom wordlist from {wl_path} ({len(candidate_wordlist)} words).")
             except Exception as e:
                 print(f"Failed to read {wl_path}: {e}")
@@ -159,6 +317,12 @@ class SuggestionEngine:
 
         # 2) wordfreq
         if candidate_wordlist is None and WORDFREQ_AVAILABLE:
+            try:
+                source_key = f"wordfreq-{_package_version('wordfreq')}"
+            except Exception:
+                source_key = "wordfreq"
+            if self._load_compiled(source_key):
+                return
             try:
                 wf = top_n_list("en", n_top=100000) # Increased to 100k
                 if wf:
@@ -171,12 +335,20 @@ class SuggestionEngine:
                     print(f"Built wordlist from wordfreq (size {len(candidate_wordlist)}).")
                 except Exception:
                     candidate_wordlist = None
+            if candidate_wordlist is not None:
+                try:
+                    candidate_freqs = {w.lower(): f * 1e6 for w, f in get_frequency_dict("en").items()}
+                except Exception as e:
+                    print(f"Couldn't read wordfreq frequencies: {e}")
 
         # 3) system dict
         if candidate_wordlist is None:
             system_paths = ['/usr/share/dict/words', '/usr/dict/words', '/usr/dict/web2', '/usr/dict/web2a']
             for p in system_paths:
                 if os.path.exists(p):
+                    source_key = file_digest(p)
+                    if self._load_compiled(source_key):
+                        return
                     try:
                         with open(p, 'r', encoding='utf-8', errors='ignore') as f:
                             candidate_wordlist = [w.strip().lower() for w in f if w.strip() and w.strip().isalpha()]
@@ -285,6 +457,9 @@ class SuggestionEngine:
                 'writer', 'wrong', 'yard', 'yeah', 'year', 'yes', 'yet', 'you', 'young', 'your', 'yourself'
             ]
             candidate_wordlist = [w.lower() for w in FALLBACK_WORDS + EXTRA_FALLBACK]
+            source_key = words_digest(candidate_wordlist)
+            if self._load_compiled(source_key):
+                return
             print("Using fallback expanded wordlist.")
 
         # deduplicate & keep reasonable size
@@ -292,13 +467,110 @@ class SuggestionEngine:
         if len(unique_words) > 100000:
             unique_words = unique_words[:100000]
         self.wordlist = sorted(unique_words)
+
+        self.freqs = np.array(
+            [(candidate_freqs or {}).get(w) or WORD_FREQ.get(w, 1) for w in self.wordlist], dtype=np.float32)
+        self.lengths = np.array([len(w) for w in self.wordlist], dtype=np.int32)
+
+        # Rank by frequency, then by source order (wordfreq lists are most-common first)
+        source_rank = {w: i for i, w in enumerate(unique_words)}
+        order = np.lexsort((np.array([source_rank[w] for w in self.wordlist]), -self.freqs))
+        ranks = np.empty(len(order), dtype=np.int32)
+        ranks[order] = np.arange(len(order), dtype=np.int32)
+        self.index = PrefixIndex(self.wordlist, ranks, top_k=SUGGESTION_POOL_SIZE)
+        self.fuzzy = FuzzyIndex(self.wordlist, ranks, max_distance=FUZZY_MAX_DISTANCE)
+
+        # Compile to disk and switch to the memory-mapped copy so the word strings can be freed
+        try:
+            save_compiled(self._compiled_dir(), source_key, self.wordlist, ranks, self.freqs, self.index, self.fuzzy)
+            self._load_compiled(source_key)
+        except Exception as e:
+            print(f"Couldn't write compiled wordlist to {self._compiled_dir()}: {e}")
         print(f"Suggestion backend ready. Wordlist size: {len(self.wordlist)}")
 
+    @staticmethod
+    def _read_custom_wordlist(path):
+        """One word per line, optionally followed by a count: 'hello 1234'."""
+        words = []
+        counts = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                w = parts[0].lower()
+                words.append(w)
+                if len(parts) > 1:
+                    try:
+                        counts.setdefault(w, float(parts[1]))
+                    except ValueError:
+                        pass
+        if not counts:
+            return words, None
+        total = sum(counts.values()) or 1.0
+        return words, {w: c * 1e6 / total for w, c in counts.items()}
+
+    def _compiled_dir(self):
+        return os.path.join(self.model_dir, 'wordlist_cache')
+
+    def _load_compiled(self, source_key):
+        compiled = load_compiled(self._compiled_dir(), source_key, SUGGESTION_POOL_SIZE, FUZZY_MAX_DISTANCE)
+        if compiled is None:
+            return False
+        self.wordlist = compiled.words
+        self.freqs = compiled.freqs
+        self.lengths = compiled.lengths
+        self.index = compiled.index
+        self.fuzzy = compiled.fuzzy
+        print(f"Loaded compiled wordlist from {self._compiled_dir()} ({len(self.wordlist)} words).")
+        return True
+
     def get_suggestions(self, prefix):
+        prefix = prefix.strip().lower() if prefix else ""
         if not prefix:
             return []
-            
-        prefix = prefix.lower()
+
+        cached = self._cache.get(prefix)
+        if cached is not None:
+            self._cache.move_to_end(prefix)
+            self.cache_hits += 1
+            return list(cached[0])
+
+        self.cache_misses += 1
+        prefix_ids, complete_ids = self._prefix_ids(prefix)
+        suggestions = self._compute_suggestions(prefix, prefix_ids)
+
+        self._cache[prefix] = (suggestions, complete_ids)
+        if len(self._cache) > SUGGESTION_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return list(suggestions)
+
+    def cache_stats(self):
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'refinements': self.refinements,
+            'size': len(self._cache),
+        }
+
+    def _prefix_ids(self, prefix):
+        # When the word grew by one letter and the parent prefix's full match set is cached,
+        # filter that instead of going back to the index.
+        parent = self._cache.get(prefix[:-1]) if len(prefix) > 1 else None
+        if parent is not None and parent[1] is not None:
+            self.refinements += 1
+            ids = [i for i in parent[1] if self.wordlist[i].startswith(prefix)]
+            return ids, ids
+
+        lo, hi = self.index.prefix_range(prefix)
+        ids = self.index.prefix_ids(prefix)
+        return ids, (ids if hi - lo <= len(ids) else None)
+
+    def _word_id(self, word):
+        lo, hi = self.index.prefix_range(word)
+        return lo if lo < hi and self.wordlist[lo] == word else None
+
+    def _compute_suggestions(self, prefix, prefix_ids):
         enchant_candidates = []
         if self.suggestion_engine is not None:
             try:
@@ -306,62 +578,171 @@ class SuggestionEngine:
             except Exception:
                 enchant_candidates = []
 
-        prefix_matches = [w for w in self.wordlist if w.startswith(prefix)]
-        fuzzy_candidates = difflib.get_close_matches(prefix, self.wordlist, n=50, cutoff=0.6)
-
-        candidates = []
-        for src in (prefix_matches, enchant_candidates, fuzzy_candidates):
-            for w in src:
-                if w not in candidates:
-                    candidates.append(w)
-
-        if len(candidates) < SUGGESTION_COUNT:
-            contains = [w for w in self.wordlist if prefix in w and w not in candidates]
-            candidates.extend(contains)
-
-        if len(candidates) < SUGGESTION_COUNT and len(prefix) <= 2:
-            extras = [w for w in self.wordlist if w.startswith(prefix[:1]) and w not in candidates]
-            candidates.extend(extras)
-
-        return self._rank_candidates(prefix, candidates)
-
-    def _rank_candidates(self, prefix, candidates, max_results=SUGGESTION_COUNT):
-        scored = []
-        for w in candidates:
-            lw = w.lower()
-            score = 0.0
-            if lw.startswith(prefix):
-                score += 100.0
-                score += len(prefix) * 1.0
-            if prefix in lw:
-                score += 10.0
-            ratio = difflib.SequenceMatcher(None, prefix, lw).ratio()
-            score += ratio * 20.0
-            freq = WORD_FREQ.get(lw, 1)
-            score += min(50.0, (freq ** 0.5) / 2.0)
-            scored.append((score, lw))
-
-        scored.sort(key=operator.itemgetter(0), reverse=True)
-        result = []
-        for s, w in scored:
-            if w not in result:
-                result.append(w)
-            if len(result) >= max_results:
-                break
-        return result
+        # Candidates by how they relate to prefix: substring matches, (id, edit distance) pairs,
+        # first-letter extras, and enchant words that aren't in the wordlist
+        substring_ids = list(prefix_ids)
+        seen = set(substring_ids)
+        fuzzy = []
+        unknown = []
+        for w in enchant_candidates:
+            i = self._word_id(w)
+            if i is None:
+                if w not in unknown:
+                    unknown.append(w)
+            elif i not in seen:
+                seen.add(i)
+                fuzzy.append((i, edit_distance(prefix, w, max(len(prefix), len(w)))))
+        for i, d in self.fuzzy.lookup(prefix, k=SUGGESTION_POOL_SIZE):
+            if i not in seen:
+                seen.add(i)
+                fuzzy.append((i, d))
+
+        extra_ids = []
+        if len(seen) + len(unknown) < SUGGESTION_COUNT:
+            contains = self.index.contains_ids(prefix, exclude=seen)
+            substring_ids.extend(contains)
+            seen.update(contains)
+
+        if len(seen) + len(unknown) < SUGGESTION_COUNT and len(prefix) <= 2:
+            extra_ids = [i for i in self.index.prefix_ids(prefix[:1]) if i not in seen]
+
+        return self._rank_candidates(prefix, substring_ids, fuzzy, extra_ids, unknown)
+
+    def _rank_candidates(self, prefix, substring_ids, fuzzy, extra_ids, unknown=(), max_results=SUGGESTION_COUNT):
+        lp = len(prefix)
+        fuzzy_ids = [i for i, _ in fuzzy]
+        ids = np.array(substring_ids + fuzzy_ids + extra_ids, dtype=np.int64)
+        lengths = self.lengths[ids].astype(np.float32)
+        freqs = self.freqs[ids]
+
+        # Matching characters between prefix and word, standing in for SequenceMatcher:
+        # all of prefix for substring matches, longer length minus edit distance for fuzzy ones,
+        # just the first letter for extras.
+        n_sub, n_fuzzy = len(substring_ids), len(fuzzy_ids)
+        matched = np.ones(len(ids), dtype=np.float32)
+        matched[:n_sub] = lp
+        matched[n_sub:n_sub + n_fuzzy] = (np.maximum(lengths[n_sub:n_sub + n_fuzzy], lp)
+                                          - np.array([d for _, d in fuzzy], dtype=np.float32))
+        lo, hi = self.index.prefix_range(prefix)
+        starts = (ids >= lo) & (ids < hi)
+        contains = np.zeros(len(ids), dtype=bool)
+        contains[:n_sub] = True
+        contains[n_sub:] = [prefix in self.wordlist[i] for i in ids[n_sub:].tolist()]
+
+        if unknown:
+            extra_lengths = np.array([len(w) for w in unknown], dtype=np.float32)
+            ratios = np.array([difflib.SequenceMatcher(None, prefix, w).ratio() for w in unknown], dtype=np.float32)
+            lengths = np.concatenate([lengths, extra_lengths])
+            freqs = np.concatenate([freqs, np.array([WORD_FREQ.get(w, 1) for w in unknown], dtype=np.float32)])
+            matched = np.concatenate([matched, ratios * (lp + extra_lengths) / 2.0])
+            starts = np.concatenate([starts, [w.startswith(prefix) for w in unknown]])
+            contains = np.concatenate([contains, [prefix in w for w in unknown]])
+
+        ratio = 2.0 * matched / (lp + lengths)
+        scores = (starts * (100.0 + lp) + contains * 10.0 + ratio * 20.0
+                  + np.minimum(50.0, np.sqrt(freqs) / 2.0))
+
+        if len(scores) > max_results:
+            top = np.argpartition(-scores, max_results)[:max_results]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        n_ids = len(ids)
+        return [self.wordlist[int(ids[j])] if j < n_ids else unknown[j - n_ids] for j in top.tolist()]
+
+
+class SuggestionWorker:
+    """Runs SuggestionEngine queries on a background thread.
+
+    Only the newest requested word is kept: a request that arrives while another is being
+    computed replaces anything still waiting, and results for superseded words are dropped
+    instead of being delivered. on_result(word, suggestions) is called from the worker thread.
+    """
+
+    def __init__(self, engine, on_result):
+        self.engine = engine
+        self.on_result = on_result
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._served = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="suggestions", daemon=True)
+        self._thread.start()
+
+    def request(self, word):
+        with self._cond:
+            if self._generation > self._served:
+                self.dropped += 1
+            self._pending = word
+            self._generation += 1
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._generation == self._served:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                word = self._pending
+                generation = self._served = self._generation
+
+            try:
+                suggestions = self.engine.get_suggestions(word) if word else []
+            except Exception as e:
+                print(f"Suggestion lookup failed for '{word}': {e}")
+                suggestions = []
+
+            with self._cond:
+                if generation != self._generation:
+                    self.dropped += 1
+                    continue
+            self.on_result(word, suggestions)
 
 
 class Application:
     def __init__(self):
-        self.predictor = SignLanguagePredictor()
+        self.metrics = Metrics(config.METRICS_WINDOW)
+        if config.BEAM_DECODER_ENABLED:
+            # The decoder corrects the mix-ups that come with shorter holds
+            print(f"Beam decoder on: letters need {config.BEAM_CONFIRM_FRAMES} frames "
+                  f"({config.BEAM_CONFIRM_HOLD_MS} ms in 'time' mode).")
+            self.predictor = SignLanguagePredictor(confirm_frames=config.BEAM_CONFIRM_FRAMES,
+                                                   hold_ms=config.BEAM_CONFIRM_HOLD_MS)
+        else:
+            self.predictor = SignLanguagePredictor()
+        self.predictor.metrics = self.metrics
         self.suggester = SuggestionEngine()
+        self.suggestion_worker = SuggestionWorker(self.suggester, self._post_suggestions)
+        # Spells the current word from the letters' probabilities and the wordlist, when on
+        self.decoder = BeamDecoder.from_engine(self.suggester) if config.BEAM_DECODER_ENABLED else None
         
         self.vs = cv2.VideoCapture(0)
+        self.grabber = FrameGrabber(self.vs, metrics=self.metrics)
+        self.gate = ChangeGate() if config.GATE_ENABLED else None
+        self.inference = InferenceWorker(self.grabber, self.predictor, metrics=self.metrics, gate=self.gate)
+        self.display_rate = RateCounter()
+        self._shown_frame_id = 0
+        self._rgba = None
+        self.show_metrics = False
+        self._start_metrics_export()
         
         self.sentence = ""
         self.word = ""
+        # Whole word the decoder would commit instead of self.word, or ""
+        self.commit_hint = ""
         self.current_symbol = "..."
         self.confidence = 0.0
+        self._suggested_word = None
+        self._shown_suggestions = None
         
         # UI
         self._setup_tk_root()
@@ -371,8 +752,28 @@ class Application:
         self.root.after(200, self._load_and_display_signs_image)
         
         # start
+        self.grabber.start()
+        self.inference.start()
         self.video_loop()
 
+    def _start_metrics_export(self):
+        self.metrics.gauge('camera_fps', self.grabber.rate.rate)
+        self.metrics.gauge('inference_fps', self.inference.rate.rate)
+        self.metrics.gauge('display_fps', self.display_rate.rate)
+        self.metrics.gauge('skipped_frames', lambda: self.inference.skipped_frames)
+        self.metrics_writer = None
+        self.metrics_server = None
+        if config.METRICS_FILE:
+            self.metrics_writer = MetricsFileWriter(self.metrics, config.METRICS_FILE,
+                                                    config.METRICS_EXPORT_INTERVAL).start()
+            print(f"Writing metrics to {config.METRICS_FILE}")
+        if config.METRICS_PORT:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, config.METRICS_PORT).start()
+                print(f"Serving metrics on http://127.0.0.1:{self.metrics_server.port}/metrics")
+            except OSError as e:
+                print(f"Could not start the metrics server: {e}")
+
     def _setup_tk_root(self):
         self.root = tk.Tk()
         self.root.title(config.WINDOW_TITLE)
@@ -487,6 +888,7 @@ class Application:
         self.root.bind('<space>', self._commit_word)
         self.root.bind('<BackSpace>', self._delete_char)
         self.root.bind('c', self._clear_sentence)
+        self.root.bind('m', self._toggle_metrics)
         self.root.bind('<Escape>', lambda e: self.destructor())
 
     def _load_and_display_signs_image(self):
@@ -515,87 +917,140 @@ class Application:
             print("Warning: 'signs.png' not found.")
 
     def _commit_word(self, event=None):
+        # The decoder's whole-word choice is on the label as the commit hint, so it is no surprise
+        if self.commit_hint:
+            self.word = self.commit_hint
+        self.commit_hint = ""
+        if self.decoder is not None:
+            self.decoder.reset()
         if self.word:
             self.sentence += (" " if self.sentence else "") + self.word
             self.word = ""
             self._update_text_labels()
 
+    def _spell_from_decoder(self):
+        """Show the best spelling so far, and the whole word [Space] would commit if it differs."""
+        self.word = self.decoder.best_prefix().upper()
+        hint = self.decoder.best_word().upper() if self.decoder.letters else ""
+        self.commit_hint = hint if hint != self.word else ""
+
     def _delete_char(self, event=None):
         if self.word:
-            self.word = self.word[:-1]
+            if self.decoder is not None and self.decoder.letters:
+                self.decoder.pop_letter()
+                self._spell_from_decoder()
+            else:
+                self.word = self.word[:-1]
             self._update_text_labels()
 
     def _clear_sentence(self, event=None):
         self.sentence = ""
         self.word = ""
+        self.commit_hint = ""
+        if self.decoder is not None:
+            self.decoder.reset()
+        self.inference.reset()
         self._update_text_labels()
 
+    def _toggle_metrics(self, event=None):
+        self.show_metrics = not self.show_metrics
+
     def _use_suggestion(self, idx):
         text = self.suggestion_buttons[idx].cget('text')
         if not text:
             return
         chosen = text.strip().upper()
+        if self.decoder is not None:
+            self.decoder.reset()
         self.word = chosen
+        self.commit_hint = ""
         self._commit_word()
 
     def video_loop(self):
-        ok, frame = self.vs.read()
-        if not ok:
+        # Capture and inference run on their own threads; this only renders what they produced
+        if self.grabber.failed:
             print("Camera feed lost.")
             self.destructor()
             return
+        if self.inference.error is not None:
+            self.destructor()
+            return
 
-        frame = cv2.flip(frame, 1)
-        height, width, _ = frame.shape
-        roi_size = int(min(height, width) * 0.4)
-        x1 = width - roi_size - 20
-        y1 = 20
-        x2 = width - 20
-        y2 = y1 + roi_size
-
-        cv2.rectangle(frame, (x1 - 1, y1 - 1), (x2 + 1, y2 + 1), (0, 230, 118), 2)
-
-        img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.panel.imgtk = imgtk
-        self.panel.config(image=imgtk)
-
-        roi = frame[y1:y2, x1:x2]
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        blur = cv2.GaussianBlur(gray, (5, 5), 2)
-        th3 = cv2.adaptiveThreshold(blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
-        _, processed_roi = cv2.threshold(th3, config.MIN_VALUE, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-
-        # Predict
-        top_symbol, top_prob = self.predictor.predict(processed_roi)
-        self.current_symbol = top_symbol
-        self.confidence = top_prob
-        
-        # Process prediction (accumulate history, etc.)
-        confirmed_char = self.predictor.process_prediction(top_symbol)
-        if confirmed_char:
-            self.word += confirmed_char
+        watch = Stopwatch()
+        frame_id, frame = self.grabber.latest()
+        if frame is not None and frame_id != self._shown_frame_id:
+            self._shown_frame_id = frame_id
+            x1, y1, x2, y2 = roi_box(frame.shape)
+            # Draw on the RGBA copy so the shared frame the inference thread reads stays untouched.
+            # RGBA (not RGB) lets PIL wrap the buffer without copying it.
+            if self._rgba is None or self._rgba.shape[:2] != frame.shape[:2]:
+                self._rgba = np.empty(frame.shape[:2] + (4,), dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+            self.grabber.release(frame)
+            cv2.rectangle(self._rgba, (x1 - 1, y1 - 1), (x2 + 1, y2 + 1), (118, 230, 0, 255), 2)
+            self._show_array(self.panel, self._rgba, 'RGBA')
+            self.display_rate.tick()
+            watch.lap(self.metrics, 'render')
+        else:
+            self.grabber.release(frame)
 
-        img2 = Image.fromarray(processed_roi)
-        imgtk2 = ImageTk.PhotoImage(image=img2)
-        self.panel2.imgtk = imgtk2
-        self.panel2.config(image=imgtk2)
+        result = self.inference.latest_result()
+        if result is not None:
+            self.current_symbol = result.symbol
+            self.confidence = result.prob
+
+            self._show_array(self.panel2, result.processed_roi, 'L')
+            self.inference.release(result)
+            watch.lap(self.metrics, 'render_roi')
+
+        for confirmed_char, evidence in self.inference.take_letters(with_evidence=True):
+            if self.decoder is not None:
+                self.decoder.add_letter(confirmed_char, evidence)
+                self._spell_from_decoder()
+            else:
+                self.word += confirmed_char
 
         self._update_text_labels()
         self._update_suggestions()
         self._update_hud()
-
-        self.root.after(20, self.video_loop)
+        watch.lap(self.metrics, 'ui')
+
+        self.root.after(10, self.video_loop)
+
+    @staticmethod
+    def _show_array(panel, arr, mode):
+        """Show a contiguous uint8 image in a label, reusing its PhotoImage while the size stays the same."""
+        img = Image.frombuffer(mode, (arr.shape[1], arr.shape[0]), arr, 'raw', mode, 0, 1)
+        photo = getattr(panel, 'imgtk', None)
+        if photo is None or (photo.width(), photo.height()) != img.size:
+            photo = ImageTk.PhotoImage(image=img)
+            panel.imgtk = photo
+            panel.config(image=photo)
+        else:
+            photo.paste(img)
 
     def _update_text_labels(self):
         self.current_symbol_label.config(text=self.current_symbol)
-        self.word_label.config(text=self.word)
+        self.word_label.config(text=f"{self.word} \u2192 {self.commit_hint}" if self.commit_hint else self.word)
         self.sentence_label.config(text=self.sentence)
 
     def _update_suggestions(self):
-        suggestions = []
-        if self.word:
-            suggestions = self.suggester.get_suggestions(self.word)
+        if self.word == self._suggested_word:
+            return
+        self._suggested_word = self.word
+        self.suggestion_worker.request(self.word)
+
+    def _post_suggestions(self, word, suggestions):
+        # Called on the worker thread; hand the result to the Tk loop
+        try:
+            self.root.after(0, self._show_suggestions, word, suggestions)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _show_suggestions(self, word, suggestions):
+        if word != self.word or suggestions == self._shown_suggestions:
+            return
+        self._shown_suggestions = suggestions
 
         # Update UI buttons
         for i, btn in enumerate(self.suggestion_buttons):
@@ -609,12 +1064,40 @@ class Application:
         hist_str = "".join(self.predictor.history[-10:])
         hud_text = (
             f"Confidence: {self.confidence:.2f}   |   History: {hist_str}\n"
-            f"[Space] Add Word | [Backspace] Del Char | [c] Clear All"
+            f"Camera {self.grabber.rate.rate():.1f} fps | Inference {self.inference.rate.rate():.1f} fps | "
+            f"Display {self.display_rate.rate():.1f} fps | Queue {self.inference.results.qsize()}/{self.inference.results.maxsize}\n"
+            f"[Space] Add Word | [Backspace] Del Char | [c] Clear All | [m] Timings"
         )
+        if self.show_metrics:
+            if self.gate is not None:
+                hud_text += f"\nModel runs {self.gate.executed} | Reused {self.gate.skipped}"
+            hud_text += "\n" + self._metrics_hud_text()
         self.hud_label.config(text=hud_text)
 
+    def _metrics_hud_text(self):
+        # Percentiles over the whole window are cheap but not free; refresh twice a second
+        now = time.monotonic()
+        if now - getattr(self, '_metrics_hud_time', 0.0) > 0.5:
+            self._metrics_hud_time = now
+            stages = self.metrics.snapshot()['stages']
+            lines = [f"{stage:<20} p50 {s['p50'] * 1000:6.1f} ms  p95 {s['p95'] * 1000:6.1f} ms"
+                     for stage, s in sorted(stages.items())]
+            self._metrics_hud_cache = "\n".join(lines)
+        return self._metrics_hud_cache
+
     def destructor(self):
         print("Closing application...")
+        if self.metrics_writer is not None:
+            self.metrics_writer.stop()
+            try:
+                self.metrics_writer.write()
+            except OSError:
+                pass
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.suggestion_worker.stop()
+        self.grabber.stop()
+        self.inference.stop()
         try:
             self.root.destroy()
         except Exception:
@@ -0,0 +1,109 @@
+import os
+import numpy as np
+from image_processing import resize_batch
+
+
+def load_keras_model(json_path, weights_path):
+    """A Keras model from its architecture JSON and HDF5 weights."""
+    # Imported here so the numpy / tflite backends start without loading Keras
+    from keras.models import model_from_json
+
+    if not os.path.exists(json_path) or not os.path.exists(weights_path):
+        raise FileNotFoundError(f"Missing model files: {json_path} or {weights_path}")
+    with open(json_path, 'r') as jf:
+        model = model_from_json(jf.read())
+    model.load_weights(weights_path)
+    return model
+
+
+def _interpreter_class():
+    # The standalone tflite-runtime wheel is much lighter than TensorFlow; use it when installed
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """A .tflite model behind the same predict(arr) call as a Keras model.
+
+    float32 in, float32 out; int8-quantized models get their input quantized and their
+    output dequantized here.
+    """
+
+    def __init__(self, path, num_threads=None):
+        Interpreter = _interpreter_class()
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(self.input_details['shape'])
+
+    def _resize(self, batch):
+        shape = (batch,) + self.input_shape[1:]
+        self.interpreter.resize_tensor_input(self.input_details['index'], shape)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.input_shape = shape
+
+    def predict(self, arr, verbose=0):
+        arr = np.asarray(arr, dtype=np.float32)
+        if arr.shape[0] != self.input_shape[0]:
+            self._resize(arr.shape[0])
+
+        dtype = self.input_details['dtype']
+        if dtype != np.float32:
+            scale, zero_point = self.input_details['quantization']
+            info = np.iinfo(dtype)
+            arr = np.clip(np.round(arr / scale + zero_point), info.min, info.max).astype(dtype)
+
+        self.interpreter.set_tensor(self.input_details['index'], arr)
+        self.interpreter.invoke()
+        out = self.interpreter.get_tensor(self.output_details['index'])
+
+        if self.output_details['dtype'] != np.float32:
+            scale, zero_point = self.output_details['quantization']
+            out = (out.astype(np.float32) - zero_point) * scale
+        return out
+
+
+def _largest_input(models):
+    return max((tuple(m.input_shape) for m in models), key=lambda shape: shape[1])
+
+
+class ConcatModel:
+    """Runs several models on the same input and concatenates their outputs.
+
+    The input is sized for the largest model and resized for the others.
+    """
+
+    def __init__(self, models):
+        self.models = models
+        self.input_shape = _largest_input(models)
+
+    def predict(self, arr, verbose=0):
+        return np.concatenate([np.asarray(m.predict(resize_batch(arr, m.input_shape[1]), verbose=0))
+                               for m in self.models], axis=-1)
+
+
+def fuse_keras_models(models):
+    """One Keras graph feeding the same input to every model, outputs concatenated.
+
+    A single predict() then runs all of them, e.g. the main model and the D/R/U model.
+    The input is sized for the largest model; smaller ones get a Resizing layer in front.
+    Bilinear without antialiasing is what resize_batch's cv2.INTER_LINEAR computes, so this
+    graph, ConcatModel and the NumPy FusedModel agree to float tolerance.
+    """
+    from keras.models import Model
+    from keras.layers import Input, Concatenate, Resizing
+
+    shape = _largest_input(models)
+    inp = Input(shape=shape[1:])
+    outputs = []
+    for m in models:
+        size = m.input_shape[1]
+        outputs.append(m(inp if size == shape[1] else Resizing(size, m.input_shape[2], interpolation='bilinear')(inp)))
+    return Model(inp, Concatenate()(outputs))
@@ -0,0 +1,105 @@
+"""Lexicon-constrained beam search over the confirmed letters of a word.
+
+Each confirmed letter arrives with its probability distribution over A-Z (the evidence the
+time-based confirmation collected for it). The decoder keeps the `beam_width` most likely
+spellings. Each spelling is scored by the sum of its letters' log-probabilities plus
+lm_weight x log of the frequency share of the wordlist words starting with it. A D/R/U-style
+mix-up that leaves a spelling no word starts with is therefore corrected as soon as a
+plausible alternative letter exists. Spellings outside the wordlist (names) stay possible:
+their frequency share is floored at oov_prob instead of being zero.
+"""
+from string import ascii_uppercase
+import math
+import numpy as np
+import config
+
+LETTERS = ascii_uppercase.lower()
+
+
+class BeamDecoder:
+    def __init__(self, wordlist, freqs, index, beam_width=config.BEAM_WIDTH, top_k=config.BEAM_TOP_K,
+                 lm_weight=config.BEAM_LM_WEIGHT, oov_prob=config.BEAM_OOV_PROB, min_prob=0.01):
+        """wordlist: sorted lowercase words; freqs: frequency per word; index: PrefixIndex over them."""
+        self.wordlist = wordlist
+        self.index = index
+        # Cumulative frequencies: the mass of a prefix's contiguous word range in O(1)
+        self._cum = np.concatenate([[0.0], np.cumsum(np.asarray(freqs, dtype=np.float64))])
+        self._total = float(self._cum[-1]) or 1.0
+        self.beam_width = beam_width
+        self.top_k = top_k
+        self.lm_weight = lm_weight
+        self.log_oov = math.log(oov_prob)
+        self.min_prob = min_prob
+        self.reset()
+
+    @classmethod
+    def from_engine(cls, engine, **kwargs):
+        """Decoder over a SuggestionEngine's wordlist and frequencies."""
+        return cls(engine.wordlist, engine.freqs, engine.index, **kwargs)
+
+    def reset(self):
+        # (spelling, summed letter log-probability), best first
+        self.beams = [("", 0.0)]
+        self._stack = []
+
+    @property
+    def letters(self):
+        return len(self._stack)
+
+    def prefix_logp(self, prefix):
+        lo, hi = self.index.prefix_range(prefix)
+        mass = (self._cum[hi] - self._cum[lo]) / self._total
+        return max(math.log(mass), self.log_oov) if mass > 0 else self.log_oov
+
+    def word_logp(self, word):
+        lo, hi = self.index.prefix_range(word)
+        if lo < hi and self.wordlist[lo] == word:
+            mass = (self._cum[lo + 1] - self._cum[lo]) / self._total
+            return max(math.log(mass), self.log_oov) if mass > 0 else self.log_oov
+        return self.log_oov
+
+    def _candidates(self, letter, proba):
+        """[(lowercase letter, probability)]: the top_k letters of proba, always including `letter`."""
+        letter = letter.lower()
+        if proba is None:
+            return [(letter, 1.0)]
+        p = np.asarray(proba, dtype=np.float64)
+        # Vectors over temporal.SYMBOLS start with 'blank'
+        if len(p) == len(LETTERS) + 1:
+            p = p[1:]
+        total = p.sum()
+        if total <= 0:
+            return [(letter, 1.0)]
+        p = p / total
+        top = np.argsort(p)[::-1][:self.top_k]
+        out = [(LETTERS[i], float(p[i])) for i in top if p[i] >= self.min_prob]
+        if letter not in [c for c, _ in out]:
+            out.append((letter, max(float(p[LETTERS.index(letter)]), self.min_prob)))
+        return out
+
+    def add_letter(self, letter, proba=None):
+        """Extend every spelling by one letter; returns the best spelling so far (lowercase)."""
+        self._stack.append(self.beams)
+        scored = {}
+        for text, logp in self.beams:
+            for c, p in self._candidates(letter, proba):
+                t, s = text + c, logp + math.log(p)
+                if s > scored.get(t, -math.inf):
+                    scored[t] = s
+        ranked = sorted(scored.items(), key=lambda b: b[1] + self.lm_weight * self.prefix_logp(b[0]), reverse=True)
+        self.beams = ranked[:self.beam_width]
+        return self.best_prefix()
+
+    def pop_letter(self):
+        """Undo the last add_letter; returns the best spelling after it."""
+        if self._stack:
+            self.beams = self._stack.pop()
+        return self.best_prefix()
+
+    def best_prefix(self):
+        """Best spelling of the word so far, which may still be the start of a longer word."""
+        return self.beams[0][0]
+
+    def best_word(self):
+        """Best spelling as a finished word, for committing it."""
+        return max(self.beams, key=lambda b: b[1] + self.lm_weight * self.word_logp(b[0]))[0]
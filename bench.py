@@ -0,0 +1,330 @@
+"""Per-stage timings of the live frame path, without a camera or a display.
+
+    python bench.py                                  # synthetic frames
+    python bench.py --video session.mp4 --frames 500
+    python bench.py --json bench.json                # save results, e.g. as a baseline
+    python bench.py --baseline bench.json            # exit code 1 on regressions beyond --threshold
+    python bench.py --gate --hold 15                 # change gating on held signs
+
+Each frame goes through the stages of the app in order: capture, flip, cvtColor +
+rectangle, ROI thresholding, predict, process_prediction, suggestions for the current
+word, and rendering. Rendering pastes into reused ImageTk.PhotoImage objects when a
+display is available and stops at the PIL images otherwise. SuggestionEngine.get_suggestions is also
+measured on its own per prefix length, with a cold and a warm cache.
+
+When the trained models are missing, predict runs a NumPy model of the train.py layer stack
+with random weights, so the timings still reflect the real amount of work.
+"""
+import argparse
+import json
+import sys
+import time
+import cv2
+import numpy as np
+from PIL import Image
+from image_processing import roi_box, BufferRing, RoiThresholder
+from pipeline import ChangeGate
+import numpy_engine
+import config
+
+STAGES = ['capture', 'flip', 'color', 'threshold', 'predict', 'process_prediction', 'suggestions', 'render']
+SUGGESTION_WORDS = ['the', 'hello', 'people', 'because', 'different', 'government', 'thnks', 'wrold']
+# Sub-0.05 ms changes are timer noise, not regressions
+MIN_REGRESSION_MS = 0.05
+
+
+class SyntheticCapture:
+    """cv2.VideoCapture stand-in: noisy frames with a bright 'hand' drifting through the ROI.
+
+    With hold > 1 the scene only changes every `hold` frames, like a held sign; the frames in
+    between repeat it with slight sensor noise. With fps set, read() blocks like a camera
+    delivering that frame rate.
+    """
+
+    def __init__(self, frames=300, shape=(480, 640, 3), seed=0, hold=1, fps=None):
+        self.frames = frames
+        self.shape = shape
+        self.rng = np.random.default_rng(seed)
+        self.hold = hold
+        self.fps = fps
+        self.count = 0
+        self._scene = None
+
+    def read(self):
+        if self.count >= self.frames:
+            return False, None
+        if self.fps:
+            time.sleep(1.0 / self.fps)
+        if self.count % self.hold == 0:
+            frame = self.rng.integers(0, 60, self.shape, dtype=np.uint8)
+            x1, y1, x2, y2 = roi_box(self.shape)
+            size = (x2 - x1) // 3
+            offset = (self.count // self.hold * 3) % (x2 - x1 - size)
+            cv2.circle(frame, (x1 + offset + size // 2, y1 + size), size // 2, (200, 180, 170), -1)
+            self._scene = frame
+        else:
+            noise = self.rng.integers(-2, 3, self.shape)
+            frame = np.clip(self._scene + noise, 0, 255).astype(np.uint8)
+        self.count += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def _random_stack(num_classes, sz, rng):
+    """Layers of the train.py classifier with random weights, in NumpyModel format."""
+    def conv(cin, cout, name, first=False):
+        cfg = {'name': name, 'activation': 'relu', 'strides': [1, 1], 'padding': 'valid'}
+        if first:
+            cfg['batch_input_shape'] = [None, sz, sz, 1]
+        return ('Conv2D', cfg, [rng.standard_normal((3, 3, cin, cout)).astype(np.float32) * 0.1,
+                                np.zeros(cout, np.float32)])
+
+    def dense(nin, nout, name, activation='relu'):
+        return ('Dense', {'name': name, 'activation': activation},
+                [rng.standard_normal((nin, nout)).astype(np.float32) * 0.05, np.zeros(nout, np.float32)])
+
+    side = ((sz - 2) // 2 - 2) // 2
+    return numpy_engine.NumpyModel([
+        conv(1, 32, 'conv1', first=True),
+        ('MaxPooling2D', {'name': 'pool1', 'pool_size': [2, 2]}, []),
+        conv(32, 32, 'conv2'),
+        ('MaxPooling2D', {'name': 'pool2', 'pool_size': [2, 2]}, []),
+        ('Flatten', {'name': 'flatten'}, []),
+        dense(side * side * 32, 128, 'dense1'),
+        dense(128, 96, 'dense2'),
+        dense(96, 64, 'dense3'),
+        dense(64, num_classes, 'out', 'softmax'),
+    ])
+
+
+def load_predictor(backend=config.PREDICTOR_BACKEND):
+    """(predictor, description): the real models when they load, else the random-weight stand-in."""
+    from app import SignLanguagePredictor
+
+    try:
+        return SignLanguagePredictor(backend=backend), backend
+    except Exception as e:
+        print(f"Using a random-weight NumPy model instead: {e}")
+
+    class RandomWeightPredictor(SignLanguagePredictor):
+        def _load_models(self):
+            rng = np.random.default_rng(0)
+            self.fused_model = numpy_engine.FusedModel([_random_stack(27, config.IMG_SIZE, rng),
+                                                        _random_stack(3, config.IMG_SIZE, rng)])
+
+    return RandomWeightPredictor(), 'synthetic-numpy'
+
+
+def _photo_image_factory():
+    """ImageTk.PhotoImage when Tk can open a display, else None."""
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception:
+        return None, None
+    return ImageTk.PhotoImage, root
+
+
+def summarize(times_ms):
+    if not times_ms:
+        return None
+    p50, p95, p99 = np.percentile(times_ms, [50, 95, 99])
+    return {'mean': float(np.mean(times_ms)), 'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+            'count': len(times_ms)}
+
+
+def bench_pipeline(capture, predictor, engine=None, warmup=5, gate=None):
+    """Run every captured frame through the app's stages; per-stage timing summaries in ms.
+
+    With a pipeline.ChangeGate, the predict stage reuses the last prediction for unchanged ROIs.
+    """
+    photo_image, root = _photo_image_factory()
+    times = {stage: [] for stage in STAGES}
+    word = ""
+    frames = 0
+    start_all = None
+    # The same reused buffers as FrameGrabber, InferenceWorker and Application.video_loop
+    mirrored = BufferRing()
+    thresholder = RoiThresholder()
+    rgba = None
+    photos = [None, None]
+    try:
+        while True:
+            t0 = time.perf_counter()
+            ok, frame = capture.read()
+            if not ok:
+                break
+            t1 = time.perf_counter()
+            frame = cv2.flip(frame, 1, dst=mirrored.next(frame.shape))
+            t2 = time.perf_counter()
+            x1, y1, x2, y2 = roi_box(frame.shape)
+            if rgba is None or rgba.shape[:2] != frame.shape[:2]:
+                rgba = np.empty(frame.shape[:2] + (4,), dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=rgba)
+            cv2.rectangle(rgba, (x1 - 1, y1 - 1), (x2 + 1, y2 + 1), (118, 230, 0, 255), 2)
+            t3 = time.perf_counter()
+            processed_roi = thresholder(frame[y1:y2, x1:x2])
+            t4 = time.perf_counter()
+            if gate is None:
+                symbol, _ = predictor.predict(processed_roi)
+            else:
+                signature, cached = gate.lookup(processed_roi)
+                if cached is None:
+                    cached = predictor.predict(processed_roi)
+                    gate.store(signature, cached)
+                symbol, _ = cached
+            t5 = time.perf_counter()
+            confirmed_char = predictor.process_prediction(symbol)
+            if confirmed_char:
+                word += confirmed_char
+            t6 = time.perf_counter()
+            if engine is not None and word:
+                engine.get_suggestions(word)
+            t7 = time.perf_counter()
+            images = [Image.frombuffer('RGBA', (rgba.shape[1], rgba.shape[0]), rgba, 'raw', 'RGBA', 0, 1),
+                      Image.frombuffer('L', (processed_roi.shape[1], processed_roi.shape[0]), processed_roi,
+                                       'raw', 'L', 0, 1)]
+            if photo_image is not None:
+                for i, img in enumerate(images):
+                    if photos[i] is None:
+                        photos[i] = photo_image(image=img)
+                    else:
+                        photos[i].paste(img)
+            t8 = time.perf_counter()
+
+            frames += 1
+            if frames <= warmup:
+                continue
+            if start_all is None:
+                start_all = t0
+            for stage, (a, b) in zip(STAGES, [(t0, t1), (t1, t2), (t2, t3), (t3, t4), (t4, t5),
+                                              (t5, t6), (t6, t7), (t7, t8)]):
+                times[stage].append((b - a) * 1000)
+        end_all = time.perf_counter()
+    finally:
+        capture.release()
+        if root is not None:
+            root.destroy()
+
+    measured = max(0, frames - warmup)
+    elapsed = end_all - start_all if start_all is not None else 0.0
+    results = {
+        'frames': measured,
+        'fps': measured / elapsed if elapsed > 0 else 0.0,
+        'render_mode': 'photoimage' if photo_image is not None else 'pil-only',
+        'stages': {stage: summarize(t) for stage, t in times.items()},
+    }
+    if gate is not None:
+        # Warm-up frames included
+        results['inferences'] = {'executed': gate.executed, 'skipped': gate.skipped}
+    return results
+
+
+def bench_suggestions(engine, words=SUGGESTION_WORDS, repeats=20):
+    """get_suggestions timing per prefix length, cold (cache cleared) and warm, in ms."""
+    cold, warm = {}, {}
+    for _ in range(repeats):
+        for word in words:
+            engine._cache.clear()
+            for n in range(1, len(word) + 1):
+                t0 = time.perf_counter()
+                engine.get_suggestions(word[:n])
+                cold.setdefault(n, []).append((time.perf_counter() - t0) * 1000)
+            for n in range(1, len(word) + 1):
+                t0 = time.perf_counter()
+                engine.get_suggestions(word[:n])
+                warm.setdefault(n, []).append((time.perf_counter() - t0) * 1000)
+    return {'cold': {str(n): summarize(t) for n, t in sorted(cold.items())},
+            'warm': {str(n): summarize(t) for n, t in sorted(warm.items())}}
+
+
+def compare(results, baseline, threshold=0.2):
+    """Regressions: p50 timings more than `threshold` (fraction) and MIN_REGRESSION_MS slower than baseline."""
+    regressions = []
+
+    def check(name, new, old):
+        if not new or not old:
+            return
+        if new['p50'] > old['p50'] * (1 + threshold) and new['p50'] - old['p50'] > MIN_REGRESSION_MS:
+            regressions.append(f"{name}: p50 {old['p50']:.3f} ms -> {new['p50']:.3f} ms")
+
+    if results.get('predictor') != baseline.get('predictor'):
+        print(f"Warning: baseline used predictor {baseline.get('predictor')}, this run {results.get('predictor')}")
+    for stage in STAGES:
+        check(f"stage {stage}", results['pipeline']['stages'].get(stage),
+              baseline.get('pipeline', {}).get('stages', {}).get(stage))
+    for cache in ('cold', 'warm'):
+        for n, new in results.get('suggestions', {}).get(cache, {}).items():
+            check(f"suggestions {cache} len {n}", new, baseline.get('suggestions', {}).get(cache, {}).get(n))
+    return regressions
+
+
+def print_results(results):
+    pipeline = results['pipeline']
+    print(f"\nPipeline: {pipeline['frames']} frames, {pipeline['fps']:.1f} fps end to end "
+          f"(predictor: {results['predictor']}, render: {pipeline['render_mode']})")
+    print(f"  {'stage':<20}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}  ms")
+    for stage, s in pipeline['stages'].items():
+        if s:
+            print(f"  {stage:<20}{s['mean']:>9.3f}{s['p50']:>9.3f}{s['p95']:>9.3f}{s['p99']:>9.3f}")
+    if 'inferences' in pipeline:
+        print(f"  model runs: {pipeline['inferences']['executed']}, reused: {pipeline['inferences']['skipped']}")
+    if 'suggestions' in results:
+        print(f"\nSuggestions by prefix length  {'cold p50':>10}{'cold p95':>10}{'warm p50':>10}  ms")
+        for n, s in results['suggestions']['cold'].items():
+            w = results['suggestions']['warm'][n]
+            print(f"  {n:<28}{s['p50']:>10.3f}{s['p95']:>10.3f}{w['p50']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', help="recorded video to use instead of synthetic frames")
+    parser.add_argument('--frames', type=int, default=300, help="synthetic frames to generate")
+    parser.add_argument('--hold', type=int, default=1, help="synthetic frames per hand position")
+    parser.add_argument('--gate', action='store_true', help="skip the model for unchanged ROIs, as the app does")
+    parser.add_argument('--backend', default=config.PREDICTOR_BACKEND)
+    parser.add_argument('--no-suggestions', action='store_true', help="skip the suggestion engine")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown, as a fraction")
+    args = parser.parse_args()
+
+    if args.video:
+        capture = cv2.VideoCapture(args.video)
+        if not capture.isOpened():
+            sys.exit(f"Cannot open video: {args.video}")
+    else:
+        capture = SyntheticCapture(args.frames, hold=args.hold)
+
+    predictor, predictor_name = load_predictor(args.backend)
+    engine = None
+    if not args.no_suggestions:
+        from app import SuggestionEngine
+        engine = SuggestionEngine()
+
+    results = {'predictor': predictor_name, 'source': args.video or f"synthetic:{args.frames}",
+               'pipeline': bench_pipeline(capture, predictor, engine, gate=ChangeGate() if args.gate else None)}
+    if engine is not None:
+        results['suggestions'] = bench_suggestions(engine)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {args.json}")
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Early exit for ROIs with no hand in them, ahead of the CNN.
+
+    python blank_detector.py                          # calibrate on data2/train, report on data2/test
+    python blank_detector.py --target-fnr 0.001
+
+Thresholded ROIs are white with dark edge lines where the hand is; an empty ROI has almost
+no edges. The detector calls a ROI blank when its fraction of dark pixels is below a
+threshold. The threshold is calibrated on the training set so that at most --target-fnr of
+the non-blank images (a hand the CNN would have seen) are cut off as blank. The result is
+saved to model/blank_detector.json, which SignLanguagePredictor loads when
+BLANK_DETECTOR_ENABLED is set.
+"""
+import argparse
+import json
+import os
+import sys
+import cv2
+import numpy as np
+import config
+
+
+def dark_fraction(img):
+    """Share of edge (dark) pixels in a thresholded ROI."""
+    # A 256-bin histogram instead of an image-sized boolean mask
+    hist = cv2.calcHist([img], [0], None, [256], [0, 256])
+    return float(hist[:128].sum()) / img.size
+
+
+class BlankDetector:
+    def __init__(self, threshold, target_fnr=None, calibration=None):
+        self.threshold = threshold
+        self.target_fnr = target_fnr
+        # Stats of the calibration run (samples, train FNR, blank recall), kept for reports
+        self.calibration = calibration or {}
+
+    def is_blank(self, img):
+        return dark_fraction(img) < self.threshold
+
+    def blank_mask(self, images):
+        return np.array([dark_fraction(img) < self.threshold for img in images], dtype=bool)
+
+    @classmethod
+    def calibrate(cls, images, blank, target_fnr=config.BLANK_DETECTOR_TARGET_FNR):
+        """Largest threshold that cuts off at most target_fnr of the non-blank images."""
+        if not 0.0 <= target_fnr <= 1.0:
+            raise ValueError(f"target_fnr must be between 0 and 1, got {target_fnr}")
+        features = np.array([dark_fraction(img) for img in images])
+        blank = np.asarray(blank, dtype=bool)
+        hands = np.sort(features[~blank])
+        if len(hands) == 0 or not blank.any():
+            raise ValueError("Calibration needs both blank and non-blank images")
+        # Everything strictly below hands[k] is blank, so at most k hands are cut off
+        threshold = float(hands[min(int(target_fnr * len(hands)), len(hands) - 1)])
+        detector = cls(threshold, target_fnr)
+        detector.calibration = detector.report(images, blank, features)
+        return detector
+
+    def report(self, images, blank, features=None):
+        """False-negative rate (hands called blank), blank recall and the share of early exits."""
+        if features is None:
+            features = np.array([dark_fraction(img) for img in images])
+        blank = np.asarray(blank, dtype=bool)
+        flagged = features < self.threshold
+        return {
+            'samples': int(len(flagged)),
+            'false_negative_rate': float(flagged[~blank].mean()) if (~blank).any() else 0.0,
+            'blank_recall': float(flagged[blank].mean()) if blank.any() else 0.0,
+            'early_exit_rate': float(flagged.mean()) if len(flagged) else 0.0,
+        }
+
+    def save(self, path=config.BLANK_DETECTOR_JSON):
+        with open(path, 'w') as f:
+            json.dump({'feature': 'dark_fraction', 'threshold': self.threshold,
+                       'target_fnr': self.target_fnr, 'calibration': self.calibration}, f, indent=2)
+
+    @classmethod
+    def load(cls, path=config.BLANK_DETECTOR_JSON):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(data['threshold'], data.get('target_fnr'), data.get('calibration'))
+
+
+def load_detector(path=config.BLANK_DETECTOR_JSON):
+    """The calibrated detector, or None when blank_detector.py has not been run yet."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return BlankDetector.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring blank detector {path}: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--train-dir', default=config.TRAIN2_DIR)
+    parser.add_argument('--test-dir', default=config.TEST2_DIR)
+    parser.add_argument('--target-fnr', type=float, default=config.BLANK_DETECTOR_TARGET_FNR)
+    parser.add_argument('--output', default=config.BLANK_DETECTOR_JSON)
+    args = parser.parse_args()
+
+    from evaluate import load_test_images
+
+    try:
+        images, symbols = load_test_images(args.train_dir)
+    except OSError as e:
+        sys.exit(f"Cannot read {args.train_dir}: {e}")
+    if not images:
+        sys.exit(f"No images found in {args.train_dir}")
+    blank = [s == 'blank' for s in symbols]
+    try:
+        detector = BlankDetector.calibrate(images, blank, args.target_fnr)
+    except ValueError as e:
+        sys.exit(str(e))
+    stats = detector.calibration
+    print(f"Threshold {detector.threshold:.4f} on {stats['samples']} training images: "
+          f"FNR {stats['false_negative_rate']:.4f}, blank recall {stats['blank_recall']:.4f}")
+
+    try:
+        test_images, test_symbols = load_test_images(args.test_dir)
+    except OSError as e:
+        print(f"Skipping the test report: {e}")
+        test_images = []
+    if test_images:
+        test = detector.report(test_images, [s == 'blank' for s in test_symbols])
+        detector.calibration['test'] = test
+        print(f"Test ({test['samples']} images): FNR {test['false_negative_rate']:.4f}, "
+              f"blank recall {test['blank_recall']:.4f}, early exits {test['early_exit_rate']:.4f}")
+    if stats['blank_recall'] < 0.5:
+        print("Warning: fewer than half of the blank images are caught; the early exit will rarely help.")
+
+    detector.save(args.output)
+    print(f"Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
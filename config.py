@@ -11,6 +11,7 @@ TEST_DIR = os.path.join(DATA_DIR, 'test')
 DATA2_DIR = os.path.join(BASE_DIR, 'data2')
 TRAIN2_DIR = os.path.join(DATA2_DIR, 'train')
 TEST2_DIR = os.path.join(DATA2_DIR, 'test')
+PACKED_DIR = os.path.join(DATA2_DIR, 'packed')  # preprocessing.py --pack
 
 # Model Directory
 MODEL_DIR = os.path.join(BASE_DIR, 'model')
@@ -18,6 +19,57 @@ MODEL_BW_JSON = os.path.join(MODEL_DIR, 'model-bw.json')
 MODEL_BW_H5 = os.path.join(MODEL_DIR, 'model-bw.h5')
 MODEL_BW_DRU_JSON = os.path.join(MODEL_DIR, 'model-bw_dru.json')
 MODEL_BW_DRU_H5 = os.path.join(MODEL_DIR, 'model-bw_dru.h5')
+MODEL_BW_STUDENT_JSON = os.path.join(MODEL_DIR, 'model-bw_student.json')  # train.py --distill
+MODEL_BW_STUDENT_H5 = os.path.join(MODEL_DIR, 'model-bw_student.h5')
+MODEL_BW_TEACHER_JSON = os.path.join(MODEL_DIR, 'model-bw_teacher.json')  # backup made by --install
+MODEL_BW_TEACHER_H5 = os.path.join(MODEL_DIR, 'model-bw_teacher.h5')
+MODEL_BW_TFLITE = os.path.join(MODEL_DIR, 'model-bw.tflite')
+MODEL_BW_DRU_TFLITE = os.path.join(MODEL_DIR, 'model-bw_dru.tflite')
+MODEL_BW_INT8_TFLITE = os.path.join(MODEL_DIR, 'model-bw_int8.tflite')
+MODEL_BW_DRU_INT8_TFLITE = os.path.join(MODEL_DIR, 'model-bw_dru_int8.tflite')
+MODEL_FUSED_TFLITE = os.path.join(MODEL_DIR, 'model-bw_fused.tflite')
+MODEL_FUSED_INT8_TFLITE = os.path.join(MODEL_DIR, 'model-bw_fused_int8.tflite')
+MODEL_BW_NPZ = os.path.join(MODEL_DIR, 'model-bw.npz')
+MODEL_BW_DRU_NPZ = os.path.join(MODEL_DIR, 'model-bw_dru.npz')
+
+# Inference
+# 'keras', 'numpy' (no TensorFlow needed), or 'tflite' / 'tflite_int8' (run export_tflite.py first)
+PREDICTOR_BACKEND = 'keras'
+TFLITE_NUM_THREADS = os.cpu_count() or 1
+
+# Letter confirmation: 'frames' (CONFIRM_FRAMES in a row) or 'time' (temporal.py, independent of the frame rate)
+CONFIRM_MODE = 'frames'
+CONFIRM_FRAMES = 15       # A letter is confirmed on the frame after this many
+CONFIRM_HOLD_MS = 600     # Probability-weighted time a letter needs within the window
+CONFIRM_WINDOW_MS = 1000
+CONFIRM_RELEASE_MS = 150  # Blank time that ends a hold, so the next letter can be confirmed
+CONFIRM_MAX_GAP_MS = 200  # A frame never counts for longer than this, e.g. after a stall
+
+# Beam decoding of confirmed letters against the suggestion wordlist (beam_decoder.py)
+BEAM_DECODER_ENABLED = False
+BEAM_WIDTH = 8
+BEAM_TOP_K = 4          # Letter alternatives kept per confirmed letter
+BEAM_LM_WEIGHT = 0.4    # Weight of the wordlist frequencies against the letter probabilities
+BEAM_OOV_PROB = 1e-7    # Frequency share assumed for spellings that start no known word
+# Shorter holds used while the decoder is on, since it corrects the extra mix-ups
+BEAM_CONFIRM_FRAMES = 10
+BEAM_CONFIRM_HOLD_MS = 400
+
+# Blank early exit (calibrate with blank_detector.py; off until model/blank_detector.json exists)
+BLANK_DETECTOR_ENABLED = True
+BLANK_DETECTOR_JSON = os.path.join(MODEL_DIR, 'blank_detector.json')
+BLANK_DETECTOR_TARGET_FNR = 0.005  # Share of hand images the calibration may cut off as blank
+
+# Change gating: reuse the last prediction while the thresholded ROI stays the same
+GATE_ENABLED = True
+GATE_SIZE = 32         # ROIs are compared at this resolution
+GATE_THRESHOLD = 6.0   # Mean absolute difference (0-255) below which a ROI counts as unchanged
+
+# Metrics (per-stage timings; [m] in the app shows them in the HUD)
+METRICS_WINDOW = 512           # Samples kept per stage for p50/p95
+METRICS_FILE = None            # e.g. os.path.join(BASE_DIR, 'metrics.prom'): Prometheus text, rewritten periodically
+METRICS_EXPORT_INTERVAL = 5.0  # Seconds between METRICS_FILE writes
+METRICS_PORT = None            # e.g. 9108: serve http://127.0.0.1:<port>/metrics
 
 # Image Processing
 IMG_SIZE = 128  # Size for model input
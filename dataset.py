@@ -0,0 +1,134 @@
+"""Packed training data: every preprocessed image of a split in one memory-mapped uint8 array.
+
+    data2/packed/<split>/images.npy    (N, IMG_SIZE, IMG_SIZE) uint8
+    data2/packed/<split>/labels.npy    (N,) int32, index into classes
+    data2/packed/<split>/classes.json  {"classes": [...], "img_size": ...}
+
+Written by `python preprocessing.py --pack`. Class indices follow the sorted directory
+names, like flow_from_directory, so models trained from either source have the same
+outputs. Images are resized with cv2.resize, as SignLanguagePredictor does.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+import config
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def list_images(split_dir, classes=None):
+    """(classes, paths, labels) for a directory with one subdirectory per class."""
+    if classes is None:
+        classes = sorted(d for d in os.listdir(split_dir) if os.path.isdir(os.path.join(split_dir, d)))
+    paths, labels = [], []
+    for label, class_name in enumerate(classes):
+        class_dir = os.path.join(split_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        for file in sorted(os.listdir(class_dir)):
+            if file.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(class_dir, file))
+                labels.append(label)
+    return classes, paths, labels
+
+
+def _fill_chunk(job):
+    """Worker: decode and resize paths into rows start.. of the images file. Returns failed rows."""
+    images_path, start, paths, img_size = job
+    images = np.load(images_path, mmap_mode='r+')
+    failed = []
+    for i, path in enumerate(paths, start):
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            failed.append(i)
+            continue
+        images[i] = cv2.resize(img, (img_size, img_size))
+    images.flush()
+    return failed
+
+
+def pack_split(split_dir, out_dir, classes=None, img_size=config.IMG_SIZE, workers=None, chunk_size=1024):
+    """Pack one split directory into out_dir. Returns the class names used."""
+    classes, paths, labels = list_images(split_dir, classes)
+    os.makedirs(out_dir, exist_ok=True)
+    images_tmp = os.path.join(out_dir, 'images.tmp.npy')
+    images = np.lib.format.open_memmap(images_tmp, mode='w+', dtype=np.uint8,
+                                       shape=(len(paths), img_size, img_size))
+    del images
+
+    jobs = [(images_tmp, i, paths[i:i + chunk_size], img_size) for i in range(0, len(paths), chunk_size)]
+    failed = []
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            failed.extend(_fill_chunk(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for rows in pool.map(_fill_chunk, jobs):
+                failed.extend(rows)
+
+    labels = np.asarray(labels, dtype=np.int32)
+    if failed:
+        print(f"Warning: skipped {len(failed)} unreadable images in {split_dir}")
+        keep = np.ones(len(paths), dtype=bool)
+        keep[failed] = False
+        packed = np.load(images_tmp, mmap_mode='r')
+        compact = np.lib.format.open_memmap(images_tmp + '.compact.npy', mode='w+', dtype=np.uint8,
+                                            shape=(int(keep.sum()), img_size, img_size))
+        compact[:] = packed[keep]
+        compact.flush()
+        del packed, compact
+        os.replace(images_tmp + '.compact.npy', images_tmp)
+        labels = labels[keep]
+
+    np.save(os.path.join(out_dir, 'labels.npy'), labels)
+    os.replace(images_tmp, os.path.join(out_dir, 'images.npy'))
+    with open(os.path.join(out_dir, 'classes.json'), 'w') as f:
+        json.dump({'classes': classes, 'img_size': img_size}, f)
+    print(f"Packed {len(labels)} images from {split_dir} into {out_dir}")
+    return classes
+
+
+def pack_dataset(source_dir=config.DATA2_DIR, out_dir=config.PACKED_DIR, img_size=config.IMG_SIZE, workers=None):
+    """Pack data2/train and data2/test; test uses the class order of train."""
+    classes = pack_split(os.path.join(source_dir, 'train'), os.path.join(out_dir, 'train'),
+                         img_size=img_size, workers=workers)
+    test_dir = os.path.join(source_dir, 'test')
+    if os.path.isdir(test_dir):
+        pack_split(test_dir, os.path.join(out_dir, 'test'), classes=classes, img_size=img_size, workers=workers)
+
+
+class PackedDataset:
+    """Read side of a packed split. images is a read-only memmap, nothing is loaded up front."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'classes.json'), 'r') as f:
+            meta = json.load(f)
+        self.classes = meta['classes']
+        self.img_size = meta['img_size']
+        self.images = np.load(os.path.join(directory, 'images.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(directory, 'labels.npy'))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def num_classes(self):
+        return len(self.classes)
+
+    def batches(self, batch_size, shuffle=False, seed=None):
+        """One epoch of (uint8 images, int labels) batches.
+
+        Unshuffled batches are slices of the memmap (no copy). Shuffled batches gather
+        their rows in ascending order to keep reads local.
+        """
+        n = len(self.labels)
+        if not shuffle:
+            for start in range(0, n, batch_size):
+                yield self.images[start:start + batch_size], self.labels[start:start + batch_size]
+            return
+        order = np.random.default_rng(seed).permutation(n)
+        for start in range(0, n, batch_size):
+            rows = np.sort(order[start:start + batch_size])
+            yield self.images[rows], self.labels[rows]
@@ -0,0 +1,195 @@
+"""Accuracy and speed of SignLanguagePredictor on data2/test, per inference backend.
+
+    python evaluate.py                                   # every backend that loads
+    python evaluate.py --backends numpy tflite --json eval.json
+    python evaluate.py --min-accuracy 0.9 --max-p95-ms 20
+    python evaluate.py --baseline eval.json --max-accuracy-drop 0.01 --max-latency-increase 0.25
+    python evaluate.py --max-blank-fnr 0.01            # gate on the blank early exit's miss rate
+
+Images go through predict_batch, the same decoding (D/R/U second stage included) as the
+live app. Single-frame latency is measured with predict() on --latency-samples images. The
+exit code is 1 when a backend misses a threshold or regresses against the baseline.
+Class directories named after a letter are that letter; any other name counts as 'blank'.
+When a calibrated blank detector exists (blank_detector.py), predictions go through it as in
+the app, and its false-negative rate (hand images short-circuited as blank) is reported.
+--no-blank-detector evaluates the models alone.
+"""
+import argparse
+import json
+import sys
+import time
+from string import ascii_uppercase
+import cv2
+import numpy as np
+from dataset import list_images
+from blank_detector import load_detector
+import config
+
+BACKENDS = ['keras', 'numpy', 'tflite', 'tflite_int8']
+SYMBOLS = ['blank'] + list(ascii_uppercase)
+
+
+def symbol_for_class(class_name):
+    return class_name.upper() if class_name.upper() in ascii_uppercase else 'blank'
+
+
+def load_test_images(test_dir=config.TEST2_DIR):
+    """(grayscale images, true symbols) for every image under test_dir."""
+    classes, paths, labels = list_images(test_dir)
+    images, symbols = [], []
+    for path, label in zip(paths, labels):
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            print(f"Warning: could not read {path}")
+            continue
+        images.append(img)
+        symbols.append(symbol_for_class(classes[label]))
+    return images, symbols
+
+
+def percentiles(times_ms):
+    if not times_ms:
+        return {'p50': None, 'p95': None, 'p99': None}
+    p50, p95, p99 = np.percentile(times_ms, [50, 95, 99])
+    return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+
+def evaluate_predictor(predictor, images, symbols, batch_size=64, latency_samples=200):
+    """Accuracy, confusion matrix, batched images/sec and single-frame latency percentiles."""
+    index = {s: i for i, s in enumerate(SYMBOLS)}
+    confusion = np.zeros((len(SYMBOLS), len(SYMBOLS)), dtype=np.int64)
+
+    predictor.predict_batch(images[:1])  # warm-up outside the timings
+    start = time.perf_counter()
+    for i in range(0, len(images), batch_size):
+        for truth, (symbol, _) in zip(symbols[i:i + batch_size], predictor.predict_batch(images[i:i + batch_size])):
+            confusion[index[truth], index[symbol]] += 1
+    elapsed = time.perf_counter() - start
+
+    times_ms = []
+    for img in images[:latency_samples]:
+        t0 = time.perf_counter()
+        predictor.predict(img)
+        times_ms.append((time.perf_counter() - t0) * 1000)
+
+    totals = confusion.sum(axis=1)
+    per_class = {s: float(confusion[i, i] / totals[i]) for i, s in enumerate(SYMBOLS) if totals[i]}
+    return {
+        'samples': len(images),
+        'accuracy': float(np.trace(confusion) / max(1, confusion.sum())),
+        'per_class_accuracy': per_class,
+        'confusion': {'labels': SYMBOLS, 'matrix': confusion.tolist()},
+        'images_per_sec': len(images) / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': percentiles(times_ms),
+    }
+
+
+def check(results, min_accuracy=None, max_p95_ms=None, baseline=None, max_accuracy_drop=0.01,
+          max_latency_increase=0.25, max_blank_fnr=None):
+    """Human-readable failures for thresholds and regressions against a previous results file."""
+    failures = []
+    detector = results.get('blank_detector')
+    if max_blank_fnr is not None and detector and detector['false_negative_rate'] > max_blank_fnr:
+        failures.append(f"blank detector: false-negative rate {detector['false_negative_rate']:.4f} > {max_blank_fnr}")
+    for name, r in results['backends'].items():
+        if min_accuracy is not None and r['accuracy'] < min_accuracy:
+            failures.append(f"{name}: accuracy {r['accuracy']:.4f} < {min_accuracy}")
+        p95 = r['latency_ms']['p95']
+        if max_p95_ms is not None and p95 is not None and p95 > max_p95_ms:
+            failures.append(f"{name}: p95 latency {p95:.2f} ms > {max_p95_ms} ms")
+        old = (baseline or {}).get('backends', {}).get(name)
+        if old is None:
+            continue
+        if r['accuracy'] < old['accuracy'] - max_accuracy_drop:
+            failures.append(f"{name}: accuracy fell from {old['accuracy']:.4f} to {r['accuracy']:.4f}")
+        old_p95 = old['latency_ms']['p95']
+        if old_p95 and p95 is not None and p95 > old_p95 * (1 + max_latency_increase):
+            failures.append(f"{name}: p95 latency rose from {old_p95:.2f} ms to {p95:.2f} ms")
+    return failures
+
+
+def print_report(name, r):
+    lat = r['latency_ms']
+    print(f"\n== {name}: accuracy {r['accuracy']:.4f} on {r['samples']} images, "
+          f"{r['images_per_sec']:.1f} images/sec batched")
+    if lat['p50'] is not None:
+        print(f"   single frame: p50 {lat['p50']:.2f} ms, p95 {lat['p95']:.2f} ms, p99 {lat['p99']:.2f} ms")
+    print("   per class: " + ", ".join(f"{s} {a:.2f}" for s, a in r['per_class_accuracy'].items()))
+    matrix = np.array(r['confusion']['matrix'])
+    np.fill_diagonal(matrix, 0)
+    worst = np.argsort(matrix, axis=None)[::-1][:5]
+    pairs = [(SYMBOLS[i // len(SYMBOLS)], SYMBOLS[i % len(SYMBOLS)], int(matrix.flat[i])) for i in worst]
+    pairs = [p for p in pairs if p[2] > 0]
+    if pairs:
+        print("   top confusions: " + ", ".join(f"{t}->{p} x{n}" for t, p, n in pairs))
+
+
+def print_blank_report(r):
+    calibration = f"{r['calibration_fnr']:.4f}" if r['calibration_fnr'] is not None else "n/a"
+    print(f"\n== blank detector (threshold {r['threshold']:.4f}): false-negative rate {r['false_negative_rate']:.4f} "
+          f"(calibrated {calibration}, target {r['target_fnr']}), blank recall {r['blank_recall']:.4f}, "
+          f"early exits {r['early_exit_rate']:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--test-dir', default=config.TEST2_DIR)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--latency-samples', type=int, default=200)
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--min-accuracy', type=float)
+    parser.add_argument('--max-p95-ms', type=float)
+    parser.add_argument('--baseline', help="results file of a previous run to compare against")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01)
+    parser.add_argument('--max-latency-increase', type=float, default=0.25, help="allowed p95 increase, as a fraction")
+    parser.add_argument('--no-blank-detector', action='store_true', help="run the models on every image")
+    parser.add_argument('--max-blank-fnr', type=float, help="allowed share of hand images the blank detector drops")
+    args = parser.parse_args()
+
+    from app import SignLanguagePredictor
+
+    images, symbols = load_test_images(args.test_dir)
+    if not images:
+        print(f"No test images found in {args.test_dir}")
+        sys.exit(1)
+    print(f"Evaluating on {len(images)} images from {args.test_dir}")
+
+    results = {'test_dir': args.test_dir, 'backends': {}, 'skipped': {}}
+    detector = None if args.no_blank_detector else load_detector()
+    if detector is not None:
+        results['blank_detector'] = dict(detector.report(images, [s == 'blank' for s in symbols]),
+                                         threshold=detector.threshold, target_fnr=detector.target_fnr,
+                                         calibration_fnr=detector.calibration.get('false_negative_rate'))
+        print_blank_report(results['blank_detector'])
+    for name in args.backends:
+        try:
+            predictor = SignLanguagePredictor(backend=name, blank_detector=detector)
+        except Exception as e:
+            results['skipped'][name] = str(e)
+            print(f"Skipping {name}: {e}")
+            continue
+        results['backends'][name] = evaluate_predictor(predictor, images, symbols, args.batch_size,
+                                                       args.latency_samples)
+        print_report(name, results['backends'][name])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {args.json}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    failures = check(results, args.min_accuracy, args.max_p95_ms, baseline,
+                     args.max_accuracy_drop, args.max_latency_increase, args.max_blank_fnr)
+    if not results['backends']:
+        failures.append("no backend could be loaded")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
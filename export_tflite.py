@@ -0,0 +1,99 @@
+"""Convert the trained Keras models to TensorFlow Lite.
+
+Writes the main and D/R/U models separately, plus a fused model that runs both in one
+invoke (outputs concatenated: 27 main classes, then D, R, U).
+
+    python export_tflite.py           # float32 .tflite files
+    python export_tflite.py --int8    # also int8 models, calibrated on data2/test
+"""
+import argparse
+import os
+import random
+import cv2
+import tensorflow as tf
+from backends import fuse_keras_models, load_keras_model
+import config
+
+
+def calibration_images(directory, limit=200, seed=0, size=config.IMG_SIZE):
+    """Up to `limit` preprocessed test images, scaled the same way as SignLanguagePredictor.predict."""
+    paths = []
+    for dirpath, _, filenames in os.walk(directory):
+        for file in filenames:
+            if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                paths.append(os.path.join(dirpath, file))
+    paths.sort()
+    random.Random(seed).shuffle(paths)
+
+    images = []
+    for path in paths[:limit]:
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        img = cv2.resize(img, (size, size))
+        images.append(img.reshape(1, size, size, 1).astype('float32') / 255.0)
+    return images
+
+
+def convert(model, calibration=None):
+    """Float32 conversion, or full-integer int8 when calibration images are given."""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if calibration is not None:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([img] for img in calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--int8', action='store_true', help="also write int8-quantized models")
+    parser.add_argument('--calibration-dir', default=config.TEST2_DIR)
+    parser.add_argument('--calibration-samples', type=int, default=200)
+    args = parser.parse_args()
+
+    models = [
+        (config.MODEL_BW_JSON, config.MODEL_BW_H5, config.MODEL_BW_TFLITE, config.MODEL_BW_INT8_TFLITE),
+        (config.MODEL_BW_DRU_JSON, config.MODEL_BW_DRU_H5, config.MODEL_BW_DRU_TFLITE, config.MODEL_BW_DRU_INT8_TFLITE),
+    ]
+
+    # Models can differ in input size (e.g. a distilled main model), so calibrate per size
+    calibration_sets = {}
+
+    def calibration_for(model):
+        if not args.int8:
+            return None
+        size = model.input_shape[1]
+        if size not in calibration_sets:
+            images = calibration_images(args.calibration_dir, args.calibration_samples, size=size)
+            if not images:
+                raise SystemExit(f"No calibration images found in {args.calibration_dir}")
+            print(f"Calibrating int8 models at {size}px on {len(images)} images from {args.calibration_dir}")
+            calibration_sets[size] = images
+        return calibration_sets[size]
+
+    loaded = []
+    for json_path, weights_path, float_path, int8_path in models:
+        model = load_keras_model(json_path, weights_path)
+        loaded.append(model)
+        with open(float_path, 'wb') as f:
+            f.write(convert(model))
+        print(f"Saved {float_path}")
+        if args.int8:
+            with open(int8_path, 'wb') as f:
+                f.write(convert(model, calibration_for(model)))
+            print(f"Saved {int8_path}")
+
+    fused = fuse_keras_models(loaded)
+    with open(config.MODEL_FUSED_TFLITE, 'wb') as f:
+        f.write(convert(fused))
+    print(f"Saved {config.MODEL_FUSED_TFLITE}")
+    if args.int8:
+        with open(config.MODEL_FUSED_INT8_TFLITE, 'wb') as f:
+            f.write(convert(fused, calibration_for(fused)))
+        print(f"Saved {config.MODEL_FUSED_INT8_TFLITE}")
+
+if __name__ == "__main__":
+    main()
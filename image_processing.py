@@ -1,16 +1,89 @@
 import cv2
+import numpy as np
 import config
 
-def func(path):    
-    frame = cv2.imread(path)
-    if frame is None:
-        return None
-    
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+def roi_box(frame_shape):
+    """(x1, y1, x2, y2) of the hand region the live app reads: a square in the top right corner."""
+    height, width = frame_shape[:2]
+    roi_size = int(min(height, width) * 0.4)
+    x1 = width - roi_size - 20
+    y1 = 20
+    x2 = width - 20
+    y2 = y1 + roi_size
+    return x1, y1, x2, y2
+
+def threshold_roi(roi):
+    """BGR hand crop -> black/white image the models are trained on."""
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
     blur = cv2.GaussianBlur(gray,(5,5),2)
 
     th3 = cv2.adaptiveThreshold(blur,255,cv2.ADAPTIVE_THRESH_GAUSSIAN_C,cv2.THRESH_BINARY_INV,11,2)
     ret, res = cv2.threshold(th3, config.MIN_VALUE, 255, cv2.THRESH_BINARY_INV+cv2.THRESH_OTSU)
     return res
 
+class BufferRing:
+    """A fixed set of same-shape arrays handed out in turn, for images passed to other threads.
+
+    A buffer is only written again after `size - 1` newer ones were handed out, so a reader
+    that is done with an image before then never sees it change.
+    """
+
+    def __init__(self, size=4):
+        self.size = size
+        self._buffers = []
+        self._next = 0
+
+    def next(self, shape, dtype=np.uint8):
+        if not self._buffers or self._buffers[0].shape != shape or self._buffers[0].dtype != dtype:
+            self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self.size)]
+        buf = self._buffers[self._next]
+        self._next = (self._next + 1) % self.size
+        return buf
+
+class RoiThresholder:
+    """threshold_roi for a stream of same-size crops: intermediates are allocated once.
+
+    Results go into `out` when given, otherwise into a BufferRing of `keep` images, so a
+    caller may hold on to the last keep - 1 of them.
+    """
+
+    def __init__(self, keep=4):
+        self._out = BufferRing(keep)
+        self._shape = None
+
+    def __call__(self, roi, out=None):
+        shape = roi.shape[:2]
+        if shape != self._shape:
+            self._shape = shape
+            self._gray = np.empty(shape, dtype=np.uint8)
+            self._blur = np.empty(shape, dtype=np.uint8)
+            self._th3 = np.empty(shape, dtype=np.uint8)
+        cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.GaussianBlur(self._gray, (5, 5), 2, dst=self._blur)
+        cv2.adaptiveThreshold(self._blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2,
+                              dst=self._th3)
+        res = self._out.next(shape) if out is None else out
+        cv2.threshold(self._th3, config.MIN_VALUE, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=res)
+        return res
+
+def resize_batch(arr, size):
+    """(N, H, W, C) float batch resized to size x size with cv2.resize, as the predictor does."""
+    arr = np.asarray(arr, dtype=np.float32)
+    if arr.shape[1:3] == (size, size):
+        return arr
+    out = np.empty((arr.shape[0], size, size, arr.shape[3]), dtype=np.float32)
+    for i, img in enumerate(arr):
+        out[i] = cv2.resize(img, (size, size), interpolation=cv2.INTER_LINEAR).reshape(size, size, -1)
+    return out
+
+def roi_signature(roi, size=config.GATE_SIZE, out=None):
+    """Thresholded ROI averaged down to size x size (uint8), for cheap change detection."""
+    return cv2.resize(roi, (size, size), dst=out, interpolation=cv2.INTER_AREA)
+
+def func(path):    
+    frame = cv2.imread(path)
+    if frame is None:
+        return None
+    return threshold_roi(frame)
+
 
@@ -0,0 +1,174 @@
+"""Stage timings, counters and rates for the live app, with Prometheus text export.
+
+Stages are timed with time.monotonic() by the code that runs them and recorded with
+Metrics.observe(stage, seconds). Each stage keeps its last `window` samples in a ring
+buffer, so percentiles describe recent behaviour and recording never allocates.
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+
+class RollingHistogram:
+    """The last `size` observations of one value, for percentiles over a sliding window."""
+
+    def __init__(self, size=512):
+        self._values = np.zeros(size, dtype=np.float64)
+        self._next = 0
+        self._filled = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self._filled = min(self._filled + 1, len(self._values))
+        self.count += 1
+        self.total += value
+
+    def percentiles(self, qs=(50, 95)):
+        if self._filled == 0:
+            return [0.0] * len(qs)
+        return np.percentile(self._values[:self._filled], qs).tolist()
+
+
+class Metrics:
+    """Thread-safe registry of stage histograms (seconds), counters and gauge callbacks."""
+
+    def __init__(self, window=512):
+        self.window = window
+        self._stages = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = RollingHistogram(self.window)
+            hist.add(seconds)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def gauge(self, name, fn):
+        """Register fn() as the current value of `name`, read at snapshot time (e.g. an fps RateCounter)."""
+        self._gauges[name] = fn
+
+    def snapshot(self):
+        """{'stages': {stage: {p50, p95, p99, count, sum}}, 'counters': {...}, 'gauges': {...}}, times in seconds."""
+        with self._lock:
+            stages = {}
+            for stage, hist in self._stages.items():
+                p50, p95, p99 = hist.percentiles((50, 95, 99))
+                stages[stage] = {'p50': p50, 'p95': p95, 'p99': p99, 'count': hist.count, 'sum': hist.total}
+            counters = dict(self._counters)
+        gauges = {}
+        for name, fn in list(self._gauges.items()):
+            try:
+                gauges[name] = float(fn())
+            except Exception:
+                pass
+        return {'stages': stages, 'counters': counters, 'gauges': gauges}
+
+    def prometheus_text(self, prefix='signlang'):
+        snap = self.snapshot()
+        out = [f"# TYPE {prefix}_stage_seconds summary"]
+        for stage, s in sorted(snap['stages'].items()):
+            for q, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+                out.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {s[key]:.6f}')
+            out.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {s["sum"]:.6f}')
+            out.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+        for name, value in sorted(snap['counters'].items()):
+            out.append(f"# TYPE {prefix}_{name}_total counter")
+            out.append(f"{prefix}_{name}_total {value}")
+        for name, value in sorted(snap['gauges'].items()):
+            out.append(f"# TYPE {prefix}_{name} gauge")
+            out.append(f"{prefix}_{name} {value:.3f}")
+        return "\n".join(out) + "\n"
+
+
+class MetricsFileWriter:
+    """Rewrites a Prometheus text file every `interval` seconds (e.g. for node_exporter's textfile collector)."""
+
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-file", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(1.0)
+
+    def write(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.metrics.prometheus_text())
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Metrics export to {self.path} failed: {e}")
+
+
+class MetricsServer:
+    """Serves GET /metrics in Prometheus text format on localhost."""
+
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        registry = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Stopwatch:
+    """t = Stopwatch(); ...; t.lap(metrics, 'stage') records the time since the last lap."""
+
+    __slots__ = ('_last',)
+
+    def __init__(self):
+        self._last = time.monotonic()
+
+    def lap(self, metrics, stage):
+        now = time.monotonic()
+        if metrics is not None:
+            metrics.observe(stage, now - self._last)
+        self._last = now
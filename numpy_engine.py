@@ -0,0 +1,241 @@
+"""Pure-NumPy inference for the Sequential CNNs trained by train.py.
+
+Loads the architecture from the Keras JSON and the weights from the Keras HDF5 file
+(needs only h5py), or everything from an .npz exported by this module:
+
+    python numpy_engine.py    # writes MODEL_BW_NPZ and MODEL_BW_DRU_NPZ from the Keras files
+"""
+import json
+import os
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from image_processing import resize_batch
+import config
+
+# Layers that only matter during training
+_PASSTHROUGH = {'InputLayer', 'Dropout'}
+
+
+def _activation(x, name):
+    if name in (None, 'linear'):
+        return x
+    if name == 'relu':
+        return np.maximum(x, 0.0, out=x)
+    if name == 'sigmoid':
+        return 1.0 / (1.0 + np.exp(-x))
+    if name == 'softmax':
+        x = x - x.max(axis=-1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=-1, keepdims=True)
+        return x
+    raise ValueError(f"Unsupported activation: {name}")
+
+
+def _pad_same(x, kh, kw, sh, sw):
+    h, w = x.shape[1:3]
+    ph = max((-(-h // sh) - 1) * sh + kh - h, 0)
+    pw = max((-(-w // sw) - 1) * sw + kw - w, 0)
+    if ph == 0 and pw == 0:
+        return x
+    return np.pad(x, ((0, 0), (ph // 2, ph - ph // 2), (pw // 2, pw - pw // 2), (0, 0)))
+
+
+def conv2d(x, kernel, bias, strides=(1, 1), padding='valid'):
+    """NHWC convolution: im2col through a strided window view, then one matmul."""
+    kh, kw = kernel.shape[:2]
+    sh, sw = strides
+    if padding == 'same':
+        x = _pad_same(x, kh, kw, sh, sw)
+    windows = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::sh, ::sw]  # N, H', W', C, kh, kw
+    out = np.tensordot(windows, kernel, axes=([4, 5, 3], [0, 1, 2]))
+    if bias is not None:
+        out += bias
+    return out
+
+
+def depthwise_conv2d(x, kernel, bias=None, strides=(1, 1), padding='valid'):
+    """NHWC depthwise convolution, kernel (kh, kw, C, multiplier); output channels are C * multiplier."""
+    kh, kw, c, mult = kernel.shape
+    sh, sw = strides
+    if padding == 'same':
+        x = _pad_same(x, kh, kw, sh, sw)
+    windows = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::sh, ::sw]  # N, H', W', C, kh, kw
+    out = np.einsum('nhwcij,ijcm->nhwcm', windows, kernel, optimize=True)
+    out = out.reshape(out.shape[:3] + (c * mult,))
+    if bias is not None:
+        out += bias
+    return out
+
+
+def max_pool2d(x, pool_size=(2, 2), strides=None, padding='valid'):
+    ph, pw = pool_size
+    sh, sw = strides or pool_size
+    if padding == 'same':
+        x = _pad_same(x, ph, pw, sh, sw)  # zero padding is safe after ReLU
+    if (sh, sw) == (ph, pw):
+        n, h, w, c = x.shape
+        h, w = h // ph, w // pw
+        return x[:, :h * ph, :w * pw].reshape(n, h, ph, w, pw, c).max(axis=(2, 4))
+    return sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::sh, ::sw].max(axis=(4, 5))
+
+
+class NumpyModel:
+    """A Sequential model as a list of (layer type, config, weights) run with NumPy.
+
+    Exposes predict(arr) like a Keras model so SignLanguagePredictor can use it directly.
+    """
+
+    def __init__(self, layers):
+        self.layers = layers
+        self.input_shape = None
+        for _, cfg, _ in layers:
+            shape = cfg.get('batch_input_shape')
+            if shape:
+                self.input_shape = tuple(shape)
+                break
+
+    @classmethod
+    def from_keras_files(cls, json_path, weights_path):
+        import h5py
+
+        with open(json_path, 'r') as jf:
+            spec = json.load(jf)
+        layer_specs = spec['config']['layers'] if isinstance(spec['config'], dict) else spec['config']
+
+        with h5py.File(weights_path, 'r') as f:
+            group = f['model_weights'] if 'model_weights' in f else f
+            weights = {}
+            for name in group.attrs.get('layer_names', []):
+                name = name.decode('utf-8') if isinstance(name, bytes) else name
+                weight_names = group[name].attrs.get('weight_names', [])
+                weights[name] = [np.asarray(group[name][w.decode('utf-8') if isinstance(w, bytes) else w],
+                                            dtype=np.float32) for w in weight_names]
+
+        layers = []
+        for layer in layer_specs:
+            cfg = layer['config']
+            layers.append((layer['class_name'], cfg, weights.get(cfg.get('name'), [])))
+        return cls(layers)
+
+    @classmethod
+    def from_npz(cls, path):
+        data = np.load(path)
+        specs = json.loads(str(data['__layers__']))
+        layers = []
+        for i, (kind, cfg, n_weights) in enumerate(specs):
+            layers.append((kind, cfg, [data[f'{i}_{j}'] for j in range(n_weights)]))
+        return cls(layers)
+
+    def save_npz(self, path):
+        arrays = {}
+        specs = []
+        for i, (kind, cfg, weights) in enumerate(self.layers):
+            specs.append((kind, cfg, len(weights)))
+            for j, w in enumerate(weights):
+                arrays[f'{i}_{j}'] = w
+        np.savez(path, __layers__=json.dumps(specs), **arrays)
+
+    def predict(self, arr, verbose=0):
+        x = np.asarray(arr, dtype=np.float32)
+        for kind, cfg, weights in self.layers:
+            if kind in _PASSTHROUGH:
+                continue
+            if kind in ('Conv2D', 'Convolution2D'):
+                bias = weights[1] if cfg.get('use_bias', True) else None
+                x = conv2d(x, weights[0], bias, tuple(cfg.get('strides', (1, 1))), cfg.get('padding', 'valid'))
+                x = _activation(x, cfg.get('activation'))
+            elif kind == 'SeparableConv2D':
+                strides = tuple(cfg.get('strides', (1, 1)))
+                x = depthwise_conv2d(x, weights[0], None, strides, cfg.get('padding', 'valid'))
+                x = x @ weights[1][0, 0]
+                if cfg.get('use_bias', True):
+                    x += weights[2]
+                x = _activation(x, cfg.get('activation'))
+            elif kind == 'DepthwiseConv2D':
+                bias = weights[1] if cfg.get('use_bias', True) else None
+                x = depthwise_conv2d(x, weights[0], bias, tuple(cfg.get('strides', (1, 1))),
+                                     cfg.get('padding', 'valid'))
+                x = _activation(x, cfg.get('activation'))
+            elif kind == 'GlobalAveragePooling2D':
+                x = x.mean(axis=(1, 2), keepdims=cfg.get('keepdims', False))
+            elif kind == 'GlobalMaxPooling2D':
+                x = x.max(axis=(1, 2), keepdims=cfg.get('keepdims', False))
+            elif kind == 'MaxPooling2D':
+                strides = cfg.get('strides')
+                x = max_pool2d(x, tuple(cfg['pool_size']), tuple(strides) if strides else None,
+                               cfg.get('padding', 'valid'))
+            elif kind == 'Flatten':
+                x = x.reshape(x.shape[0], -1)
+            elif kind == 'Dense':
+                x = x @ weights[0]
+                if cfg.get('use_bias', True):
+                    x += weights[1]
+                x = _activation(x, cfg.get('activation'))
+            elif kind == 'Activation':
+                x = _activation(x, cfg['activation'])
+            else:
+                raise ValueError(f"Unsupported layer: {kind}")
+        return x
+
+
+def _same_layer(a, b):
+    kind_a, cfg_a, weights_a = a
+    kind_b, cfg_b, weights_b = b
+    if kind_a != kind_b or len(weights_a) != len(weights_b):
+        return False
+    strip = lambda cfg: {k: v for k, v in cfg.items() if k != 'name'}
+    if strip(cfg_a) != strip(cfg_b):
+        return False
+    return all(wa.shape == wb.shape and np.array_equal(wa, wb) for wa, wb in zip(weights_a, weights_b))
+
+
+class FusedModel:
+    """Several NumpyModels on one input, outputs concatenated.
+
+    Leading layers that are identical in every model (same config and weights, as with
+    a shared trunk) are computed once. The input is sized for the largest model; models
+    with a smaller input get it resized.
+    """
+
+    def __init__(self, models):
+        shared = 0
+        while (all(shared < len(m.layers) for m in models)
+               and all(_same_layer(models[0].layers[shared], m.layers[shared]) for m in models[1:])):
+            shared += 1
+        self.shared_layers = shared
+        self.trunk = NumpyModel(models[0].layers[:shared])
+        self.heads = [NumpyModel(m.layers[shared:]) for m in models]
+        self.head_sizes = [m.input_shape[1] if m.input_shape else None for m in models]
+        self.input_shape = max((m.input_shape for m in models if m.input_shape), key=lambda s: s[1], default=None)
+
+    def predict(self, arr, verbose=0):
+        x = self.trunk.predict(arr)
+        outputs = []
+        for head, size in zip(self.heads, self.head_sizes):
+            head_input = x
+            if not self.trunk.layers and size and size != x.shape[1]:
+                head_input = resize_batch(x, size)
+            outputs.append(head.predict(head_input))
+        return np.concatenate(outputs, axis=-1)
+
+
+def load_model(npz_path, json_path, weights_path):
+    """Prefer the exported .npz, fall back to the Keras JSON + HDF5 pair."""
+    if os.path.exists(npz_path):
+        return NumpyModel.from_npz(npz_path)
+    if not os.path.exists(json_path) or not os.path.exists(weights_path):
+        raise FileNotFoundError(f"Missing model files: {npz_path}, or {json_path} and {weights_path}")
+    return NumpyModel.from_keras_files(json_path, weights_path)
+
+
+def main():
+    for json_path, weights_path, npz_path in [
+        (config.MODEL_BW_JSON, config.MODEL_BW_H5, config.MODEL_BW_NPZ),
+        (config.MODEL_BW_DRU_JSON, config.MODEL_BW_DRU_H5, config.MODEL_BW_DRU_NPZ),
+    ]:
+        NumpyModel.from_keras_files(json_path, weights_path).save_npz(npz_path)
+        print(f"Saved {npz_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+import cv2
+import numpy as np
+from image_processing import roi_box, roi_signature, RoiThresholder
+from metrics import Stopwatch
+import config
+
+PipelineResult = namedtuple('PipelineResult', 'frame_id processed_roi symbol prob')
+
+
+class RateCounter:
+    """Events per second over a sliding time window; safe to tick from any thread."""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self._times = deque()
+        self._lock = threading.Lock()
+
+    def tick(self):
+        now = time.monotonic()
+        with self._lock:
+            self._times.append(now)
+            self._trim(now)
+
+    def rate(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            if len(self._times) < 2:
+                return 0.0
+            span = self._times[-1] - self._times[0]
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+    def _trim(self, now):
+        while self._times and now - self._times[0] > self.window:
+            self._times.popleft()
+
+
+class ChangeGate:
+    """Decides whether a thresholded ROI differs enough from the last predicted one to run the model.
+
+    ROIs are compared as GATE_SIZE x GATE_SIZE averages, which smooths out the pixel flicker of
+    the threshold. Comparing against the last *predicted* ROI (not the previous frame) means
+    slow drift still triggers a new prediction once it adds up.
+    """
+
+    def __init__(self, threshold=config.GATE_THRESHOLD, size=config.GATE_SIZE):
+        self.threshold = threshold
+        self.size = size
+        self.executed = 0
+        self.skipped = 0
+        # Two signature buffers, swapped when a prediction is stored
+        self._signature = np.empty((size, size), dtype=np.uint8)
+        self._last = np.empty((size, size), dtype=np.uint8)
+        self._last_result = None
+
+    def reset(self):
+        self._last_result = None
+
+    def lookup(self, roi):
+        """(signature, cached (symbol, prob) or None). Pass the signature to store() after predicting."""
+        signature = roi_signature(roi, self.size, out=self._signature)
+        # L1 norm / pixels = mean absolute difference, without temporary arrays
+        if (self._last_result is not None
+                and cv2.norm(signature, self._last, cv2.NORM_L1) < self.threshold * signature.size):
+            self.skipped += 1
+            return signature, self._last_result
+        return signature, None
+
+    def store(self, signature, result):
+        self.executed += 1
+        if signature is self._signature:
+            self._signature, self._last = self._last, self._signature
+        else:
+            np.copyto(self._last, signature)
+        self._last_result = result
+
+
+class LeasedBuffers:
+    """Reused same-shape image buffers for images read on other threads.
+
+    A reader takes a lease() on an image and release()s it when done. free() only hands out
+    buffers without leases, and adds a buffer when every one is held, so an image never
+    changes under a reader however far it falls behind.
+    """
+
+    def __init__(self, size=4):
+        self.size = size
+        self._lock = threading.Lock()
+        self._buffers = []
+        self._leases = []
+        self._next = 0
+
+    def free(self, shape, dtype=np.uint8):
+        """A buffer nobody holds a lease on, for the producer to write the next image into."""
+        with self._lock:
+            if not self._buffers or self._buffers[0].shape != shape or self._buffers[0].dtype != dtype:
+                # Readers keep their (now untracked) old buffers alive until they drop them
+                self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self.size)]
+                self._leases = [0] * self.size
+                self._next = 0
+            for k in range(len(self._buffers)):
+                i = (self._next + k) % len(self._buffers)
+                if self._leases[i] == 0:
+                    self._next = (i + 1) % len(self._buffers)
+                    return self._buffers[i]
+            self._buffers.append(np.empty(shape, dtype=dtype))
+            self._leases.append(0)
+            return self._buffers[-1]
+
+    def lease(self, buf):
+        """Keep buf from being handed out by free(); returns buf. None is ignored."""
+        self._count(buf, 1)
+        return buf
+
+    def release(self, buf):
+        """End one lease() of buf; None and untracked buffers are ignored."""
+        self._count(buf, -1)
+
+    def leases(self):
+        with self._lock:
+            return list(self._leases)
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def _count(self, buf, delta):
+        if buf is None:
+            return
+        with self._lock:
+            for i, b in enumerate(self._buffers):
+                if b is buf:
+                    self._leases[i] += delta
+                    return
+
+
+class FrameGrabber:
+    """Reads the camera as fast as it delivers and keeps only the newest (mirrored) frame.
+
+    Frames are mirrored into a small set of reused buffers. latest() and wait_newer() lease the
+    frame they return: its buffer is not written again until the reader passes it to release(),
+    however far the reader falls behind.
+    """
+
+    def __init__(self, capture, metrics=None, keep=4):
+        self.capture = capture
+        self.metrics = metrics
+        # cv2.VideoCapture can decode into the previous frame's array instead of a new one
+        self._read_into = isinstance(capture, cv2.VideoCapture)
+        self._raw = None
+        # The published frame holds a lease of its own until a newer one replaces it
+        self.buffers = LeasedBuffers(keep)
+        self.rate = RateCounter()
+        self.failed = False
+        self._running = True
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self._thread = threading.Thread(target=self._run, name="grabber", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def latest(self):
+        """(frame_id, frame) of the newest frame; frame is None before the first read.
+
+        Pass the frame to release() when done with it.
+        """
+        with self._cond:
+            return self._frame_id, self.buffers.lease(self._frame)
+
+    def wait_newer(self, frame_id, timeout=0.5):
+        """Like latest(), after waiting up to timeout for a frame newer than frame_id."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame_id > frame_id or self.failed or not self._running, timeout)
+            return self._frame_id, self.buffers.lease(self._frame)
+
+    def release(self, frame):
+        """End the lease of a frame from latest() or wait_newer(); None is ignored."""
+        self.buffers.release(frame)
+
+    def _run(self):
+        while self._running:
+            watch = Stopwatch()
+            if self._read_into and self._raw is not None:
+                ok, raw = self.capture.read(self._raw)
+            else:
+                ok, raw = self.capture.read()
+            if not ok:
+                with self._cond:
+                    self.failed = True
+                    self._cond.notify_all()
+                return
+            self._raw = raw
+            watch.lap(self.metrics, 'capture')
+            frame = self.buffers.free(raw.shape)
+            cv2.flip(raw, 1, dst=frame)
+            watch.lap(self.metrics, 'flip')
+            with self._cond:
+                self.buffers.lease(frame)
+                self.buffers.release(self._frame)
+                self._frame = frame
+                self._frame_id += 1
+                self._cond.notify_all()
+            self.rate.tick()
+
+
+class InferenceWorker:
+    """Thresholds the ROI of the newest grabbed frame and runs the predictor on it.
+
+    Frames that arrive while a prediction is running are skipped. Results go into a bounded
+    queue (oldest dropped when full). Confirmed letters go into their own queue so that
+    dropping a result never loses one.
+    """
+
+    def __init__(self, grabber, predictor, maxsize=2, metrics=None, gate=None):
+        self.grabber = grabber
+        self.predictor = predictor
+        self.metrics = metrics
+        # Optional ChangeGate: unchanged ROIs reuse the previous prediction
+        self.gate = gate
+        self.thresholder = RoiThresholder()
+        # Queued results hold a lease on their ROI, handed on to whoever takes them from latest_result()
+        self.rois = LeasedBuffers(maxsize + 2)
+        self.results = queue.Queue(maxsize=maxsize)
+        self.letters = queue.Queue()
+        self.rate = RateCounter()
+        self.skipped_frames = 0
+        self.dropped_results = 0
+        self.error = None
+        self._reset_requested = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def reset(self):
+        """Start over, e.g. when the sentence is cleared: drop pending letters, and before the next
+        frame forget the predictor's confirmation state and the gate's cached prediction."""
+        self._reset_requested = True
+        self.take_letters()
+
+    def latest_result(self):
+        """Newest finished result, or None if nothing new arrived since the last call.
+
+        Pass the result to release() when done with its processed_roi.
+        """
+        result = None
+        while True:
+            try:
+                newer = self.results.get_nowait()
+            except queue.Empty:
+                return result
+            self.release(result)
+            result = newer
+
+    def release(self, result):
+        """End the lease a result from latest_result() holds on its ROI; None is ignored."""
+        if result is not None:
+            self.rois.release(result.processed_roi)
+
+    def take_letters(self, with_evidence=False):
+        """Letters confirmed since the last call; with_evidence pairs each with its probability vector or None."""
+        letters = []
+        while True:
+            try:
+                letter, evidence = self.letters.get_nowait()
+            except queue.Empty:
+                return letters
+            letters.append((letter, evidence) if with_evidence else letter)
+
+    def _run(self):
+        last_id = 0
+        while self._running:
+            frame_id, frame = self.grabber.wait_newer(last_id)
+            if frame is None or frame_id == last_id:
+                self.grabber.release(frame)
+                if self.grabber.failed:
+                    return
+                continue
+            self.skipped_frames += frame_id - last_id - 1
+            last_id = frame_id
+
+            watch = Stopwatch()
+            try:
+                x1, y1, x2, y2 = roi_box(frame.shape)
+                roi = frame[y1:y2, x1:x2]
+                processed_roi = self.thresholder(roi, out=self.rois.free(roi.shape[:2]))
+            finally:
+                self.grabber.release(frame)
+            watch.lap(self.metrics, 'threshold')
+            if self._reset_requested:
+                # On this thread, so a prediction in progress never sees half-reset state
+                self._reset_requested = False
+                if hasattr(self.predictor, 'reset_state'):
+                    self.predictor.reset_state()
+                if self.gate is not None:
+                    self.gate.reset()
+                # Letters confirmed by the frame that was in flight during reset()
+                self.take_letters()
+            # Letter confirmation uses the full probability vector of every frame (letter_evidence)
+            with_proba = hasattr(self.predictor, 'letter_evidence')
+            try:
+                prediction = self._predict(processed_roi, with_proba)
+            except Exception as e:
+                print(f"Prediction failed: {e}")
+                self.error = e
+                return
+            watch.lap(self.metrics, 'predict')
+            symbol, prob = prediction[:2]
+            # A reused prediction still counts towards the debouncer's consecutive frames
+            if symbol is not None:
+                if with_proba:
+                    confirmed_char = self.predictor.process_prediction(symbol, prediction[2])
+                else:
+                    confirmed_char = self.predictor.process_prediction(symbol)
+                if confirmed_char:
+                    self.letters.put((confirmed_char, getattr(self.predictor, 'letter_evidence', None)))
+            watch.lap(self.metrics, 'process_prediction')
+            self.rate.tick()
+            self._publish(PipelineResult(frame_id, processed_roi, symbol, prob))
+
+    def _predict(self, processed_roi, with_proba=False):
+        predict_args = (processed_roi, True) if with_proba else (processed_roi,)
+        if self.gate is None:
+            return self.predictor.predict(*predict_args)
+        signature, cached = self.gate.lookup(processed_roi)
+        if cached is not None:
+            if self.metrics is not None:
+                self.metrics.increment('inferences_skipped')
+            return cached
+        result = self.predictor.predict(*predict_args)
+        self.gate.store(signature, result)
+        if self.metrics is not None:
+            self.metrics.increment('inferences_executed')
+        return result
+
+    def _publish(self, result):
+        self.rois.lease(result.processed_roi)
+        while True:
+            try:
+                self.results.put_nowait(result)
+                return
+            except queue.Full:
+                try:
+                    self.release(self.results.get_nowait())
+                    self.dropped_results += 1
+                except queue.Empty:
+                    pass
@@ -1,80 +1,214 @@
-import cv2
+"""Threshold the collected images in data/train into data2/train and data2/test.
+
+    python preprocessing.py                # all cores, only new or changed images
+    python preprocessing.py --full         # ignore the manifest and redo everything
+    python preprocessing.py --workers 1    # in this process, no pool
+    python preprocessing.py --pack         # also write the packed arrays train.py --data packed reads
+
+data2/manifest.json records every source image (mtime, size, content hash) and the file
+written for it. Reruns skip images whose mtime and size are unchanged (or whose content hash
+still matches) and delete outputs whose source is gone. Without a manifest (or after the
+settings changed) every image in data2/train and data2/test that the run does not write is
+deleted, so outputs of an older split never stay behind in the other split. An image goes to train or test based
+on a hash of its class and file name, so the split does not depend on which files exist.
+"""
+import argparse
+import hashlib
+import json
 import os
-from image_processing import func
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from image_processing import threshold_roi
+from dataset import pack_dataset
 import config
 
-def preprocess_data():
-    if not os.path.exists(config.DATA2_DIR):
-        os.makedirs(config.DATA2_DIR)
-    if not os.path.exists(config.TRAIN2_DIR):
-        os.makedirs(config.TRAIN2_DIR)
-    if not os.path.exists(config.TEST2_DIR):
-        os.makedirs(config.TEST2_DIR)
-
-    path = config.TRAIN_DIR
-    path1 = config.DATA2_DIR
-
-    var = 0
-    c1 = 0
-    c2 = 0
-
-    print(f"Processing data from {path}...")
-
-    for (dirpath, dirnames, filenames) in os.walk(path):
-        for dirname in dirnames:
-            print(f"Processing class: {dirname}")
-            
-            train_dir_path = os.path.join(config.TRAIN2_DIR, dirname)
-            test_dir_path = os.path.join(config.TEST2_DIR, dirname)
-
-            if not os.path.exists(train_dir_path):
-                os.makedirs(train_dir_path)
-            if not os.path.exists(test_dir_path):
-                os.makedirs(test_dir_path)
-
-            # Logic to split data: 75% train, 25% test (or custom logic)
-            # The original code had a weird logic with 'num', let's make it standard split if needed
-            # But original code seemed to want to put everything in train or split by count?
-            # It had `num = 100000000000000000` which means everything goes to c1 (train)
-            # I will keep the logic simple: just process images. 
-            # If the user wants to split, they should probably do it explicitly.
-            # For now, I'll stick to the original behavior of putting everything in 'train' 
-            # unless we want to implement a real split. 
-            # Actually, let's implement a 80-20 split for better practice if the source is just 'train'.
-            
-            files = os.listdir(os.path.join(path, dirname))
-            total_files = len(files)
-            split_idx = int(total_files * 0.8)
-
-            for i, file in enumerate(files):
-                var += 1
-                actual_path = os.path.join(path, dirname, file)
-                
-                # Skip if not an image
-                if not file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    continue
-
-                bw_image = func(actual_path)
-                if bw_image is None:
-                    continue
-
-                if i < split_idx:
-                    c1 += 1
-                    target_path = os.path.join(train_dir_path, file)
-                else:
-                    c2 += 1
-                    target_path = os.path.join(test_dir_path, file)
-                
-                cv2.imwrite(target_path, bw_image)
-
-    print(f"Total processed: {var}")
-    print(f"Train images: {c1}")
-    print(f"Test images: {c2}")
-
-if __name__ == "__main__":
-    preprocess_data()
-
-
-
+# Bump when the output of threshold_roi changes so old outputs get rebuilt
+MANIFEST_VERSION = 1
+TEST_PERCENT = 20
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def split_for(class_name, file_name):
+    """'train' or 'test', fixed for a given class and file name."""
+    bucket = zlib.crc32(f"{class_name}/{file_name}".encode('utf-8')) % 100
+    return 'test' if bucket < TEST_PERCENT else 'train'
+
+
+def _settings():
+    return {'version': MANIFEST_VERSION, 'min_value': config.MIN_VALUE, 'test_percent': TEST_PERCENT}
+
+
+def load_manifest(path):
+    """The manifest at path, or None when it is missing, unreadable or was written with other settings."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable manifest {path}: {e}")
+        return None
+    if manifest.get('settings') != _settings():
+        print("Preprocessing settings changed, rebuilding every image.")
+        return None
+    return manifest
+
+
+def save_manifest(manifest, path):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+def _process_chunk(jobs):
+    """Worker: threshold each (source, output, previous hash) job.
+
+    Returns (source, hash, status) with status 'processed', 'unchanged' or 'failed'.
+    """
+    results = []
+    for src, dst, old_hash in jobs:
+        try:
+            with open(src, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Error reading {src}: {e}")
+            results.append((src, None, 'failed'))
+            continue
+        digest = hashlib.sha1(data).hexdigest()
+        if digest == old_hash and os.path.exists(dst):
+            results.append((src, digest, 'unchanged'))
+            continue
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            results.append((src, digest, 'failed'))
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        ok = cv2.imwrite(dst, threshold_roi(frame))
+        results.append((src, digest, 'processed' if ok else 'failed'))
+    return results
+
+
+def _remove_output(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_untracked(output_dir, keep):
+    """Delete every image under output_dir/train and output_dir/test that is not in keep."""
+    removed = 0
+    for split in ('train', 'test'):
+        for root, _, files in os.walk(os.path.join(output_dir, split)):
+            for file in files:
+                path = os.path.join(root, file)
+                if file.lower().endswith(IMAGE_EXTENSIONS) and path not in keep:
+                    _remove_output(path)
+                    removed += 1
+    return removed
+
+
+def preprocess_data(source_dir=config.TRAIN_DIR, output_dir=config.DATA2_DIR, workers=None,
+                    chunk_size=256, full=False, manifest_path=None):
+    start = time.perf_counter()
+    manifest_path = manifest_path or os.path.join(output_dir, 'manifest.json')
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = None if full else load_manifest(manifest_path)
+    # Without a manifest nothing in data2 is known to be current, e.g. files of an older split
+    untracked = manifest is None
+    if untracked:
+        manifest = {'settings': _settings(), 'files': {}}
+    entries = manifest['files']
+
+    print(f"Processing data from {source_dir}...")
+    seen = set()
+    chunks = []
+    stats = {'processed': 0, 'unchanged': 0, 'failed': 0, 'removed': 0}
+    for class_name in sorted(os.listdir(source_dir)):
+        class_dir = os.path.join(source_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        jobs = []
+        for file in sorted(os.listdir(class_dir)):
+            if not file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            rel = f"{class_name}/{file}"
+            seen.add(rel)
+            src = os.path.join(class_dir, file)
+            st = os.stat(src)
+            split = split_for(class_name, file)
+            dst = os.path.join(output_dir, split, class_name, file)
+            entry = entries.get(rel)
+            if entry and entry['output'] != dst:
+                _remove_output(entry['output'])
+                entry = None
+            if (entry and entry['hash'] and entry['mtime'] == st.st_mtime and entry['size'] == st.st_size
+                    and os.path.exists(dst)):
+                stats['unchanged'] += 1
+                continue
+            entries[rel] = {'mtime': st.st_mtime, 'size': st.st_size, 'hash': None, 'output': dst, 'split': split,
+                            'pending': True}
+            jobs.append((src, dst, entry['hash'] if entry else None))
+        # Chunks never mix classes, so a worker stays in one directory
+        chunks.extend(jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size))
+
+    for rel in [rel for rel in entries if rel not in seen]:
+        _remove_output(entries.pop(rel)['output'])
+        stats['removed'] += 1
+    if untracked:
+        stats['removed'] += _remove_untracked(output_dir, {entry['output'] for entry in entries.values()})
+
+    def record(results):
+        for src, digest, status in results:
+            rel = os.path.relpath(src, source_dir).replace(os.sep, '/')
+            entry = entries[rel]
+            entry.pop('pending', None)
+            if status == 'failed':
+                del entries[rel]
+            else:
+                entry['hash'] = digest
+            stats[status] += 1
+
+    try:
+        if workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                record(_process_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for results in pool.map(_process_chunk, chunks):
+                    record(results)
+    finally:
+        # Entries of jobs that never ran are dropped so the next run retries them
+        for rel in [rel for rel, entry in entries.items() if entry.get('pending')]:
+            del entries[rel]
+        save_manifest(manifest, manifest_path)
+
+    splits = {'train': 0, 'test': 0}
+    for entry in entries.values():
+        splits[entry['split']] += 1
+    print(f"Processed: {stats['processed']}, unchanged: {stats['unchanged']}, "
+          f"removed: {stats['removed']}, failed: {stats['failed']}")
+    print(f"Train images: {splits['train']}")
+    print(f"Test images: {splits['test']}")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=256, help="images per task sent to a worker")
+    parser.add_argument('--full', action='store_true', help="ignore the manifest and reprocess everything")
+    parser.add_argument('--pack', action='store_true', help=f"also pack data2 into memory-mapped arrays in {config.PACKED_DIR}")
+    args = parser.parse_args()
+    preprocess_data(workers=args.workers, chunk_size=args.chunk_size, full=args.full)
+    if args.pack:
+        pack_dataset(workers=args.workers)
 
 
+if __name__ == "__main__":
+    main()
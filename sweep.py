@@ -0,0 +1,152 @@
+"""Train a grid of input sizes and layer widths and compare accuracy against latency.
+
+    python sweep.py --sizes 64 96 128 --conv-widths 16,16 32,32 --epochs 3
+    python sweep.py --sizes 64 128 --dense-units 64 128,96,64 --workers 2 --output sweep.csv
+
+Every combination of --sizes, --conv-widths, --dense-units and --batch-sizes is one trial.
+Trials run in worker processes, each capped to its share of the CPU threads, and report
+validation accuracy, training time, parameter count, saved weight size and single-frame
+inference latency.
+"""
+import argparse
+import csv
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import config
+
+RESULT_FIELDS = ['img_size', 'conv_widths', 'dense_units', 'batch_size', 'epochs', 'val_accuracy',
+                 'train_seconds', 'params', 'weights_kb', 'latency_ms']
+
+
+def _int_list(text):
+    return tuple(int(v) for v in text.split(','))
+
+
+def grid(sizes, conv_widths, dense_units, batch_sizes, epochs):
+    return [dict(img_size=size, conv_widths=conv, dense_units=dense, batch_size=batch, epochs=epochs)
+            for size, conv, dense, batch in itertools.product(sizes, conv_widths, dense_units, batch_sizes)]
+
+
+def _limit_threads(threads):
+    # Must run before TensorFlow is imported in this process
+    for var in ('OMP_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_trial(trial, data='dirs', train_dir=config.TRAIN2_DIR, test_dir=config.TEST2_DIR,
+              packed_dir=config.PACKED_DIR):
+    """Train one configuration and return its row of the results table."""
+    import train
+    from dataset import PackedDataset
+
+    sz, batch_size = trial['img_size'], trial['batch_size']
+    if data == 'packed':
+        train_data = PackedDataset(os.path.join(packed_dir, 'train'))
+        test_data = PackedDataset(os.path.join(packed_dir, 'test'))
+        training_set, train_samples = train.tfdata_from_packed(train_data, batch_size, True, sz=sz)
+        test_set, test_samples = train.tfdata_from_packed(test_data, batch_size, False, sz=sz)
+        num_classes = train_data.num_classes
+    else:
+        training_set, train_samples, classes = train.tfdata_from_directory(train_dir, sz, batch_size, True)
+        test_set, test_samples, _ = train.tfdata_from_directory(test_dir, sz, batch_size, False,
+                                                                classes=classes, name='test')
+        num_classes = len(classes)
+
+    model = train.build_classifier(sz, num_classes, trial['conv_widths'], trial['dense_units'])
+    start = time.perf_counter()
+    history = train.train(model, training_set, test_set, train_samples, test_samples,
+                          batch_size=batch_size, epochs=trial['epochs'])
+    train_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as d:
+        weights_path = os.path.join(d, 'weights.h5')
+        model.save_weights(weights_path)
+        weights_kb = os.path.getsize(weights_path) / 1024
+
+    return dict(trial,
+                val_accuracy=float(history.history['val_accuracy'][-1]),
+                train_seconds=train_seconds,
+                params=model.count_params(),
+                weights_kb=weights_kb,
+                latency_ms=train.frame_latency_ms(model))
+
+
+def _run_in_worker(job):
+    trial, kwargs = job
+    try:
+        return run_trial(trial, **kwargs)
+    except Exception as e:
+        return dict(trial, error=str(e))
+
+
+def run_sweep(trials, workers=1, threads=None, **kwargs):
+    """Rows for every trial, in grid order. Failed trials carry an 'error' instead of metrics."""
+    threads = threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+    jobs = [(trial, kwargs) for trial in trials]
+    # spawn: every worker starts TensorFlow fresh with its own thread limits
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_limit_threads, initargs=(threads,)) as pool:
+        return list(pool.map(_run_in_worker, jobs))
+
+
+def _format(value):
+    if isinstance(value, tuple):
+        return ','.join(str(v) for v in value)
+    if isinstance(value, float):
+        return f"{value:.4f}" if value < 1 else f"{value:.2f}"
+    return str(value)
+
+
+def print_table(rows):
+    widths = {f: max(len(f), *(len(_format(r.get(f, ''))) for r in rows)) for f in RESULT_FIELDS}
+    print('  '.join(f.rjust(widths[f]) for f in RESULT_FIELDS))
+    for row in rows:
+        if 'error' in row:
+            print(f"{_format(row['img_size']).rjust(widths['img_size'])}  failed: {row['error']}")
+            continue
+        print('  '.join(_format(row[f]).rjust(widths[f]) for f in RESULT_FIELDS))
+
+
+def save_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS + ['error'])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: _format(v) for k, v in row.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[config.IMG_SIZE])
+    parser.add_argument('--conv-widths', type=_int_list, nargs='+', default=[(32, 32)],
+                        help="comma-separated filters per conv layer, e.g. 16,32")
+    parser.add_argument('--dense-units', type=_int_list, nargs='+', default=[(128, 96, 64)],
+                        help="comma-separated units per hidden dense layer")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[config.BATCH_SIZE])
+    parser.add_argument('--epochs', type=int, default=config.EPOCHS)
+    parser.add_argument('--data', choices=['dirs', 'packed'], default='dirs')
+    parser.add_argument('--workers', type=int, default=1, help="trials trained at the same time")
+    parser.add_argument('--threads', type=int, help="CPU threads per worker (default: cores / workers)")
+    parser.add_argument('--output', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    trials = grid(args.sizes, args.conv_widths, args.dense_units, args.batch_sizes, args.epochs)
+    print(f"Running {len(trials)} trial(s) on {args.workers} worker(s)...")
+    rows = run_sweep(trials, args.workers, args.threads, data=args.data)
+    print_table(rows)
+    save_csv(rows, args.output)
+    print(f"Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Time-based letter confirmation from per-frame probability vectors.
+
+The frame-counting debouncer in SignLanguagePredictor.process_prediction needs 15 frames,
+so the hold it asks for depends on the inference rate. TemporalAggregator instead sums
+probability x time: every frame's vector counts for the time since the previous frame (capped
+at max_gap_ms), and a letter is confirmed once it has hold_ms of evidence within the last
+window_ms. Skipped or slow frames therefore change how often evidence arrives, not how long
+a sign has to be held.
+"""
+from string import ascii_uppercase
+import numpy as np
+import config
+
+# Order of the main model's outputs and of every probability vector
+SYMBOLS = ['blank'] + list(ascii_uppercase)
+BLANK = 0
+
+
+class TemporalAggregator:
+    """Ring buffer of the last `capacity` (timestamp, probability vector) pairs.
+
+    As with the frame counter, one letter is confirmed per hold. The next needs blank_release_ms
+    of blank evidence first, and evidence from before that blank is discarded.
+    Timestamps are in seconds (time.monotonic() live, video time offline).
+    """
+
+    def __init__(self, window_ms=config.CONFIRM_WINDOW_MS, hold_ms=config.CONFIRM_HOLD_MS,
+                 release_ms=config.CONFIRM_RELEASE_MS, max_gap_ms=config.CONFIRM_MAX_GAP_MS, capacity=256):
+        self.window = window_ms / 1000.0
+        self.hold = hold_ms / 1000.0
+        self.release = release_ms / 1000.0
+        self.max_gap = max_gap_ms / 1000.0
+        self._probs = np.zeros((capacity, len(SYMBOLS)), dtype=np.float32)
+        self._times = np.full(capacity, -np.inf)
+        # Seconds each stored frame stands for
+        self._weights = np.zeros(capacity, dtype=np.float32)
+        self._evidence = np.zeros(len(SYMBOLS), dtype=np.float32)
+        self._in_window = np.zeros(capacity, dtype=bool)
+        self._window_weights = np.zeros(capacity, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self._times.fill(-np.inf)
+        self._next = 0
+        self._last_time = None
+        self._since = -np.inf
+        self.accepted = False
+        self.confirmed_evidence = None
+
+    def evidence(self, now):
+        """Seconds of probability mass per symbol within the window ending at `now`."""
+        # Zero the weights outside the window instead of indexing, so nothing is allocated per frame
+        np.greater(self._times, max(now - self.window, self._since), out=self._in_window)
+        np.multiply(self._weights, self._in_window, out=self._window_weights)
+        np.dot(self._window_weights, self._probs, out=self._evidence)
+        return self._evidence
+
+    def update(self, proba, timestamp):
+        """Add one frame; returns the symbol confirmed by it, or None."""
+        dt = 0.0 if self._last_time is None else min(max(timestamp - self._last_time, 0.0), self.max_gap)
+        self._last_time = timestamp
+        i = self._next
+        self._probs[i] = proba
+        self._times[i] = timestamp
+        self._weights[i] = dt
+        self._next = (i + 1) % len(self._times)
+
+        evidence = self.evidence(timestamp)
+        if self.accepted:
+            if evidence[BLANK] >= self.release:
+                self.accepted = False
+                self._since = timestamp
+            return None
+        top = int(np.argmax(evidence[1:])) + 1
+        if evidence[top] >= self.hold and evidence[top] > evidence[BLANK]:
+            # What the hold looked like, e.g. R vs U, for beam_decoder.py
+            self.confirmed_evidence = evidence.copy()
+            self.accepted = True
+            # Only blank seen from here on can release the hold
+            self._since = timestamp
+            return SYMBOLS[top]
+        return None
@@ -0,0 +1,93 @@
+import tracemalloc
+import cv2
+import numpy as np
+from app import SignLanguagePredictor
+from bench import SyntheticCapture
+from image_processing import roi_box, threshold_roi, BufferRing, RoiThresholder
+from pipeline import ChangeGate
+
+
+class StaticModel:
+    """Fused-model stand-in returning one preallocated row, so only the app's own code allocates."""
+
+    input_shape = (None, 128, 128, 1)
+
+    def __init__(self):
+        self.output = np.zeros((1, 30), dtype=np.float32)
+        self.output[0, 1] = 0.9
+        self.output[0, 28] = 1.0
+
+    def predict(self, arr, verbose=0):
+        return self.output
+
+
+class StaticPredictor(SignLanguagePredictor):
+    def _load_models(self):
+        self.fused_model = StaticModel()
+
+
+def test_roi_thresholder_matches():
+    print("Testing buffered thresholding against threshold_roi...")
+    capture = SyntheticCapture(frames=5)
+    thresholder = RoiThresholder(keep=2)
+    kept = []
+    for _ in range(5):
+        _, frame = capture.read()
+        x1, y1, x2, y2 = roi_box(frame.shape)
+        roi = frame[y1:y2, x1:x2]
+        out = thresholder(roi)
+        assert np.array_equal(out, threshold_roi(roi))
+        kept.append(out)
+    # keep=2: results alternate between two buffers
+    assert kept[0] is kept[2] and kept[0] is not kept[1]
+    print("PASS: Same output, reused buffers.")
+
+
+def test_frame_path_allocations():
+    print("Testing steady-state allocations per frame...")
+    capture = SyntheticCapture(frames=60)
+    frames = [capture.read()[1] for _ in range(60)]
+    mirrored = BufferRing()
+    thresholder = RoiThresholder()
+    # A negative threshold runs the model on every frame
+    gate = ChangeGate(threshold=-1)
+    predictor = StaticPredictor(blank_detector=False, confirm='time')
+
+    def step(i):
+        # FrameGrabber + InferenceWorker, without the threads
+        frame = cv2.flip(frames[i % len(frames)], 1, dst=mirrored.next(frames[0].shape))
+        x1, y1, x2, y2 = roi_box(frame.shape)
+        roi = thresholder(frame[y1:y2, x1:x2])
+        signature, cached = gate.lookup(roi)
+        symbol, prob, proba = predictor.predict(roi, with_proba=True)
+        gate.store(signature, (symbol, prob, proba))
+        predictor.process_prediction(symbol, proba, i / 30)
+
+    for i in range(30):
+        step(i)
+
+    # Filled in place, so recording the peaks does not itself show up as growth
+    peaks = np.zeros(300, dtype=np.int64)
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for j in range(len(peaks)):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            step(30 + j)
+            peaks[j] = tracemalloc.get_traced_memory()[1] - before
+        growth = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+
+    print(f"Per-frame peak: median {int(np.median(peaks))} B, max {peaks.max()} B; growth over 300 frames: {growth} B")
+    # A 640x480 frame is 900 KB and its 192x192 ROI 36 KB; only small Python objects may remain
+    assert peaks.max() < 16 * 1024
+    assert growth < 8 * 1024
+    assert predictor.history == ['A'] and gate.executed == 330
+    print("PASS: The frame path allocates no image-sized arrays.")
+
+
+if __name__ == "__main__":
+    test_roi_thresholder_matches()
+    test_frame_path_allocations()
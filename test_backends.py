@@ -0,0 +1,85 @@
+import os
+import tempfile
+import numpy as np
+from keras.models import Sequential
+from keras.layers import Convolution2D, MaxPooling2D, Flatten, Dense
+from backends import TFLiteModel, ConcatModel, fuse_keras_models
+from export_tflite import convert
+
+
+def _small_model(sz=32, classes=27):
+    model = Sequential()
+    model.add(Convolution2D(8, (3, 3), input_shape=(sz, sz, 1), activation='relu'))
+    model.add(MaxPooling2D(pool_size=(2, 2)))
+    model.add(Flatten())
+    model.add(Dense(units=16, activation='relu'))
+    model.add(Dense(units=classes, activation='softmax'))
+    return model
+
+
+def test_tflite_backend():
+    print("Testing TFLite export and runtime...")
+    model = _small_model()
+    rng = np.random.default_rng(0)
+    images = (rng.random((8, 32, 32, 1)) > 0.5).astype('float32')
+    expected = model.predict(images, verbose=0)
+
+    with tempfile.TemporaryDirectory() as d:
+        float_path = os.path.join(d, 'model.tflite')
+        int8_path = os.path.join(d, 'model_int8.tflite')
+        with open(float_path, 'wb') as f:
+            f.write(convert(model))
+        with open(int8_path, 'wb') as f:
+            f.write(convert(model, [img[None] for img in images]))
+
+        float_model = TFLiteModel(float_path, num_threads=1)
+        assert np.allclose(float_model.predict(images[:1]), expected[:1], atol=1e-5)
+        # Batch size changes resize the interpreter input
+        assert np.allclose(float_model.predict(images), expected, atol=1e-5)
+
+        int8_out = TFLiteModel(int8_path, num_threads=1).predict(images)
+        print(f"int8 max abs error: {np.abs(int8_out - expected).max():.4f}")
+        assert int8_out.dtype == np.float32 and int8_out.shape == expected.shape
+        assert np.abs(int8_out - expected).max() < 0.05
+    print("PASS: TFLite outputs match Keras.")
+
+
+def test_fused_tflite_model():
+    print("Testing fused main + D/R/U model...")
+    main, dru = _small_model(), _small_model(classes=3)
+    images = (np.random.default_rng(1).random((2, 32, 32, 1)) > 0.5).astype('float32')
+    expected = np.concatenate([main.predict(images, verbose=0), dru.predict(images, verbose=0)], axis=-1)
+
+    fused = fuse_keras_models([main, dru])
+    assert np.allclose(fused.predict(images, verbose=0), expected, atol=1e-5)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'fused.tflite')
+        with open(path, 'wb') as f:
+            f.write(convert(fused))
+        out = TFLiteModel(path, num_threads=1).predict(images)
+        assert out.shape == (2, 30)
+        assert np.allclose(out, expected, atol=1e-5)
+    print("PASS: One call returns both heads.")
+
+
+def test_fused_resize_matches():
+    print("Testing backends on heads of different input sizes...")
+    # Grey values, where the choice of interpolation changes the result
+    main, dru = _small_model(sz=24), _small_model(classes=3)
+    images = np.random.default_rng(2).random((3, 32, 32, 1)).astype('float32')
+    expected = ConcatModel([main, dru]).predict(images)
+
+    fused = fuse_keras_models([main, dru])
+    assert np.allclose(fused.predict(images, verbose=0), expected, atol=1e-5)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'fused.tflite')
+        with open(path, 'wb') as f:
+            f.write(convert(fused))
+        assert np.allclose(TFLiteModel(path, num_threads=1).predict(images), expected, atol=1e-5)
+    print("PASS: Keras, TFLite and cv2 resizing agree.")
+
+
+if __name__ == "__main__":
+    test_tflite_backend()
+    test_fused_tflite_model()
+    test_fused_resize_matches()
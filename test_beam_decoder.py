@@ -0,0 +1,117 @@
+import numpy as np
+from app import SignLanguagePredictor, SuggestionEngine
+from beam_decoder import BeamDecoder, LETTERS
+from word_index import PrefixIndex
+
+
+def letter_proba(dist):
+    """Probability vector over temporal.SYMBOLS from {'R': 0.6, 'U': 0.4}."""
+    v = np.zeros(27, dtype=np.float32)
+    for c, p in dist.items():
+        v[1 + LETTERS.index(c.lower())] = p
+    return v
+
+
+def small_decoder(**kwargs):
+    words = sorted(['word', 'work', 'world', 'would', 'dog', 'door', 'rain', 'run', 'under'])
+    freqs = np.array([{'would': 500, 'work': 300, 'word': 200}.get(w, 50) for w in words], dtype=np.float32)
+    ranks = np.argsort(np.argsort(-freqs, kind='stable')).astype(np.int32)
+    return BeamDecoder(words, freqs, PrefixIndex(words, ranks), **kwargs)
+
+
+def test_beam_decoder():
+    print("Testing lexicon-constrained beam decoding...")
+    decoder = small_decoder()
+    # R was confirmed as U: 'wouk' starts no word, 'work' does
+    decoder.add_letter('W', letter_proba({'W': 1.0}))
+    decoder.add_letter('O', letter_proba({'O': 1.0}))
+    assert decoder.add_letter('U', letter_proba({'U': 0.55, 'R': 0.45})) == 'wou'
+    assert decoder.add_letter('K', letter_proba({'K': 0.9, 'D': 0.1})) == 'work'
+    assert decoder.best_word() == 'work'
+    assert decoder.pop_letter() == 'wou' and decoder.letters == 3
+
+    # Clear evidence for a spelling outside the wordlist is kept
+    decoder.reset()
+    for c in 'ZYX':
+        decoder.add_letter(c, letter_proba({c: 0.97, 'D': 0.03}))
+    assert decoder.best_word() == 'zyx'
+
+    # Without probabilities the confirmed letters are taken as they are
+    decoder.reset()
+    for c in 'WOUK':
+        decoder.add_letter(c)
+    assert decoder.best_word() == 'wouk'
+
+    # Mid-word, the spelling follows the letters; only the whole-word choice jumps to 'dog'
+    decoder.reset()
+    decoder.add_letter('D', letter_proba({'D': 1.0}))
+    decoder.add_letter('O', letter_proba({'O': 1.0}))
+    assert decoder.add_letter('O', letter_proba({'O': 0.95, 'G': 0.05})) == 'doo'
+    assert decoder.best_word() == 'dog'
+    print("PASS: Letter mix-ups are corrected towards wordlist words.")
+
+
+class NoModelPredictor(SignLanguagePredictor):
+    def _load_models(self):
+        self.fused_model = None
+
+
+def test_frame_confirmation_evidence():
+    print("Testing letter evidence from frame-count confirmation...")
+    predictor = NoModelPredictor(blank_detector=False, confirm='frames', confirm_frames=10)
+    blank = letter_proba({})
+    blank[0] = 1.0
+    confirmed = []
+    for i in range(11):
+        # U on top, with R close behind on some frames
+        proba = letter_proba({'U': 0.6, 'R': 0.4} if i % 2 else {'U': 0.9, 'R': 0.1})
+        confirmed.append(predictor.process_prediction('U', proba))
+    assert confirmed == [None] * 10 + ['U']
+    evidence = predictor.letter_evidence
+    assert abs(evidence[1 + LETTERS.index('r')] - 2.6 / 11) < 1e-5 and abs(evidence.sum() - 1.0) < 1e-5
+
+    # A blank starts a new letter's evidence
+    predictor.process_prediction('blank', blank)
+    for _ in range(11):
+        predictor.process_prediction('D', letter_proba({'D': 1.0}))
+    assert predictor.history == ['U', 'D'] and predictor.letter_evidence[1 + LETTERS.index('d')] == 1.0
+    # So the decoder can consider R for the confirmed U
+    assert [c for c, _ in small_decoder()._candidates('U', evidence)] == ['u', 'r']
+    print("PASS: Confirmed letters carry their averaged probabilities.")
+
+
+def test_beam_decoder_word_accuracy():
+    print("Testing word accuracy on a noisy D/R/U letter channel...")
+    engine = SuggestionEngine()
+    decoder = BeamDecoder.from_engine(engine)
+    rng = np.random.default_rng(0)
+    words = ['word', 'under', 'door', 'during', 'product', 'ready', 'hundred', 'around', 'drug', 'run']
+    confusable = 'dru'
+    raw_correct = decoded_correct = 0
+    trials = 0
+    for _ in range(5):
+        for word in words:
+            decoder.reset()
+            raw = ""
+            for c in word:
+                dist = {c: 1.0}
+                if c in confusable and rng.random() < 0.5:
+                    # The hold was split between the right letter and another of D/R/U
+                    other = rng.choice([o for o in confusable if o != c])
+                    share = rng.uniform(0.5, 0.65)
+                    dist = {other: share, c: 1 - share}
+                shown = max(dist, key=dist.get)
+                raw += shown
+                decoder.add_letter(shown.upper(), letter_proba(dist))
+            raw_correct += raw == word
+            decoded_correct += decoder.best_word() == word
+            trials += 1
+    print(f"Raw letters: {raw_correct}/{trials} words right, decoded: {decoded_correct}/{trials}")
+    assert decoded_correct > raw_correct and decoded_correct >= 0.9 * trials
+    print("PASS: Decoding recovers most confused words.")
+
+
+if __name__ == "__main__":
+    test_beam_decoder()
+    test_frame_confirmation_evidence()
+    test_beam_decoder_word_accuracy()
@@ -0,0 +1,43 @@
+import copy
+from app import SuggestionEngine
+from bench import SyntheticCapture, bench_pipeline, bench_suggestions, compare, STAGES
+
+
+class LetterPredictor:
+    """Confirms one letter every few frames so the suggestion stage has a word to look up."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, test_image):
+        self.calls += 1
+        return 'A', 0.9
+
+    def process_prediction(self, top_symbol):
+        return 'T' if self.calls % 4 == 0 else None
+
+
+def test_bench_pipeline():
+    print("Testing pipeline benchmark...")
+    engine = SuggestionEngine()
+    results = {'predictor': 'fake',
+               'pipeline': bench_pipeline(SyntheticCapture(frames=15), LetterPredictor(), engine, warmup=3),
+               'suggestions': bench_suggestions(engine, words=['the', 'hello'], repeats=2)}
+    pipeline = results['pipeline']
+    assert pipeline['frames'] == 12 and pipeline['fps'] > 0
+    assert list(pipeline['stages']) == STAGES
+    assert all(s['count'] == 12 and s['p50'] <= s['p99'] for s in pipeline['stages'].values())
+    assert sorted(results['suggestions']['cold'], key=int) == ['1', '2', '3', '4', '5']
+    assert results['suggestions']['warm']['2']['count'] == 4
+
+    assert compare(results, results) == []
+    slower = copy.deepcopy(results)
+    stage = slower['pipeline']['stages']['threshold']
+    stage['p50'] = stage['p50'] * 2 + 1.0
+    assert compare(slower, results, threshold=0.2) == [
+        f"stage threshold: p50 {results['pipeline']['stages']['threshold']['p50']:.3f} ms -> {stage['p50']:.3f} ms"]
+    print("PASS: Every stage is timed and regressions are flagged.")
+
+
+if __name__ == "__main__":
+    test_bench_pipeline()
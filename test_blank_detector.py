@@ -0,0 +1,91 @@
+import os
+import tempfile
+import cv2
+import numpy as np
+from app import SignLanguagePredictor
+from blank_detector import BlankDetector, dark_fraction
+from evaluate import check
+
+
+def blank_roi(rng):
+    """White ROI with a little threshold noise."""
+    img = np.full((128, 128), 255, dtype=np.uint8)
+    img[rng.random(img.shape) < rng.uniform(0.0, 0.02)] = 0
+    return img
+
+
+def hand_roi(rng):
+    """White ROI with the dark edge outline of a blob, like a thresholded hand."""
+    img = blank_roi(rng)
+    center = (int(rng.integers(40, 90)), int(rng.integers(40, 90)))
+    axes = (int(rng.integers(15, 40)), int(rng.integers(20, 45)))
+    cv2.ellipse(img, center, axes, 0, 0, 360, 0, int(rng.integers(2, 5)))
+    return img
+
+
+class CountingModel:
+    """Fused-model stand-in that always answers 'A' and counts the images it sees."""
+
+    def __init__(self):
+        self.images = 0
+
+    def predict(self, arr, verbose=0):
+        self.images += len(arr)
+        out = np.zeros((len(arr), 30), dtype=np.float32)
+        out[:, 1] = 1.0
+        return out
+
+
+class CountingPredictor(SignLanguagePredictor):
+    def _load_models(self):
+        self.fused_model = CountingModel()
+
+
+def test_blank_detector():
+    print("Testing blank early exit...")
+    rng = np.random.default_rng(0)
+    images = [blank_roi(rng) for _ in range(200)] + [hand_roi(rng) for _ in range(200)]
+    blank = [True] * 200 + [False] * 200
+
+    detector = BlankDetector.calibrate(images, blank, target_fnr=0.01)
+    stats = detector.calibration
+    print(f"Threshold {detector.threshold:.4f}: {stats}")
+    assert stats['false_negative_rate'] <= 0.01
+    assert stats['blank_recall'] > 0.9
+    assert detector.is_blank(images[0]) == (dark_fraction(images[0]) < detector.threshold)
+    assert BlankDetector.calibrate(images, blank, target_fnr=1.0).threshold == max(
+        dark_fraction(img) for img in images[200:])
+    for bad in (-0.1, 1.5, float('nan')):
+        try:
+            BlankDetector.calibrate(images, blank, target_fnr=bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"target_fnr={bad} was accepted")
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'blank_detector.json')
+        detector.save(path)
+        loaded = BlankDetector.load(path)
+    assert loaded.threshold == detector.threshold and loaded.calibration == stats
+
+    predictor = CountingPredictor(blank_detector=detector)
+    results = predictor.predict_batch(images)
+    mask = detector.blank_mask(images)
+    assert predictor.fused_model.images == len(images) - int(mask.sum())
+    # Flagged images answer 'blank'; the rest keep the model's answer, in their original order
+    assert [symbol for symbol, _ in results] == ['blank' if m else 'A' for m in mask]
+    assert predictor.predict(images[0])[0] == 'blank'
+
+    # Off: every image goes to the model
+    predictor = CountingPredictor(blank_detector=False)
+    predictor.predict_batch(images)
+    assert predictor.fused_model.images == len(images)
+
+    results = {'backends': {}, 'blank_detector': dict(stats, false_negative_rate=0.02)}
+    assert len(check(results, max_blank_fnr=0.01)) == 1 and check(results, max_blank_fnr=0.05) == []
+    print("PASS: Obvious blanks skip the model within the calibrated miss rate.")
+
+
+if __name__ == "__main__":
+    test_blank_detector()
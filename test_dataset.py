@@ -0,0 +1,53 @@
+import os
+import tempfile
+import cv2
+import numpy as np
+from keras.preprocessing.image import ImageDataGenerator
+from dataset import pack_dataset, PackedDataset
+from train import packed_batches
+
+
+def test_packed_dataset():
+    print("Testing packed dataset...")
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as d:
+        source, packed = os.path.join(d, 'data2'), os.path.join(d, 'packed')
+        expected = {}
+        for split, count in [('train', 6), ('test', 2)]:
+            for label in ['blank', 'A', 'B']:
+                os.makedirs(os.path.join(source, split, label))
+                for i in range(count):
+                    img = (rng.random((48, 48)) > 0.5).astype(np.uint8) * 255
+                    path = os.path.join(source, split, label, f"{i}.png")
+                    cv2.imwrite(path, img)
+                    expected[path] = cv2.resize(img, (32, 32))
+        with open(os.path.join(source, 'train', 'A', 'broken.png'), 'wb') as f:
+            f.write(b'not an image')
+
+        pack_dataset(source, packed, img_size=32, workers=2)
+        train = PackedDataset(os.path.join(packed, 'train'))
+        test = PackedDataset(os.path.join(packed, 'test'))
+        assert len(train) == 18 and len(test) == 6
+        assert train.images.shape == (18, 32, 32) and train.images.dtype == np.uint8
+        assert isinstance(train.images, np.memmap)
+
+        # Same class indices as flow_from_directory
+        flow = ImageDataGenerator().flow_from_directory(os.path.join(source, 'train'), target_size=(32, 32))
+        assert flow.class_indices == {name: i for i, name in enumerate(train.classes)}
+        assert test.classes == train.classes
+
+        first = os.path.join(source, 'train', train.classes[1], '0.png')
+        assert np.array_equal(train.images[6], expected[first])
+        images, labels = next(train.batches(4))
+        assert np.shares_memory(images, train.images) and labels.tolist() == [0, 0, 0, 0]
+        seen = np.concatenate([labels for _, labels in train.batches(5, shuffle=True, seed=1)])
+        assert sorted(seen.tolist()) == sorted(train.labels.tolist())
+
+        x, y = next(packed_batches(train, 4, augment=True))
+        assert x.shape == (4, 32, 32, 1) and x.dtype == np.float32 and x.max() <= 1.0
+        assert y.shape == (4, 3) and np.allclose(y.sum(axis=1), 1.0)
+    print("PASS: Packed arrays match the image directories.")
+
+
+if __name__ == "__main__":
+    test_packed_dataset()
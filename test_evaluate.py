@@ -0,0 +1,54 @@
+import numpy as np
+from app import SignLanguagePredictor
+from evaluate import evaluate_predictor, check, SYMBOLS
+
+
+class BrightnessModel:
+    """Stands in for the fused model: the mean brightness picks the class.
+
+    0.2 -> blank, 0.4 -> A, 0.6 -> D (D/R/U head: D), 0.8 -> D (D/R/U head: R).
+    """
+
+    def predict(self, arr, verbose=0):
+        out = np.zeros((len(arr), 30), dtype=np.float32)
+        for i, mean in enumerate(arr.reshape(len(arr), -1).mean(axis=1)):
+            level = int(round(mean * 5))
+            out[i, {1: 0, 2: 1, 3: 4, 4: 4}[level]] = 1.0
+            out[i, 27 if level == 3 else 28] = 1.0
+        return out
+
+
+class BrightnessPredictor(SignLanguagePredictor):
+    def _load_models(self):
+        self.fused_model = BrightnessModel()
+
+
+def test_evaluate_predictor():
+    print("Testing offline evaluation...")
+    levels = {'blank': 0.2, 'A': 0.4, 'D': 0.6, 'R': 0.8, 'B': 0.4}
+    images, symbols = [], []
+    for symbol, level in levels.items():
+        for _ in range(5):
+            images.append(np.full((50, 50), int(level * 255), dtype=np.uint8))
+            symbols.append(symbol)
+
+    r = evaluate_predictor(BrightnessPredictor(), images, symbols, batch_size=4, latency_samples=10)
+    print(f"Accuracy: {r['accuracy']}, per class: {r['per_class_accuracy']}")
+    assert r['samples'] == 25
+    assert abs(r['accuracy'] - 0.8) < 1e-9
+    assert r['per_class_accuracy'] == {'blank': 1.0, 'A': 1.0, 'B': 0.0, 'D': 1.0, 'R': 1.0}
+    matrix = np.array(r['confusion']['matrix'])
+    assert matrix[SYMBOLS.index('B'), SYMBOLS.index('A')] == 5 and matrix.sum() == 25
+    assert r['images_per_sec'] > 0 and r['latency_ms']['p50'] <= r['latency_ms']['p99']
+
+    results = {'backends': {'numpy': r}}
+    assert check(results, min_accuracy=0.75, max_p95_ms=1000) == []
+    assert len(check(results, min_accuracy=0.9)) == 1
+    better = {'backends': {'numpy': dict(r, accuracy=0.9)}}
+    assert len(check(results, baseline=better, max_accuracy_drop=0.05)) == 1
+    assert check(results, baseline=results) == []
+    print("PASS: Evaluation scores the full predict logic.")
+
+
+if __name__ == "__main__":
+    test_evaluate_predictor()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import urllib.request
+from metrics import Metrics, MetricsFileWriter, MetricsServer, RollingHistogram
+from pipeline import FrameGrabber, InferenceWorker
+from bench import SyntheticCapture
+from test_pipeline import SlowPredictor
+
+
+def test_rolling_histogram():
+    print("Testing rolling histogram window...")
+    hist = RollingHistogram(size=100)
+    for v in range(1000):
+        hist.add(float(v))
+    p50, p95 = hist.percentiles((50, 95))
+    print(f"p50 {p50}, p95 {p95}, count {hist.count}")
+    # Only the last 100 values (900..999) are in the window; count and sum cover everything
+    assert 945 <= p50 <= 955 and 990 <= p95 <= 999
+    assert hist.count == 1000 and hist.total == sum(range(1000))
+    assert RollingHistogram().percentiles((50, 95)) == [0.0, 0.0]
+    print("PASS: Percentiles cover the most recent samples.")
+
+
+def test_pipeline_stages_and_export():
+    print("Testing pipeline stage metrics and export...")
+    metrics = Metrics(window=64)
+    grabber = FrameGrabber(SyntheticCapture(frames=20, shape=(240, 320, 3), fps=100), metrics=metrics).start()
+    worker = InferenceWorker(grabber, SlowPredictor(), metrics=metrics).start()
+    metrics.gauge('camera_fps', grabber.rate.rate)
+    deadline = time.monotonic() + 5
+    while not grabber.failed and time.monotonic() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+    grabber.stop()
+
+    stages = metrics.snapshot()['stages']
+    print({k: (v['count'], round(v['p50'] * 1000, 2)) for k, v in stages.items()})
+    assert {'capture', 'flip', 'threshold', 'predict', 'process_prediction'} <= set(stages)
+    assert stages['capture']['count'] == 20
+    # SlowPredictor sleeps 30 ms per call
+    assert stages['predict']['p50'] >= 0.025
+
+    metrics.increment('letters', 2)
+    text = metrics.prometheus_text()
+    assert 'signlang_stage_seconds{stage="predict",quantile="0.95"}' in text
+    assert 'signlang_stage_seconds_count{stage="capture"} 20' in text
+    assert 'signlang_letters_total 2' in text and 'signlang_camera_fps' in text
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'metrics.prom')
+        MetricsFileWriter(metrics, path).write()
+        with open(path) as f:
+            assert f.read() == metrics.prometheus_text()
+
+    server = MetricsServer(metrics, port=0).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as r:
+            body = r.read().decode()
+    finally:
+        server.stop()
+    assert 'signlang_stage_seconds_count{stage="capture"} 20' in body
+    print("PASS: Stage timings are recorded and exported.")
+
+
+if __name__ == "__main__":
+    test_rolling_histogram()
+    test_pipeline_stages_and_export()
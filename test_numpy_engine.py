@@ -0,0 +1,72 @@
+import os
+import tempfile
+import numpy as np
+from keras.models import Sequential
+from keras.layers import Convolution2D, MaxPooling2D, Flatten, Dense, Dropout
+from numpy_engine import NumpyModel, FusedModel
+
+
+def test_numpy_engine_matches_keras():
+    print("Testing NumPy engine against Keras...")
+    # Same layer stack as train.py, at a smaller input size
+    sz = 40
+    model = Sequential()
+    model.add(Convolution2D(32, (3, 3), input_shape=(sz, sz, 1), activation='relu'))
+    model.add(MaxPooling2D(pool_size=(2, 2)))
+    model.add(Convolution2D(32, (3, 3), activation='relu'))
+    model.add(MaxPooling2D(pool_size=(2, 2)))
+    model.add(Flatten())
+    model.add(Dense(units=128, activation='relu'))
+    model.add(Dropout(0.40))
+    model.add(Dense(units=96, activation='relu'))
+    model.add(Dropout(0.40))
+    model.add(Dense(units=64, activation='relu'))
+    model.add(Dense(units=27, activation='softmax'))
+
+    rng = np.random.default_rng(0)
+    images = (rng.random((4, sz, sz, 1)) > 0.5).astype('float32')
+    expected = model.predict(images, verbose=0)
+
+    with tempfile.TemporaryDirectory() as d:
+        json_path = os.path.join(d, 'model.json')
+        weights_path = os.path.join(d, 'model.h5')
+        npz_path = os.path.join(d, 'model.npz')
+        with open(json_path, 'w') as f:
+            f.write(model.to_json())
+        model.save_weights(weights_path)
+
+        from_h5 = NumpyModel.from_keras_files(json_path, weights_path)
+        assert np.allclose(from_h5.predict(images), expected, atol=1e-5)
+        from_h5.save_npz(npz_path)
+        from_npz = NumpyModel.from_npz(npz_path)
+        assert np.allclose(from_npz.predict(images[:1]), expected[:1], atol=1e-5)
+        assert from_npz.input_shape == (None, sz, sz, 1)
+    print("PASS: NumPy outputs match Keras.")
+
+
+def test_fused_model_shares_trunk():
+    print("Testing fused NumPy model...")
+    rng = np.random.default_rng(0)
+    conv = [rng.standard_normal((3, 3, 1, 4)).astype('float32'), np.zeros(4, 'float32')]
+
+    def stack(name, units):
+        return NumpyModel([
+            ('Conv2D', {'name': f'{name}_conv', 'activation': 'relu'}, conv),
+            ('MaxPooling2D', {'name': f'{name}_pool', 'pool_size': [2, 2]}, []),
+            ('Flatten', {'name': f'{name}_flat'}, []),
+            ('Dense', {'name': f'{name}_out', 'activation': 'softmax'},
+             [rng.standard_normal((36, units)).astype('float32'), np.zeros(units, 'float32')]),
+        ])
+
+    main, dru = stack('main', 27), stack('dru', 3)
+    images = rng.random((2, 8, 8, 1)).astype('float32')
+    fused = FusedModel([main, dru])
+    assert fused.shared_layers == 3
+    expected = np.concatenate([main.predict(images), dru.predict(images)], axis=-1)
+    assert np.allclose(fused.predict(images), expected, atol=1e-6)
+    print("PASS: Identical leading layers run once.")
+
+
+if __name__ == "__main__":
+    test_numpy_engine_matches_keras()
+    test_fused_model_shares_trunk()
@@ -0,0 +1,180 @@
+import time
+import numpy as np
+from bench import SyntheticCapture
+from pipeline import FrameGrabber, InferenceWorker, ChangeGate
+
+
+class SlowPredictor:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, test_image):
+        self.calls += 1
+        time.sleep(0.03)
+        return 'A', 0.9
+
+    def process_prediction(self, top_symbol):
+        return 'A' if self.calls == 3 else None
+
+
+def test_pipeline():
+    print("Testing capture/inference pipeline...")
+    grabber = FrameGrabber(SyntheticCapture(frames=60, shape=(240, 320, 3), fps=100)).start()
+    predictor = SlowPredictor()
+    worker = InferenceWorker(grabber, predictor, maxsize=2).start()
+
+    deadline = time.monotonic() + 5
+    while not grabber.failed and time.monotonic() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+    grabber.stop()
+
+    result = worker.latest_result()
+    print(f"Inferences: {predictor.calls}, skipped frames: {worker.skipped_frames}, "
+          f"dropped results: {worker.dropped_results}")
+    assert grabber.failed
+    assert result is not None and result.symbol == 'A'
+    assert result.processed_roi.ndim == 2
+    # Inference is ~3x slower than the camera, so it must have skipped frames instead of queueing them
+    assert 0 < predictor.calls < 60 and worker.skipped_frames > 0
+    assert worker.take_letters() == ['A']
+    print("PASS: Inference keeps up with the newest frame.")
+
+
+class CountingPredictor(SlowPredictor):
+    def __init__(self):
+        super().__init__()
+        self.debounced = 0
+
+    def predict(self, test_image):
+        self.calls += 1
+        return 'B', 0.8
+
+    def process_prediction(self, top_symbol):
+        self.debounced += 1
+        return None
+
+
+def test_change_gate():
+    print("Testing change-gated inference...")
+    gate = ChangeGate(threshold=6.0, size=32)
+    roi = np.zeros((120, 120), dtype=np.uint8)
+    roi[20:80, 30:70] = 255
+    signature, cached = gate.lookup(roi)
+    assert cached is None
+    gate.store(signature, ('A', 0.9))
+    assert gate.lookup(roi.copy())[1] == ('A', 0.9)
+    moved = np.roll(roi, 15, axis=1)
+    assert gate.lookup(moved)[1] is None
+    assert (gate.executed, gate.skipped) == (1, 1)
+
+    # One held scene with sensor noise
+    grabber = FrameGrabber(SyntheticCapture(frames=30, hold=30, fps=100)).start()
+    predictor = CountingPredictor()
+    worker = InferenceWorker(grabber, predictor, gate=ChangeGate()).start()
+    deadline = time.monotonic() + 5
+    while not grabber.failed and time.monotonic() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+    grabber.stop()
+    print(f"Model runs: {predictor.calls}, debounced frames: {predictor.debounced}, "
+          f"gate: {worker.gate.executed} executed / {worker.gate.skipped} skipped")
+    assert predictor.calls == worker.gate.executed and predictor.calls <= 3
+    # Reused predictions still reach the debouncer, one per processed frame
+    assert predictor.debounced == worker.gate.executed + worker.gate.skipped > predictor.calls
+    print("PASS: Unchanged ROIs reuse the last prediction.")
+
+
+class ResettablePredictor(CountingPredictor):
+    def reset_state(self):
+        self.resets = getattr(self, 'resets', 0) + 1
+
+
+def test_worker_reset():
+    print("Testing a reset of the inference worker...")
+    grabber = FrameGrabber(SyntheticCapture(frames=40, hold=40, fps=100)).start()
+    predictor = ResettablePredictor()
+    # Well above the sensor noise, so only the reset can make the model run again
+    worker = InferenceWorker(grabber, predictor, gate=ChangeGate(threshold=20)).start()
+    deadline = time.monotonic() + 5
+    while worker.gate.skipped < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    calls = predictor.calls
+    worker.reset()
+    while not grabber.failed and time.monotonic() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+    grabber.stop()
+    # Same held scene, but the cached prediction was forgotten with the predictor's state
+    assert predictor.resets == 1 and predictor.calls == calls + 1, (predictor.calls, calls)
+    print("PASS: reset() clears the predictor state and the gate's cache.")
+
+
+def test_lagging_reader():
+    print("Testing a reader that falls behind the grabber...")
+    grabber = FrameGrabber(SyntheticCapture(frames=40, shape=(120, 160, 3), fps=200), keep=4).start()
+    frame = None
+    deadline = time.monotonic() + 5
+    while frame is None and time.monotonic() < deadline:
+        frame_id, frame = grabber.wait_newer(0)
+    snapshot = frame.copy()
+    # A second reader holds a lease too, as the Tk and inference threads do
+    other_id, other = grabber.wait_newer(frame_id)
+    other_snapshot = other.copy()
+    while not grabber.failed and time.monotonic() < deadline:
+        time.sleep(0.02)
+    last_id, last = grabber.latest()
+    grabber.stop()
+    print(f"Leased frames {frame_id} and {other_id}, grabber went on to frame {last_id}")
+    assert last_id >= frame_id + 2 * grabber.buffers.size
+    # Many frames later the leased buffers still hold what was read
+    assert np.array_equal(frame, snapshot) and np.array_equal(other, other_snapshot)
+    assert len(grabber.buffers) == grabber.buffers.size
+    for f in (frame, other, last):
+        grabber.release(f)
+    # Only the published frame's own lease is left
+    assert sorted(grabber.buffers.leases()) == [0, 0, 0, 1]
+    print("PASS: Leased frames are not overwritten.")
+
+
+class FastPredictor(SlowPredictor):
+    def predict(self, test_image):
+        self.calls += 1
+        return 'A', 0.9
+
+    def process_prediction(self, top_symbol):
+        return None
+
+
+def test_lagging_result_reader():
+    print("Testing a display thread that falls behind the inference thread...")
+    grabber = FrameGrabber(SyntheticCapture(frames=60, shape=(240, 320, 3), fps=200)).start()
+    predictor = FastPredictor()
+    worker = InferenceWorker(grabber, predictor, maxsize=2).start()
+    held = None
+    deadline = time.monotonic() + 5
+    while held is None and time.monotonic() < deadline:
+        held = worker.latest_result()
+        time.sleep(0.005)
+    snapshot = held.processed_roi.copy()
+    # The display thread stalls while the worker keeps publishing (and dropping) results
+    while not grabber.failed and time.monotonic() < deadline:
+        time.sleep(0.02)
+    worker.stop()
+    grabber.stop()
+    print(f"Held result of frame {held.frame_id}; {predictor.calls} inferences, "
+          f"{worker.dropped_results} dropped, {len(worker.rois)} ROI buffers")
+    assert predictor.calls > 10 and worker.dropped_results > 0
+    assert np.array_equal(held.processed_roi, snapshot)
+    worker.release(held)
+    worker.release(worker.latest_result())
+    assert worker.rois.leases() == [0] * len(worker.rois)
+    print("PASS: A held ROI is not overwritten.")
+
+
+if __name__ == "__main__":
+    test_pipeline()
+    test_change_gate()
+    test_worker_reset()
+    test_lagging_reader()
+    test_lagging_result_reader()
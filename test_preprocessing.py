@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from preprocessing import preprocess_data, split_for
+
+
+def _write_image(path, seed):
+    rng = np.random.default_rng(seed)
+    cv2.imwrite(path, rng.integers(0, 256, (64, 64, 3), dtype=np.uint8))
+
+
+def test_incremental_preprocessing():
+    print("Testing incremental preprocessing...")
+    with tempfile.TemporaryDirectory() as d:
+        source, output = os.path.join(d, 'train'), os.path.join(d, 'data2')
+        for label in 'AB':
+            os.makedirs(os.path.join(source, label))
+            for i in range(20):
+                _write_image(os.path.join(source, label, f"{i}.png"), ord(label) * 100 + i)
+
+        stats = preprocess_data(source, output, workers=2, chunk_size=8)
+        assert stats['processed'] == 40
+        with open(os.path.join(output, 'manifest.json')) as f:
+            first = json.load(f)['files']
+        assert all(entry['output'] == os.path.join(output, split_for(*rel.split('/')), *rel.split('/'))
+                   for rel, entry in first.items())
+        assert {entry['split'] for entry in first.values()} == {'train', 'test'}
+
+        stats = preprocess_data(source, output, workers=2)
+        assert stats == {'processed': 0, 'unchanged': 40, 'failed': 0, 'removed': 0}
+
+        # A new image, a changed image, a touched-but-identical image and a deleted image
+        _write_image(os.path.join(source, 'A', 'new.png'), 7)
+        _write_image(os.path.join(source, 'A', '0.png'), 999)
+        later = time.time() + 10
+        os.utime(os.path.join(source, 'B', '1.png'), (later, later))
+        os.remove(os.path.join(source, 'B', '2.png'))
+        stats = preprocess_data(source, output, workers=1)
+        assert stats == {'processed': 2, 'unchanged': 38, 'failed': 0, 'removed': 1}, stats
+        assert not os.path.exists(first['B/2.png']['output'])
+
+        with open(os.path.join(output, 'manifest.json')) as f:
+            second = json.load(f)['files']
+        assert all(second[rel]['output'] == entry['output'] for rel, entry in first.items() if rel in second)
+    print("PASS: Reruns only touch new and changed images.")
+
+
+def test_untracked_outputs_removed():
+    print("Testing a first run over outputs of the old split...")
+    with tempfile.TemporaryDirectory() as d:
+        source, output = os.path.join(d, 'train'), os.path.join(d, 'data2')
+        os.makedirs(os.path.join(source, 'A'))
+        for i in range(20):
+            _write_image(os.path.join(source, 'A', f"{i}.png"), i)
+            # An earlier run without a manifest put every image in both splits
+            for split in ('train', 'test'):
+                os.makedirs(os.path.join(output, split, 'A'), exist_ok=True)
+                _write_image(os.path.join(output, split, 'A', f"{i}.png"), i)
+        _write_image(os.path.join(output, 'test', 'A', 'gone.png'), 99)
+
+        stats = preprocess_data(source, output, workers=1)
+        assert stats['processed'] == 20 and stats['removed'] == 21, stats
+        for split in ('train', 'test'):
+            files = set(os.listdir(os.path.join(output, split, 'A')))
+            assert files == {f"{i}.png" for i in range(20) if split_for('A', f"{i}.png") == split}, split
+
+        # Changed settings are treated the same way
+        _write_image(os.path.join(output, 'train', 'A', 'stray.png'), 5)
+        manifest_path = os.path.join(output, 'manifest.json')
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest['settings']['version'] = -1
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        stats = preprocess_data(source, output, workers=1)
+        assert stats['removed'] == 1 and not os.path.exists(os.path.join(output, 'train', 'A', 'stray.png'))
+    print("PASS: Outputs no manifest accounts for are removed.")
+
+
+if __name__ == "__main__":
+    test_incremental_preprocessing()
+    test_untracked_outputs_removed()
@@ -1,4 +1,7 @@
-from app import SuggestionEngine
+import os
+import tempfile
+import threading
+from app import SuggestionEngine, SuggestionWorker
 import config
 
 def test_suggestions():
@@ -34,5 +37,81 @@ def test_suggestions():
     except Exception as e:
         print(f"Suggestion Engine Test Failed: {e}")
 
+def test_suggestion_cache():
+    print("Testing suggestion cache...")
+    engine = SuggestionEngine()
+    fresh = SuggestionEngine()
+
+    for prefix in ["w", "wo", "wor", "worl", "world"]:
+        engine.get_suggestions(prefix)
+    first = engine.get_suggestions("WORL")
+    stats = engine.cache_stats()
+    print(f"Cache stats: {stats}")
+    assert stats['hits'] == 1 and stats['misses'] == 5
+
+    # Refined results must match a cold lookup of the same prefix
+    assert first == fresh.get_suggestions("worl")
+    print("PASS: Cached and refined suggestions match.")
+
+
+def test_wordlist_frequencies():
+    print("Testing frequency column in wordlist.txt...")
+    with tempfile.TemporaryDirectory() as d:
+        with open(os.path.join(d, 'wordlist.txt'), 'w', encoding='utf-8') as f:
+            f.write("apple 5\napply 900\napricot 40\nbanana 10\n")
+        engine = SuggestionEngine(model_dir=d)
+        suggestions = engine.get_suggestions("ap")
+        print(f"Suggestions for 'ap': {suggestions}")
+        assert suggestions[:3] == ['apply', 'apricot', 'apple']
+
+        # Editing the list rebuilds the compiled cache
+        with open(os.path.join(d, 'wordlist.txt'), 'w', encoding='utf-8') as f:
+            f.write("apple 900\napply 5\n")
+        engine = SuggestionEngine(model_dir=d)
+        assert engine.get_suggestions("ap") == ['apple', 'apply']
+    print("PASS: Frequencies from wordlist.txt drive the ranking.")
+
+
+def test_suggestion_worker():
+    print("Testing background suggestion worker...")
+    engine = SuggestionEngine()
+    results = []
+    done = threading.Event()
+
+    def on_result(word, suggestions):
+        results.append(word)
+        if word == "hello":
+            done.set()
+
+    worker = SuggestionWorker(engine, on_result)
+    try:
+        for word in ["h", "he", "hel", "hell", "hello"]:
+            worker.request(word)
+        assert done.wait(5), "worker never delivered the latest word"
+    finally:
+        worker.stop()
+
+    print(f"Delivered: {results}, dropped: {worker.dropped}")
+    assert results[-1] == "hello"
+    assert len(results) + worker.dropped == 5
+    print("PASS: Latest request wins.")
+
+
+def test_short_prefix_suggestions():
+    print("Testing suggestions for 1-2 letter prefixes...")
+    engine = SuggestionEngine()
+    for prefix in ["x", "z", "xy", "zq", "q", "j", "qu"]:
+        suggestions = engine.get_suggestions(prefix)
+        print(f"Suggestions for '{prefix}': {suggestions}")
+        # Short prefixes get no fuzzy matches, so unrelated short words can't fill the list
+        assert all(prefix[0] in w for w in suggestions), prefix
+    assert "quite" in engine.get_suggestions("qu")
+    print("PASS: Short prefixes only suggest words that contain them.")
+
+
 if __name__ == "__main__":
     test_suggestions()
+    test_suggestion_cache()
+    test_wordlist_frequencies()
+    test_suggestion_worker()
+    test_short_prefix_suggestions()
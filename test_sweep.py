@@ -0,0 +1,41 @@
+import csv
+import os
+import tempfile
+import cv2
+import numpy as np
+from sweep import grid, run_sweep, save_csv, print_table
+
+
+def test_sweep():
+    print("Testing sweep runner...")
+    with tempfile.TemporaryDirectory() as d:
+        for split, count in [('train', 8), ('test', 4)]:
+            for label in 'AB':
+                os.makedirs(os.path.join(d, split, label))
+                for i in range(count):
+                    img = np.zeros((40, 40), dtype=np.uint8)
+                    img[:, :10 if label == 'A' else 30] = 255
+                    cv2.imwrite(os.path.join(d, split, label, f"{i}.png"), img)
+
+        trials = grid([24, 32], [(4,)], [(8,)], [4], epochs=1)
+        assert len(trials) == 2
+        rows = run_sweep(trials, workers=2, threads=1,
+                         train_dir=os.path.join(d, 'train'), test_dir=os.path.join(d, 'test'))
+        print_table(rows)
+        assert [row['img_size'] for row in rows] == [24, 32]
+        for row in rows:
+            assert 'error' not in row, row
+            assert 0.0 <= row['val_accuracy'] <= 1.0
+            assert row['train_seconds'] > 0 and row['latency_ms'] > 0 and row['weights_kb'] > 0
+        assert rows[0]['params'] < rows[1]['params']
+
+        path = os.path.join(d, 'results.csv')
+        save_csv(rows, path)
+        with open(path) as f:
+            saved = list(csv.DictReader(f))
+        assert [r['img_size'] for r in saved] == ['24', '32'] and saved[0]['conv_widths'] == '4'
+    print("PASS: Trials run in worker processes and land in the results table.")
+
+
+if __name__ == "__main__":
+    test_sweep()
@@ -0,0 +1,72 @@
+import numpy as np
+from app import SignLanguagePredictor
+from temporal import TemporalAggregator, SYMBOLS
+
+
+def onehot(symbol, p=1.0):
+    v = np.full(len(SYMBOLS), (1 - p) / (len(SYMBOLS) - 1), dtype=np.float32)
+    v[SYMBOLS.index(symbol)] = p
+    return v
+
+
+def run(aggregator, frames):
+    """frames: (timestamp, symbol, p); returns [(timestamp, confirmed symbol)]."""
+    out = []
+    for t, symbol, p in frames:
+        confirmed = aggregator.update(onehot(symbol, p), t)
+        if confirmed:
+            out.append((round(t, 3), confirmed))
+    return out
+
+
+def test_temporal_aggregator():
+    print("Testing time-based letter confirmation...")
+    kwargs = dict(window_ms=1000, hold_ms=600, release_ms=150, max_gap_ms=200, capacity=64)
+
+    # Same hold in time at 50 fps (buffer wraps around) and at an irregular 4-12 fps
+    fast = [(i / 50, 'A', 0.9) for i in range(100)]
+    rng = np.random.default_rng(0)
+    slow_times = np.cumsum(rng.uniform(0.08, 0.25, 20))
+    slow = [(t, 'A', 0.9) for t in slow_times]
+    first_fast = run(TemporalAggregator(**kwargs), fast)
+    first_slow = run(TemporalAggregator(**kwargs), slow)
+    print(f"50 fps: {first_fast}, irregular: {first_slow}")
+    assert [s for _, s in first_fast] == ['A'] and [s for _, s in first_slow] == ['A']
+    # 0.9 probability -> 600 ms of evidence after ~667 ms of holding, at either rate
+    assert abs(first_fast[0][0] - 0.68) < 0.03
+    assert 0.6 < first_slow[0][0] - slow_times[0] < 0.95
+
+    # Low-confidence frames are not enough on their own
+    assert run(TemporalAggregator(**kwargs), [(i / 20, 'B', 0.4) for i in range(60)]) == []
+
+    # A stall counts for at most max_gap_ms
+    assert run(TemporalAggregator(**kwargs), [(0.0, 'C', 1.0), (5.0, 'C', 1.0), (5.1, 'C', 1.0)]) == []
+
+    # One letter per hold; a blank long enough re-arms, a blink does not
+    frames = ([(i / 20, 'A', 1.0) for i in range(20)]
+              + [(1.0 + i / 20, 'blank', 1.0) for i in range(2)]
+              + [(1.1 + i / 20, 'B', 1.0) for i in range(20)]
+              + [(2.1 + i / 20, 'blank', 1.0) for i in range(5)]
+              + [(2.35 + i / 20, 'B', 1.0) for i in range(20)])
+    confirmed = run(TemporalAggregator(**kwargs), frames)
+    print(f"Sequence: {confirmed}")
+    assert [s for _, s in confirmed] == ['A', 'B']
+    print("PASS: Letters need the same hold time at any frame rate.")
+
+
+def test_probabilities_match_decode():
+    print("Testing probability vectors against the decoded symbol...")
+    rng = np.random.default_rng(1)
+    outputs = rng.random((500, 30)).astype(np.float32)
+    outputs[:250, 4] += 2.0  # D on top of the main head, so the D/R/U head decides
+    proba = SignLanguagePredictor._probabilities(outputs)
+    decoded = [SignLanguagePredictor._decode(o)[0] for o in outputs]
+    assert proba.shape == (500, len(SYMBOLS))
+    assert [SYMBOLS[i] for i in proba.argmax(axis=1)] == decoded
+    assert {'R', 'U'} & set(decoded[:250])
+    print("PASS: The probability argmax is the decoded symbol.")
+
+
+if __name__ == "__main__":
+    test_temporal_aggregator()
+    test_probabilities_match_decode()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import cv2
+import numpy as np
+from dataset import pack_dataset, PackedDataset
+from keras.models import model_from_json
+from backends import fuse_keras_models
+from numpy_engine import NumpyModel, FusedModel
+import train
+
+
+def _make_split(root, counts):
+    for label, count in counts.items():
+        os.makedirs(os.path.join(root, label))
+        for i in range(count):
+            img = np.zeros((40, 40), dtype=np.uint8)
+            img[:, :(ord(label) % 5 + 1) * 6] = 255
+            cv2.imwrite(os.path.join(root, label, f"{i}.png"), img)
+
+
+def test_tfdata_pipeline():
+    print("Testing tf.data input pipeline...")
+    with tempfile.TemporaryDirectory() as d:
+        _make_split(os.path.join(d, 'train'), {'A': 6, 'B': 10})
+        _make_split(os.path.join(d, 'test'), {'A': 2, 'B': 2})
+
+        ds, samples, classes = train.tfdata_from_directory(os.path.join(d, 'test'), 32, 4, augment=False)
+        assert samples == 4 and classes == ['A', 'B']
+        x, y = next(iter(ds))
+        assert x.shape == (4, 32, 32, 1) and y.shape == (4, 2)
+        assert y.numpy().argmax(axis=1).tolist() == [0, 0, 1, 1]
+        # Column widths differ per class: A fills 6 of 40 columns, B fills 12
+        widths = (x.numpy()[:, 0, :, 0] > 0.5).sum(axis=1)
+        assert abs(widths[0] * 40 / 32 - 6) <= 1 and abs(widths[2] * 40 / 32 - 12) <= 1
+
+        ds, samples, _ = train.tfdata_from_directory(os.path.join(d, 'train'), 32, 8, augment=True,
+                                                     cache=os.path.join(d, 'cache'))
+        labels = np.concatenate([y.numpy().argmax(axis=1) for _, y in ds.take(2)])
+        assert samples == 16 and sorted(labels.tolist()) == [0] * 6 + [1] * 10
+        assert os.path.exists(os.path.join(d, 'cache.train.index'))
+
+        pack_dataset(d, os.path.join(d, 'packed'), img_size=32, workers=1)
+        packed = PackedDataset(os.path.join(d, 'packed', 'train'))
+        ds, samples = train.tfdata_from_packed(packed, 8, augment=True)
+        labels = np.concatenate([y.numpy().argmax(axis=1) for _, y in ds.take(2)])
+        assert samples == 16 and sorted(labels.tolist()) == [0] * 6 + [1] * 10
+
+        model = train.build_classifier(32, 2)
+        test_ds, test_samples = train.tfdata_from_packed(PackedDataset(os.path.join(d, 'packed', 'test')), 8, False)
+        history = train.train(model, ds, test_ds, samples, test_samples, batch_size=8, epochs=1)
+        assert history.history['samples_per_sec'][0] > 0
+    print("PASS: tf.data batches have the right labels and train the model.")
+
+
+def test_multihead_training():
+    print("Testing multi-head training...")
+    with tempfile.TemporaryDirectory() as d:
+        _make_split(os.path.join(d, 'train'), {'A': 4, 'D': 4, 'R': 4, 'U': 4})
+        _make_split(os.path.join(d, 'test'), {'A': 2, 'D': 2, 'R': 2, 'U': 2})
+        training_set, samples, classes = train.tfdata_from_directory(
+            os.path.join(d, 'train'), 32, 8, augment=True, multihead=True)
+        test_set, test_samples, _ = train.tfdata_from_directory(
+            os.path.join(d, 'test'), 32, 8, augment=False, classes=classes, multihead=True)
+
+        x, targets, weights = next(iter(test_set))
+        assert weights['dru'].numpy().tolist() == [0, 0, 1, 1, 1, 1, 1, 1]
+        assert targets['dru'].numpy()[2:].argmax(axis=1).tolist() == [0, 0, 1, 1, 2, 2]
+
+        model, main_model, dru_model = train.build_multihead(32, num_classes=len(classes))
+        train.train(model, training_set, test_set, samples, test_samples, batch_size=8, epochs=1)
+
+        paths = {}
+        for name, m in [('main', main_model), ('dru', dru_model)]:
+            paths[name] = (os.path.join(d, f'{name}.json'), os.path.join(d, f'{name}.h5'))
+            train.save_model(m, *paths[name])
+        images = x.numpy()
+        outputs = model.predict(images, verbose=0)
+        for name in ['main', 'dru']:
+            with open(paths[name][0]) as f:
+                loaded = model_from_json(f.read())
+            loaded.load_weights(paths[name][1])
+            assert np.allclose(loaded.predict(images, verbose=0), outputs[name], atol=1e-5)
+
+        fused = FusedModel([NumpyModel.from_keras_files(*paths['main']), NumpyModel.from_keras_files(*paths['dru'])])
+        assert fused.shared_layers == 6
+        expected = np.concatenate([outputs['main'], outputs['dru']], axis=-1)
+        assert np.allclose(fused.predict(images), expected, atol=1e-4)
+    print("PASS: Both heads train together and save as separate models.")
+
+
+def test_distillation():
+    print("Testing distillation to a student...")
+    with tempfile.TemporaryDirectory() as d:
+        _make_split(os.path.join(d, 'train'), {'A': 8, 'B': 8, 'C': 8})
+        _make_split(os.path.join(d, 'test'), {'A': 2, 'B': 2, 'C': 2})
+        training_set, samples, classes = train.tfdata_from_directory(os.path.join(d, 'train'), 32, 8, True)
+        test_set, test_samples, _ = train.tfdata_from_directory(os.path.join(d, 'test'), 32, 8, False,
+                                                                classes=classes)
+        teacher = train.build_classifier(32, 3)
+        student = train.build_student(24, 3, width=8)
+        report = train.distill(teacher, student, training_set, test_set, samples, test_samples,
+                               batch_size=8, epochs=1)
+        assert [row[0] for row in report] == ['teacher', 'student']
+        assert report[1][1] == 24 and report[1][2] < report[0][2]
+        assert all(0.0 <= row[3] <= 1.0 and row[4] > 0 for row in report)
+
+        json_path, weights_path = os.path.join(d, 'student.json'), os.path.join(d, 'student.h5')
+        train.save_model(student, json_path, weights_path)
+        images = np.random.default_rng(0).random((2, 24, 24, 1)).astype('float32')
+        engine = NumpyModel.from_keras_files(json_path, weights_path)
+        assert np.allclose(engine.predict(images), student.predict(images, verbose=0), atol=1e-5)
+
+        # A 24px student next to a 32px D/R/U model: one fused call at 32px
+        dru = train.build_classifier(32, 3)
+        frames = np.random.default_rng(1).random((2, 32, 32, 1)).astype('float32')
+        fused = fuse_keras_models([student, dru])
+        assert fused.input_shape == (None, 32, 32, 1)
+        keras_out = fused.predict(frames, verbose=0)
+        dru_path = os.path.join(d, 'dru')
+        train.save_model(dru, dru_path + '.json', dru_path + '.h5')
+        numpy_fused = FusedModel([engine, NumpyModel.from_keras_files(dru_path + '.json', dru_path + '.h5')])
+        assert numpy_fused.input_shape[1] == 32
+        assert np.allclose(numpy_fused.predict(frames), keras_out, atol=1e-5)
+    print("PASS: Student trains, reports and loads like the teacher.")
+
+
+if __name__ == "__main__":
+    test_tfdata_pipeline()
+    test_multihead_training()
+    test_distillation()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import cv2
+import numpy as np
+import config
+from app import SignLanguagePredictor
+from transcribe import transcribe
+
+
+class PatternModel:
+    """Stands in for the fused model: plain crops are blank, one square is A, three are D -> R."""
+
+    def predict(self, arr, verbose=0):
+        mean = arr.reshape(len(arr), -1).mean(axis=1)
+        out = np.zeros((len(arr), 30), dtype=np.float32)
+        out[mean > 0.99, 0] = 1.0
+        out[(mean <= 0.99) & (mean > 0.88), 1] = 1.0
+        out[mean <= 0.88, 4] = 1.0
+        out[:, 28] = 1.0
+        return out
+
+
+class PatternPredictor(SignLanguagePredictor):
+    def _load_models(self):
+        self.fused_model = PatternModel()
+
+
+def _crop(squares):
+    img = np.full((120, 120, 3), 200, dtype=np.uint8)
+    for x, y in [(30, 30)] if squares == 1 else [(10, 10), (70, 70), (10, 70)][:squares]:
+        size = 60 if squares == 1 else 40
+        cv2.rectangle(img, (x, y), (x + size, y + size), (0, 0, 0), -1)
+    return img
+
+
+# At 10 fps: A, a short pause, R, a long pause, A
+SEQUENCE = [1] * 20 + [0] * 5 + [3] * 20 + [0] * 20 + [1] * 20
+
+
+def test_transcribe_image_directory():
+    print("Testing headless transcription...")
+    sequence = SEQUENCE
+    with tempfile.TemporaryDirectory() as d:
+        for i, squares in enumerate(sequence):
+            cv2.imwrite(os.path.join(d, f"{i:04d}.png"), _crop(squares))
+        result = transcribe(d, PatternPredictor(confirm='frames'), batch_size=16, fps=10, cropped=True,
+                            word_gap=1.0)
+
+    print(f"Letters: {result['letters']}, text: {result['text']!r}")
+    assert result['frames'] == len(sequence)
+    assert [letter for _, letter in result['letters']] == ['A', 'R', 'A']
+    assert abs(result['letters'][0][0] - 1.5) < 1e-9
+    assert result['text'] == "AR A"
+    print("PASS: Letters and words match the frame sequence.")
+
+
+def test_transcribe_time_based_confirmation():
+    print("Testing time-based confirmation at two frame rates...")
+    results = {}
+    for fps, step in ((10, 1), (5, 2)):
+        with tempfile.TemporaryDirectory() as d:
+            for i, squares in enumerate(SEQUENCE[::step]):
+                cv2.imwrite(os.path.join(d, f"{i:04d}.png"), _crop(squares))
+            results[fps] = transcribe(d, PatternPredictor(confirm='time'), batch_size=16, fps=fps,
+                                      cropped=True, word_gap=1.0)
+        print(f"{fps} fps: {results[fps]['letters']}")
+    for result in results.values():
+        assert result['text'] == "AR A"
+    # CONFIRM_HOLD_MS of evidence after the first frame, whatever the frame rate
+    hold = config.CONFIRM_HOLD_MS / 1000
+    for fps in results:
+        assert abs(results[fps]['letters'][0][0] - hold) < 1 / fps + 1e-9
+    print("PASS: Letters take the same time to confirm at 10 and 5 fps.")
+
+
+if __name__ == "__main__":
+    test_transcribe_image_directory()
+    test_transcribe_time_based_confirmation()
@@ -0,0 +1,90 @@
+import os
+import random
+import string
+import tempfile
+from word_index import PrefixIndex, FuzzyIndex, edit_distance, save_compiled, load_compiled
+
+
+def _random_words(n, seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add(''.join(rng.choice(string.ascii_lowercase[:8]) for _ in range(rng.randint(1, 7))))
+    return sorted(words)
+
+
+def test_prefix_index():
+    print("Testing prefix index...")
+    words = _random_words(5000)
+    ranks = list(range(len(words)))
+    random.Random(1).shuffle(ranks)
+    index = PrefixIndex(words, ranks, top_k=20, leaf_size=32)
+
+    for prefix in ['a', 'ab', 'hc', 'abc', 'gggg', 'zz']:
+        expected = sorted((i for i, w in enumerate(words) if w.startswith(prefix)), key=ranks.__getitem__)
+        assert index.prefix_ids(prefix) == expected[:20], prefix
+        assert index.prefix_ids(prefix, k=5) == expected[:5], prefix
+
+        expected = sorted((i for i, w in enumerate(words) if prefix in w), key=ranks.__getitem__)
+        assert index.contains_ids(prefix) == expected[:20], prefix
+    print("PASS: Prefix and contains lookups match a full scan.")
+
+
+def test_fuzzy_index():
+    print("Testing fuzzy index...")
+    words = _random_words(3000)
+    ranks = list(range(len(words)))
+    index = FuzzyIndex(words, ranks, max_distance=2)
+
+    for query, allowed in [('ab', 0), ('abc', 1), ('hhga', 1), ('b', 0), ('abcdefg', 2)]:
+        assert index.distance_for(query) == allowed
+        found = index.lookup_ids(query, k=len(words))
+        within = {i for i, w in enumerate(words) if edit_distance(query, w, allowed) <= allowed}
+        assert set(found) == within, query
+    assert edit_distance('hello', 'hlelo', 2) == 1
+
+    # Two substitutions, an insert plus a substitution, two inserts
+    index = FuzzyIndex(['hello', 'world'], [0, 1], max_distance=2)
+    for query, expected in [('jelpo', 0), ('helxlp', 0), ('hellooo', 0), ('wrld', 1), ('hlelo', 0)]:
+        assert index.lookup_ids(query) == [expected], query
+    assert FuzzyIndex(['hello'], [0], max_distance=1).lookup_ids('jelpo') == []
+    print("PASS: Fuzzy lookups find every word within the allowed edits.")
+
+
+def test_compiled_round_trip():
+    print("Testing compiled wordlist cache...")
+    words = _random_words(2000)
+    ranks = list(range(len(words)))
+    index = PrefixIndex(words, ranks, top_k=10, leaf_size=16)
+    fuzzy = FuzzyIndex(words, ranks)
+
+    with tempfile.TemporaryDirectory() as d:
+        save_compiled(d, 'key-1', words, ranks, [1.0] * len(words), index, fuzzy)
+        assert load_compiled(d, 'key-2', 10, 2) is None
+        assert load_compiled(d, 'key-1', 20, 2) is None
+
+        compiled = load_compiled(d, 'key-1', 10, 2)
+        packed, index2, fuzzy2 = compiled.words, compiled.index, compiled.fuzzy
+        assert list(packed) == words
+        assert compiled.lengths.tolist() == [len(w) for w in words]
+        assert words[123] in packed and 'zzzz' not in packed
+        for q in ['a', 'bc', 'hag', 'ddd']:
+            assert index2.prefix_ids(q) == index.prefix_ids(q)
+            assert index2.contains_ids(q) == index.contains_ids(q)
+            assert fuzzy2.lookup_ids(q) == fuzzy.lookup_ids(q)
+
+        # Rebuilding under a live mapping leaves the mapped arrays intact
+        other = sorted(_random_words(500, seed=1))
+        save_compiled(d, 'key-2', other, ranks[:len(other)], [1.0] * len(other),
+                      PrefixIndex(other, ranks[:len(other)], top_k=10), FuzzyIndex(other, ranks[:len(other)]))
+        assert list(packed) == words and index2.prefix_ids('a') == index.prefix_ids('a')
+        assert list(load_compiled(d, 'key-2', 10, 2).words) == other
+        assert load_compiled(d, 'key-1', 10, 2) is None
+        assert len([name for name in os.listdir(d) if name.startswith('set-')]) == 1
+    print("PASS: Memory-mapped indexes match the in-memory build.")
+
+
+if __name__ == "__main__":
+    test_prefix_index()
+    test_fuzzy_index()
+    test_compiled_round_trip()
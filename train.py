@@ -1,86 +1,495 @@
+"""Train the main CNN on the preprocessed images.
+
+    python train.py                          # tf.data pipeline over data2/train and data2/test
+    python train.py --data packed            # from the arrays written by preprocessing.py --pack
+    python train.py --batch-size 128         # larger batches
+    python train.py --cache /tmp/bw.cache    # cache decoded images on disk instead of in RAM
+    python train.py --loader legacy          # the old ImageDataGenerator path, for comparison
+    python train.py --multihead              # main and D/R/U models in one training run
+    python train.py --distill --student-size 64   # compact student of model-bw, saved as model-bw_student
+
+Each epoch reports training throughput in samples/sec.
+"""
 # Importing the Keras libraries and packages
-from keras.models import Sequential
+from keras.models import Sequential, Model
 from keras.layers import Convolution2D
 from keras.layers import MaxPooling2D
 from keras.layers import Flatten
 from keras.layers import Dense , Dropout
+from keras.layers import Input, Activation, SeparableConv2D, GlobalAveragePooling2D
+from keras.layers import RandomFlip, RandomZoom
+from keras.callbacks import Callback
 from keras.preprocessing.image import ImageDataGenerator
+import argparse
 import os
+import shutil
+import time
+import numpy as np
+import tensorflow as tf
+from dataset import PackedDataset, list_images
+from backends import load_keras_model
 import config
 
+AUTOTUNE = tf.data.AUTOTUNE
+# Output order of the D/R/U model, as read by SignLanguagePredictor
+DRU_CLASSES = ['D', 'R', 'U']
+
 # os.environ["CUDA_VISIBLE_DEVICES"] = "1" # Optional: Control GPU usage
 
-sz = config.IMG_SIZE
 
 # Step 1 - Building the CNN
+def build_classifier(sz=config.IMG_SIZE, num_classes=27, conv_widths=(32, 32), dense_units=(128, 96, 64)):
+    # Initializing the CNN
+    classifier = Sequential()
+
+    # Convolution layers, each followed by pooling
+    for i, width in enumerate(conv_widths):
+        if i == 0:
+            classifier.add(Convolution2D(width, (3, 3), input_shape=(sz, sz, 1), activation='relu'))
+        else:
+            # input_shape is going to be the pooled feature maps from the previous convolution layer
+            classifier.add(Convolution2D(width, (3, 3), activation='relu'))
+        classifier.add(MaxPooling2D(pool_size=(2, 2)))
+
+    # Flattening the layers
+    classifier.add(Flatten())
+
+    # Adding the fully connected layers, dropout after all but the last
+    for i, units in enumerate(dense_units):
+        classifier.add(Dense(units=units, activation='relu'))
+        if i < len(dense_units) - 1:
+            classifier.add(Dropout(0.40))
+    classifier.add(Dense(units=num_classes, activation='softmax')) # softmax for more than 2
+
+    # Compiling the CNN
+    classifier.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    return classifier
+
+
+def _dense_head(x, num_classes, name):
+    x = Dense(units=128, activation='relu', name=f'{name}_dense1')(x)
+    x = Dropout(0.40)(x)
+    x = Dense(units=96, activation='relu', name=f'{name}_dense2')(x)
+    x = Dropout(0.40)(x)
+    x = Dense(units=64, activation='relu', name=f'{name}_dense3')(x)
+    return Dense(units=num_classes, activation='softmax', name=name)(x)
+
+
+def build_multihead(sz=config.IMG_SIZE, num_classes=27):
+    """(training model, main model, D/R/U model): one conv trunk, a 27-class head and a D/R/U head.
+
+    The training model has outputs 'main' and 'dru'. The other two share its layers and
+    are what gets saved, so they load like separately trained models.
+    """
+    inp = Input(shape=(sz, sz, 1))
+    x = Convolution2D(32, (3, 3), activation='relu', name='conv1')(inp)
+    x = MaxPooling2D(pool_size=(2, 2), name='pool1')(x)
+    x = Convolution2D(32, (3, 3), activation='relu', name='conv2')(x)
+    x = MaxPooling2D(pool_size=(2, 2), name='pool2')(x)
+    x = Flatten(name='flatten')(x)
+    main = _dense_head(x, num_classes, 'main')
+    dru = _dense_head(x, len(DRU_CLASSES), 'dru')
+
+    model = Model(inp, {'main': main, 'dru': dru})
+    # The D/R/U loss only counts D, R and U samples (the others get sample weight 0)
+    model.compile(optimizer='adam',
+                  loss={'main': 'categorical_crossentropy', 'dru': 'categorical_crossentropy'},
+                  metrics={'main': ['accuracy']},
+                  weighted_metrics={'dru': ['accuracy']})
+    return model, Model(inp, main), Model(inp, dru)
+
+
+def build_student(sz=config.IMG_SIZE, num_classes=27, width=32):
+    """Compact main model: depthwise-separable convs and global pooling instead of Flatten + Dense(128).
+
+    The last Dense layer ('logits') is linear with a separate softmax, so distillation can
+    train on the logits.
+    """
+    student = Sequential(name='student')
+    student.add(Convolution2D(width // 2, (3, 3), strides=(2, 2), padding='same', activation='relu',
+                              input_shape=(sz, sz, 1)))
+    student.add(SeparableConv2D(width, (3, 3), padding='same', activation='relu'))
+    student.add(MaxPooling2D(pool_size=(2, 2)))
+    student.add(SeparableConv2D(width * 2, (3, 3), padding='same', activation='relu'))
+    student.add(MaxPooling2D(pool_size=(2, 2)))
+    student.add(SeparableConv2D(width * 2, (3, 3), padding='same', activation='relu'))
+    student.add(GlobalAveragePooling2D())
+    student.add(Dropout(0.2))
+    student.add(Dense(units=num_classes, name='logits'))
+    student.add(Activation('softmax'))
+    return student
+
+
+class Distiller(Model):
+    """Trains a student on the true labels and on the teacher's softened outputs.
+
+    The teacher ends in a softmax, so its temperature-softened targets are
+    softmax(log(p) / T). Batches come at the teacher's input size and are resized for
+    the student.
+    """
+
+    def __init__(self, student, teacher, temperature=4.0, alpha=0.1):
+        super().__init__()
+        self.student = student
+        self.teacher = teacher
+        self.student_logits = Model(student.inputs, student.get_layer('logits').output)
+        self.student_size = student.input_shape[1]
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def _student_input(self, x):
+        if x.shape[1] != self.student_size:
+            x = tf.image.resize(x, (self.student_size, self.student_size))
+        return x
+
+    def call(self, x, training=False):
+        return self.student(self._student_input(x), training=training)
+
+    def train_step(self, data):
+        x, y = data[:2]
+        t = self.temperature
+        soft_targets = tf.nn.softmax(tf.math.log(self.teacher(x, training=False) + 1e-7) / t)
+        with tf.GradientTape() as tape:
+            logits = self.student_logits(self._student_input(x), training=True)
+            hard_loss = tf.keras.losses.categorical_crossentropy(y, logits, from_logits=True)
+            soft_loss = tf.keras.losses.kl_divergence(soft_targets, tf.nn.softmax(logits / t)) * t * t
+            loss = tf.reduce_mean(self.alpha * hard_loss + (1 - self.alpha) * soft_loss)
+        variables = self.student_logits.trainable_variables
+        self.optimizer.apply_gradients(zip(tape.gradient(loss, variables), variables))
+        self.compiled_metrics.update_state(y, tf.nn.softmax(logits))
+        return dict({m.name: m.result() for m in self.metrics}, loss=loss)
+
+    def test_step(self, data):
+        x, y = data[:2]
+        probs = self(x, training=False)
+        self.compiled_metrics.update_state(y, probs)
+        loss = tf.reduce_mean(tf.keras.losses.categorical_crossentropy(y, probs))
+        return dict({m.name: m.result() for m in self.metrics}, loss=loss)
+
+
+def test_accuracy(model, test_set, test_samples, batch_size):
+    """Top-1 accuracy over one pass of a tf.data test set, resizing batches to the model's input."""
+    size = model.input_shape[1]
+    correct = total = 0
+    for x, y in test_set.take(max(1, -(-test_samples // batch_size))):
+        if x.shape[1] != size:
+            x = tf.image.resize(x, (size, size))
+        correct += int(np.sum(np.argmax(model(x, training=False), axis=1) == np.argmax(y, axis=1)))
+        total += len(y)
+    return correct / total if total else 0.0
+
+
+def frame_latency_ms(model, runs=50):
+    """Median single-frame CPU latency of a compiled forward pass, in milliseconds."""
+    size = model.input_shape[1]
+    forward = tf.function(lambda x: model(x, training=False))
+    frame = tf.zeros((1, size, size, 1))
+    for _ in range(3):
+        forward(frame)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        forward(frame).numpy()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def distill(teacher, student, training_set, test_set, train_samples, test_samples,
+            batch_size=config.BATCH_SIZE, epochs=config.EPOCHS, temperature=4.0, alpha=0.1):
+    """Train student from teacher, then print accuracy and per-frame latency of both side by side."""
+    distiller = Distiller(student, teacher, temperature, alpha)
+    distiller.compile(optimizer='adam', metrics=['accuracy'])
+    train(distiller, training_set, test_set, train_samples, test_samples, batch_size, epochs)
+
+    report = []
+    for name, model in [('teacher', teacher), ('student', student)]:
+        report.append((name, model.input_shape[1], model.count_params(),
+                       test_accuracy(model, test_set, test_samples, batch_size), frame_latency_ms(model)))
+    print(f"{'model':<10}{'input':>7}{'params':>10}{'accuracy':>10}{'latency ms':>12}")
+    for name, size, params, accuracy, latency in report:
+        print(f"{name:<10}{size:>7}{params:>10}{accuracy:>10.4f}{latency:>12.2f}")
+    return report
+
+
+# Step 2 - Preparing the train/test data
+def augmenter():
+    return ImageDataGenerator(
+            rescale=1./255,
+            shear_range=0.2,
+            zoom_range=0.2,
+            horizontal_flip=True)
+
+
+def directory_data(sz=config.IMG_SIZE, batch_size=config.BATCH_SIZE):
+    """(training iterator, test iterator, training samples, test samples) from data2/train and data2/test."""
+    train_datagen = augmenter()
+    test_datagen = ImageDataGenerator(rescale=1./255)
+
+    training_set = train_datagen.flow_from_directory(config.TRAIN2_DIR,
+                                                     target_size=(sz, sz),
+                                                     batch_size=batch_size,
+                                                     color_mode='grayscale',
+                                                     class_mode='categorical')
+
+    test_set = test_datagen.flow_from_directory(config.TEST2_DIR,
+                                                target_size=(sz , sz),
+                                                batch_size=batch_size,
+                                                color_mode='grayscale',
+                                                class_mode='categorical')
+    return training_set, test_set, training_set.samples, test_set.samples
+
+
+def packed_batches(dataset, batch_size, augment=False, seed=0):
+    """Endless (float images, one-hot labels) batches read straight from a PackedDataset."""
+    datagen = augmenter() if augment else None
+    eye = np.eye(dataset.num_classes, dtype=np.float32)
+    epoch = 0
+    while True:
+        for images, labels in dataset.batches(batch_size, shuffle=augment, seed=seed + epoch):
+            x = images.astype(np.float32)[..., None]
+            x *= 1.0 / 255
+            if datagen is not None:
+                for i in range(len(x)):
+                    x[i] = datagen.random_transform(x[i])
+            yield x, eye[labels]
+        epoch += 1
+
+
+def packed_data(batch_size=config.BATCH_SIZE, packed_dir=config.PACKED_DIR):
+    """Same as directory_data, from the memory-mapped arrays of preprocessing.py --pack."""
+    train = PackedDataset(os.path.join(packed_dir, 'train'))
+    test = PackedDataset(os.path.join(packed_dir, 'test'))
+    if train.img_size != config.IMG_SIZE:
+        raise ValueError(f"{packed_dir} was packed at {train.img_size}px, config.IMG_SIZE is {config.IMG_SIZE}")
+    return (packed_batches(train, batch_size, augment=True), packed_batches(test, batch_size),
+            len(train), len(test))
+
+
+def batch_augmenter(seed=None):
+    """The flip and zoom of augmenter() as batched tensor ops.
+
+    ImageDataGenerator's shear_range is in degrees, so 0.2 is left out.
+    """
+    return Sequential([
+        RandomFlip('horizontal', seed=seed),
+        RandomZoom((-0.2, 0.2), (-0.2, 0.2), fill_mode='nearest', seed=seed),
+    ])
+
+
+def _finish(ds, classes, augment, multihead=False):
+    """uint8 (batch, sz, sz, 1) images + int labels -> scaled, augmented, one-hot, prefetched.
+
+    With multihead the targets are {'main', 'dru'}, plus sample weights that mask the
+    D/R/U head to D, R and U images.
+    """
+    aug = batch_augmenter() if augment else None
+    num_classes = len(classes)
+    if multihead:
+        missing = [c for c in DRU_CLASSES if c not in classes]
+        if missing:
+            raise ValueError(f"--multihead needs class directories for {', '.join(missing)}")
+        dru_index = tf.constant([DRU_CLASSES.index(c) if c in DRU_CLASSES else -1 for c in classes])
+
+    def prepare(images, labels):
+        x = tf.cast(images, tf.float32) * (1. / 255)
+        if aug is not None:
+            x = aug(x, training=True)
+        if not multihead:
+            return x, tf.one_hot(labels, num_classes)
+        dru = tf.gather(dru_index, labels)
+        targets = {'main': tf.one_hot(labels, num_classes), 'dru': tf.one_hot(tf.maximum(dru, 0), len(DRU_CLASSES))}
+        weights = {'main': tf.ones_like(labels, tf.float32), 'dru': tf.cast(dru >= 0, tf.float32)}
+        return x, targets, weights
+
+    return ds.map(prepare, num_parallel_calls=AUTOTUNE).prefetch(AUTOTUNE)
+
+
+def _cache(ds, cache, name):
+    if cache == 'none':
+        return ds
+    if cache == 'memory':
+        return ds.cache()
+    return ds.cache(f"{cache}.{name}")
+
+
+def tfdata_from_directory(split_dir, sz, batch_size, augment, cache='memory', classes=None, name='train',
+                          multihead=False):
+    """(dataset, samples, classes): decode every image once, cache it, then batch and augment."""
+    classes, paths, labels = list_images(split_dir, classes)
+
+    def load(path, label):
+        img = tf.io.decode_image(tf.io.read_file(path), channels=1, expand_animations=False)
+        img = tf.image.resize(img, (sz, sz))
+        return tf.cast(tf.round(img), tf.uint8), label
+
+    ds = tf.data.Dataset.from_tensor_slices((paths, np.asarray(labels, dtype=np.int32)))
+    ds = _cache(ds.map(load, num_parallel_calls=AUTOTUNE), cache, name)
+    if augment:
+        ds = ds.shuffle(min(len(paths), 10000), reshuffle_each_iteration=True)
+    ds = ds.repeat().batch(batch_size)
+    return _finish(ds, classes, augment, multihead), len(paths), classes
+
+
+def tfdata_from_packed(dataset, batch_size, augment, multihead=False, sz=None):
+    """(dataset, samples): batches gathered from the memmap in parallel, never fully loaded.
+
+    sz resizes the batches when training at another size than the data was packed at.
+    """
+    def gather(rows):
+        rows = np.sort(rows)
+        return dataset.images[rows][..., None], dataset.labels[rows]
+
+    def load(rows):
+        images, labels = tf.numpy_function(gather, [rows], (tf.uint8, tf.int32))
+        images.set_shape((None, dataset.img_size, dataset.img_size, 1))
+        labels.set_shape((None,))
+        if sz and sz != dataset.img_size:
+            images = tf.cast(tf.round(tf.image.resize(images, (sz, sz))), tf.uint8)
+        return images, labels
+
+    n = len(dataset)
+    ds = tf.data.Dataset.range(n)
+    if augment:
+        ds = ds.shuffle(n, reshuffle_each_iteration=True)
+    ds = ds.repeat().batch(batch_size).map(load, num_parallel_calls=AUTOTUNE)
+    return _finish(ds, dataset.classes, augment, multihead), n
+
+
+def tfdata_data(source='dirs', sz=config.IMG_SIZE, batch_size=config.BATCH_SIZE, cache='memory',
+                packed_dir=config.PACKED_DIR, multihead=False):
+    """Same as directory_data / packed_data, as tf.data pipelines."""
+    if source == 'packed':
+        train = PackedDataset(os.path.join(packed_dir, 'train'))
+        test = PackedDataset(os.path.join(packed_dir, 'test'))
+        if train.img_size != sz:
+            raise ValueError(f"{packed_dir} was packed at {train.img_size}px, training at {sz}px")
+        training_set, train_samples = tfdata_from_packed(train, batch_size, True, multihead)
+        test_set, test_samples = tfdata_from_packed(test, batch_size, False, multihead)
+        return training_set, test_set, train_samples, test_samples
+    training_set, train_samples, classes = tfdata_from_directory(config.TRAIN2_DIR, sz, batch_size, True, cache,
+                                                                 multihead=multihead)
+    test_set, test_samples, _ = tfdata_from_directory(config.TEST2_DIR, sz, batch_size, False, cache,
+                                                      classes=classes, name='test', multihead=multihead)
+    return training_set, test_set, train_samples, test_samples
+
+
+class SamplesPerSecond(Callback):
+    """Prints (and logs as samples_per_sec) training throughput for every epoch, validation excluded."""
+
+    def __init__(self, batch_size):
+        super().__init__()
+        self.batch_size = batch_size
+        self.rates = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = self._last = time.perf_counter()
+        self._batches = 0
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._batches += 1
+        self._last = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = self._last - self._start
+        rate = self._batches * self.batch_size / elapsed if elapsed > 0 else 0.0
+        self.rates.append(rate)
+        if logs is not None:
+            logs['samples_per_sec'] = rate
+        print(f"Epoch {epoch + 1}: {rate:.1f} samples/sec")
+
+
+# Step 3 - Training the model
+def train(classifier, training_set, test_set, train_samples, test_samples,
+          batch_size=config.BATCH_SIZE, epochs=config.EPOCHS):
+    # Calculate steps per epoch dynamically
+    steps_per_epoch = max(1, train_samples // batch_size)
+    validation_steps = max(1, test_samples // batch_size)
+
+    return classifier.fit(
+            training_set,
+            steps_per_epoch=steps_per_epoch,
+            epochs=epochs,
+            validation_data=test_set,
+            validation_steps=validation_steps,
+            callbacks=[SamplesPerSecond(batch_size)])
+
+
+def save_model(classifier, json_path=config.MODEL_BW_JSON, weights_path=config.MODEL_BW_H5):
+    # Saving the model
+    if not os.path.exists(config.MODEL_DIR):
+        os.makedirs(config.MODEL_DIR)
+
+    model_json = classifier.to_json()
+    with open(json_path, "w") as json_file:
+        json_file.write(model_json)
+    print('Model Saved')
+    classifier.save_weights(weights_path)
+    print('Weights saved')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', choices=['dirs', 'packed'], default='dirs',
+                        help="image directories (default) or the packed arrays")
+    parser.add_argument('--loader', choices=['tfdata', 'legacy'], default='tfdata',
+                        help="tf.data pipeline (default) or ImageDataGenerator")
+    parser.add_argument('--batch-size', type=int, default=config.BATCH_SIZE)
+    parser.add_argument('--epochs', type=int, default=config.EPOCHS)
+    parser.add_argument('--cache', default='memory',
+                        help="tf.data cache of decoded images: 'memory', 'none' or a file path prefix")
+    parser.add_argument('--multihead', action='store_true',
+                        help="train the main and D/R/U models together on a shared trunk and save both")
+    parser.add_argument('--distill', action='store_true',
+                        help="train a compact student of model-bw and save it as model-bw_student")
+    parser.add_argument('--student-size', type=int, default=config.IMG_SIZE, help="student input size")
+    parser.add_argument('--student-width', type=int, default=32)
+    parser.add_argument('--temperature', type=float, default=4.0)
+    parser.add_argument('--alpha', type=float, default=0.1, help="weight of the true-label loss")
+    parser.add_argument('--install', action='store_true',
+                        help="with --distill: back up model-bw as model-bw_teacher and save the student as model-bw")
+    args = parser.parse_args()
+
+    if args.distill:
+        if args.loader != 'tfdata':
+            parser.error("--distill needs the tfdata loader")
+        teacher = load_keras_model(config.MODEL_BW_JSON, config.MODEL_BW_H5)
+        teacher.trainable = False
+        student = build_student(args.student_size, teacher.output_shape[-1], args.student_width)
+        student.summary()
+        data = tfdata_data(args.data, sz=teacher.input_shape[1], batch_size=args.batch_size, cache=args.cache)
+        distill(teacher, student, *data, batch_size=args.batch_size, epochs=args.epochs,
+                temperature=args.temperature, alpha=args.alpha)
+        save_model(student, config.MODEL_BW_STUDENT_JSON, config.MODEL_BW_STUDENT_H5)
+        if args.install:
+            shutil.copyfile(config.MODEL_BW_JSON, config.MODEL_BW_TEACHER_JSON)
+            shutil.copyfile(config.MODEL_BW_H5, config.MODEL_BW_TEACHER_H5)
+            save_model(student)
+            print("Installed the student as model-bw (teacher kept as model-bw_teacher). "
+                  "Re-run numpy_engine.py / export_tflite.py if you use those backends.")
+        return
+
+    if args.multihead:
+        if args.loader != 'tfdata':
+            parser.error("--multihead needs the tfdata loader")
+        model, main_model, dru_model = build_multihead()
+        model.summary()
+        data = tfdata_data(args.data, batch_size=args.batch_size, cache=args.cache, multihead=True)
+        train(model, *data, batch_size=args.batch_size, epochs=args.epochs)
+        save_model(main_model)
+        save_model(dru_model, config.MODEL_BW_DRU_JSON, config.MODEL_BW_DRU_H5)
+        return
+
+    classifier = build_classifier()
+    classifier.summary()
+    if args.loader == 'tfdata':
+        data = tfdata_data(args.data, batch_size=args.batch_size, cache=args.cache)
+    elif args.data == 'packed':
+        data = packed_data(batch_size=args.batch_size)
+    else:
+        data = directory_data(batch_size=args.batch_size)
+    train(classifier, *data, batch_size=args.batch_size, epochs=args.epochs)
+    save_model(classifier)
 
-# Initializing the CNN
-classifier = Sequential()
-
-# First convolution layer and pooling
-classifier.add(Convolution2D(32, (3, 3), input_shape=(sz, sz, 1), activation='relu'))
-classifier.add(MaxPooling2D(pool_size=(2, 2)))
-# Second convolution layer and pooling
-classifier.add(Convolution2D(32, (3, 3), activation='relu'))
-# input_shape is going to be the pooled feature maps from the previous convolution layer
-classifier.add(MaxPooling2D(pool_size=(2, 2)))
-
-# Flattening the layers
-classifier.add(Flatten())
-
-# Adding a fully connected layer
-classifier.add(Dense(units=128, activation='relu'))
-classifier.add(Dropout(0.40))
-classifier.add(Dense(units=96, activation='relu'))
-classifier.add(Dropout(0.40))
-classifier.add(Dense(units=64, activation='relu'))
-classifier.add(Dense(units=27, activation='softmax')) # softmax for more than 2
-
-# Compiling the CNN
-classifier.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy']) 
-
-# Step 2 - Preparing the train/test data and training the model
-classifier.summary()
-
-train_datagen = ImageDataGenerator(
-        rescale=1./255,
-        shear_range=0.2,
-        zoom_range=0.2,
-        horizontal_flip=True)
-
-test_datagen = ImageDataGenerator(rescale=1./255)
-
-training_set = train_datagen.flow_from_directory(config.TRAIN2_DIR,
-                                                 target_size=(sz, sz),
-                                                 batch_size=config.BATCH_SIZE,
-                                                 color_mode='grayscale',
-                                                 class_mode='categorical')
-
-test_set = test_datagen.flow_from_directory(config.TEST2_DIR,
-                                            target_size=(sz , sz),
-                                            batch_size=config.BATCH_SIZE,
-                                            color_mode='grayscale',
-                                            class_mode='categorical') 
-
-# Calculate steps per epoch dynamically
-steps_per_epoch = max(1, training_set.samples // config.BATCH_SIZE)
-validation_steps = max(1, test_set.samples // config.BATCH_SIZE)
-
-classifier.fit(
-        training_set,
-        steps_per_epoch=steps_per_epoch,
-        epochs=config.EPOCHS,
-        validation_data=test_set,
-        validation_steps=validation_steps)
-
-# Saving the model
-if not os.path.exists(config.MODEL_DIR):
-    os.makedirs(config.MODEL_DIR)
-
-model_json = classifier.to_json()
-with open(config.MODEL_BW_JSON, "w") as json_file:
-    json_file.write(model_json)
-print('Model Saved')
-classifier.save_weights(config.MODEL_BW_H5)
-print('Weights saved')
 
+if __name__ == "__main__":
+    main()
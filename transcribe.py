@@ -0,0 +1,219 @@
+"""Transcribe recorded signing offline, without the Tk app or a camera.
+
+    python transcribe.py session.mp4
+    python transcribe.py recordings/*.mp4 --workers 4 --json transcripts.json
+    python transcribe.py frames/ --fps 30        # a directory of camera frames, sorted by name
+    python transcribe.py data/test/A --cropped   # images that are already hand crops
+
+Frames are mirrored and cut to the same ROI as the live app, thresholded, predicted in
+batches and confirmed with process_prediction, on video time. Confirmed letters are printed with their
+timestamps; a run of blank frames of at least --word-gap seconds ends a word.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import cv2
+import config
+from image_processing import roi_box, threshold_roi
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+_worker_predictor = None
+_worker_error = None
+
+
+def iter_frames(path, fps=30.0):
+    """(timestamp in seconds, BGR frame) for a video file or a directory of images."""
+    if os.path.isdir(path):
+        names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for i, name in enumerate(names):
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                yield i / fps, frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    i = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                return
+            yield i / video_fps, frame
+            i += 1
+    finally:
+        cap.release()
+
+
+def prepare_frame(frame, cropped=False, mirror=True):
+    """The thresholded image video_loop would hand to the predictor for this frame."""
+    if not cropped:
+        if mirror:
+            frame = cv2.flip(frame, 1)
+        x1, y1, x2, y2 = roi_box(frame.shape)
+        frame = frame[y1:y2, x1:x2]
+    return threshold_roi(frame)
+
+
+def transcribe(path, predictor, batch_size=64, fps=30.0, cropped=False, mirror=True, word_gap=1.0):
+    """Letters, words and throughput for one recording."""
+    predictor.reset_state()
+    letters = []
+    words = []
+    word, word_start = "", None
+    blank_since = None
+    frames = 0
+    inference_time = 0.0
+    start = time.perf_counter()
+
+    def flush(batch):
+        nonlocal word, word_start, blank_since, inference_time
+        t0 = time.perf_counter()
+        with_proba = getattr(predictor, 'aggregator', None) is not None
+        predictions = predictor.predict_batch([image for _, image in batch], with_proba)
+        inference_time += time.perf_counter() - t0
+        for (timestamp, _), prediction in zip(batch, predictions):
+            symbol = prediction[0]
+            if symbol == 'blank':
+                if blank_since is None:
+                    blank_since = timestamp
+            else:
+                if blank_since is not None and timestamp - blank_since >= word_gap and word:
+                    words.append((word_start, word))
+                    word, word_start = "", None
+                blank_since = None
+            if with_proba:
+                # Video time, so the hold a letter needs does not depend on --fps or on speed
+                confirmed_char = predictor.process_prediction(symbol, prediction[2], timestamp)
+            else:
+                confirmed_char = predictor.process_prediction(symbol)
+            if confirmed_char:
+                letters.append((timestamp, confirmed_char))
+                if not word:
+                    word_start = timestamp
+                word += confirmed_char
+
+    batch = []
+    for timestamp, frame in iter_frames(path, fps):
+        batch.append((timestamp, prepare_frame(frame, cropped, mirror)))
+        frames += 1
+        if len(batch) == batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    if word:
+        words.append((word_start, word))
+
+    elapsed = time.perf_counter() - start
+    return {
+        'path': path,
+        'frames': frames,
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'inference_fps': frames / inference_time if inference_time > 0 else 0.0,
+        'letters': letters,
+        'words': words,
+        'text': " ".join(w for _, w in words),
+    }
+
+
+def _format_time(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes):02d}:{seconds:06.3f}"
+
+
+def print_transcript(result):
+    print(f"\n== {result['path']}")
+    for timestamp, letter in result['letters']:
+        print(f"  {_format_time(timestamp)}  {letter}")
+    for timestamp, word in result['words']:
+        print(f"  {_format_time(timestamp)}  [{word}]")
+    print(f"  text: {result['text']}")
+    print(f"  {result['frames']} frames in {result['seconds']:.2f}s: {result['fps']:.1f} fps "
+          f"(inference alone {result['inference_fps']:.1f} fps)")
+
+
+def _init_worker(backend, num_threads):
+    # A pool whose initializer raises keeps respawning workers, so remember the error instead
+    global _worker_predictor, _worker_error
+    try:
+        from app import SignLanguagePredictor
+        _worker_predictor = SignLanguagePredictor(backend=backend, num_threads=num_threads)
+    except Exception as e:
+        _worker_error = e
+
+
+def _transcribe_in_worker(job):
+    path, options = job
+    if _worker_error is not None:
+        return {'path': path, 'error': f"predictor failed to load: {_worker_error}"}
+    try:
+        return transcribe(path, _worker_predictor, **options)
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help="video files and/or image directories")
+    parser.add_argument('--backend', default=config.PREDICTOR_BACKEND,
+                        choices=['keras', 'numpy', 'tflite', 'tflite_int8'])
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--fps', type=float, default=30.0,
+                        help="frame rate of image directories (and of videos that do not report one)")
+    parser.add_argument('--cropped', action='store_true', help="images are already hand crops: no mirroring or ROI cut")
+    parser.add_argument('--no-mirror', action='store_true', help="frames are already mirrored like the live view")
+    parser.add_argument('--word-gap', type=float, default=1.0, help="seconds of blank frames that end a word")
+    parser.add_argument('--workers', type=int, default=1, help="processes to shard the inputs across")
+    parser.add_argument('--json', help="also write all transcripts to this file")
+    args = parser.parse_args()
+
+    options = dict(batch_size=args.batch_size, fps=args.fps, cropped=args.cropped,
+                   mirror=not args.no_mirror, word_gap=args.word_gap)
+    workers = max(1, min(args.workers, len(args.inputs)))
+    # Split the cores between the processes instead of oversubscribing them
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(args.backend, num_threads)
+        results = []
+        for path in args.inputs:
+            result = _transcribe_in_worker((path, options))
+            results.append(result)
+            if 'error' not in result:
+                print_transcript(result)
+    else:
+        # spawn: TensorFlow does not survive being forked
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(args.backend, num_threads)) as pool:
+            results = []
+            for result in pool.imap(_transcribe_in_worker, [(path, options) for path in args.inputs]):
+                results.append(result)
+                if 'error' not in result:
+                    print_transcript(result)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if 'error' in r]
+    for r in failed:
+        print(f"Error: failed to transcribe {r['path']}: {r['error']}")
+    total_frames = sum(r['frames'] for r in results if 'error' not in r)
+    print(f"\nTotal: {total_frames} frames from {len(results) - len(failed)} input(s) in {elapsed:.2f}s "
+          f"({total_frames / elapsed if elapsed > 0 else 0.0:.1f} fps, {workers} worker(s))")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved {args.json}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+import bisect
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from collections import namedtuple
+import numpy as np
+
+# Sorts after any real character, so prefix + _MAX_CHAR bounds every word starting with prefix
+_MAX_CHAR = chr(0x10FFFF)
+
+# Bump when the on-disk layout or the way ranks are derived changes
+COMPILED_FORMAT = 4
+
+CompiledWordlist = namedtuple('CompiledWordlist', 'words ranks freqs lengths index fuzzy')
+
+
+class PackedWords:
+    """Read-only sorted sequence of strings stored as one UTF-8 blob plus an offsets array."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_words(cls, words):
+        encoded = [w.encode('utf-8') for w in words]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __contains__(self, word):
+        i = bisect.bisect_left(self, word)
+        return i < len(self) and self[i] == word
+
+
+def _pack_postings(postings):
+    """dict key -> list of ids  =>  (sorted keys, pointer array, concatenated ids)."""
+    keys = sorted(postings)
+    ptr = np.zeros(len(keys) + 1, dtype=np.int64)
+    np.cumsum([len(postings[key]) for key in keys], out=ptr[1:])
+    ids = np.fromiter((i for key in keys for i in postings[key]), dtype=np.int32, count=int(ptr[-1]))
+    return PackedWords.from_words(keys), ptr, ids
+
+
+def _find_postings(keys, ptr, ids, key):
+    j = bisect.bisect_left(keys, key)
+    if j < len(keys) and keys[j] == key:
+        return ids[ptr[j]:ptr[j + 1]]
+    return None
+
+
+class PrefixIndex:
+    """Prefix / substring lookups over a sorted wordlist.
+
+    words must be sorted; ranks[i] is the frequency rank of words[i] (lower = more common).
+    Every prefix whose match range is larger than leaf_size keeps its top_k word ids
+    precomputed, smaller ranges are ranked on the fly. Everything lives in flat arrays so
+    a built index can be saved and memory-mapped back (see arrays / save_compiled).
+    """
+
+    def __init__(self, words, ranks, top_k=50, leaf_size=256, gram_size=2, arrays=None):
+        self.words = words
+        self.ranks = np.asarray(ranks, dtype=np.int32)
+        self.top_k = top_k
+        self.leaf_size = leaf_size
+        self.gram_size = gram_size
+
+        if arrays is None:
+            arrays = self._build()
+        self.node_keys = PackedWords(arrays['node_blob'], arrays['node_offsets'])
+        self.node_ptr = arrays['node_ptr']
+        self.node_ids = arrays['node_ids']
+        self.gram_keys = PackedWords(arrays['gram_blob'], arrays['gram_offsets'])
+        self.gram_ptr = arrays['gram_ptr']
+        self.gram_ids = arrays['gram_ids']
+        self.by_rank = arrays['by_rank']
+
+    def arrays(self):
+        return {
+            'node_blob': self.node_keys.blob, 'node_offsets': self.node_keys.offsets,
+            'node_ptr': self.node_ptr, 'node_ids': self.node_ids,
+            'gram_blob': self.gram_keys.blob, 'gram_offsets': self.gram_keys.offsets,
+            'gram_ptr': self.gram_ptr, 'gram_ids': self.gram_ids,
+            'by_rank': self.by_rank,
+        }
+
+    def _build(self):
+        nodes = {}
+        if len(self.words):
+            self._build_nodes('', 0, len(self.words), nodes)
+        by_rank = np.argsort(self.ranks, kind='stable').astype(np.int32)
+
+        # Posting lists are filled in rank order, so scanning one stops at the most common hits
+        grams = {}
+        n = self.gram_size
+        for i in by_rank.tolist():
+            w = self.words[i]
+            for g in {w[j:j + n] for j in range(len(w) - n + 1)}:
+                posting = grams.get(g)
+                if posting is None:
+                    posting = grams[g] = []
+                posting.append(i)
+
+        arrays = {'by_rank': by_rank}
+        keys, arrays['node_ptr'], arrays['node_ids'] = _pack_postings(nodes)
+        arrays['node_blob'], arrays['node_offsets'] = keys.blob, keys.offsets
+        keys, arrays['gram_ptr'], arrays['gram_ids'] = _pack_postings(grams)
+        arrays['gram_blob'], arrays['gram_offsets'] = keys.blob, keys.offsets
+        return arrays
+
+    def _top(self, ids, k):
+        ids = np.asarray(ids, dtype=np.int64)
+        r = self.ranks[ids]
+        if len(ids) > k:
+            keep = np.argpartition(r, k)[:k]
+            ids, r = ids[keep], r[keep]
+        return ids[np.argsort(r, kind='stable')].tolist()
+
+    def _build_nodes(self, prefix, lo, hi, nodes):
+        if hi - lo <= self.leaf_size:
+            return self._top(np.arange(lo, hi), self.top_k)
+
+        depth = len(prefix)
+        ids = []
+        i = lo
+        if self.words[i] == prefix:
+            ids.append(i)
+            i += 1
+        while i < hi:
+            child = self.words[i][:depth + 1]
+            j = bisect.bisect_left(self.words, child + _MAX_CHAR, i, hi)
+            ids.extend(self._build_nodes(child, i, j, nodes))
+            i = j
+
+        top = self._top(ids, self.top_k)
+        nodes[prefix] = top
+        return top
+
+    def prefix_range(self, prefix):
+        lo = bisect.bisect_left(self.words, prefix)
+        hi = bisect.bisect_left(self.words, prefix + _MAX_CHAR, lo)
+        return lo, hi
+
+    def prefix_ids(self, prefix, k=None):
+        """Ids of the k most frequent words starting with prefix."""
+        k = self.top_k if k is None else k
+        top = _find_postings(self.node_keys, self.node_ptr, self.node_ids, prefix)
+        if top is not None and k <= self.top_k:
+            return top[:k].tolist()
+        lo, hi = self.prefix_range(prefix)
+        return self._top(np.arange(lo, hi), k)
+
+    def contains_ids(self, fragment, k=None, exclude=()):
+        """Ids of the k most frequent words containing fragment, skipping ids in exclude."""
+        k = self.top_k if k is None else k
+        if len(fragment) < self.gram_size:
+            postings = self.by_rank
+        else:
+            # Only words holding every gram of fragment can contain it
+            n = self.gram_size
+            postings = None
+            for g in {fragment[j:j + n] for j in range(len(fragment) - n + 1)}:
+                p = _find_postings(self.gram_keys, self.gram_ptr, self.gram_ids, g)
+                if p is None:
+                    return []
+                postings = p if postings is None else np.intersect1d(postings, p, assume_unique=True)
+            postings = postings[np.argsort(self.ranks[postings], kind='stable')]
+
+        out = []
+        for start in range(0, len(postings), 256):
+            for i in postings[start:start + 256].tolist():
+                if i in exclude or fragment not in self.words[i]:
+                    continue
+                out.append(i)
+                if len(out) >= k:
+                    return out
+        return out
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal-string-alignment distance, or max_distance + 1 once it is known to be larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _deletes(word, depth):
+    """word and every string left after deleting up to depth of its characters."""
+    out = {word}
+    level = {word}
+    for _ in range(depth):
+        level = {w[:j] + w[j + 1:] for w in level for j in range(len(w))}
+        out |= level
+    return out
+
+
+def _shared_delete_distance(a, b, max_distance):
+    """Edit distance of a fuzzy candidate, or max_distance + 1 once it is known to be larger.
+
+    One substitution, transposition or insertion is recognized without the DP.
+    """
+    if a == b:
+        return 0
+    if len(a) == len(b):
+        diff = [j for j in range(len(a)) if a[j] != b[j]]
+        if len(diff) == 1:
+            return 1
+        if len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]:
+            return 1
+    elif abs(len(a) - len(b)) == 1:
+        short, long = (a, b) if len(a) < len(b) else (b, a)
+        j = 0
+        while j < len(short) and short[j] == long[j]:
+            j += 1
+        if short[j:] == long[j + 1:]:
+            return 1
+    return edit_distance(a, b, max_distance)
+
+
+def _hash(s):
+    # Stable across processes (unlike hash()), so the arrays can be cached on disk
+    b = s.encode('utf-8')
+    return (zlib.crc32(b) << 32) | zlib.adler32(b)
+
+
+class FuzzyIndex:
+    """Symmetric-delete lookup of words close to a query.
+
+    Every word is stored under itself and every string left after up to max_distance deletes
+    (as 64-bit checksum keys in sorted arrays). A query looks up its own deletes the same way,
+    so every word within max_distance edits shares a key with it; candidates that only share a
+    key but are further away are dropped.
+    """
+
+    def __init__(self, words, ranks, max_distance=2, arrays=None):
+        self.words = words
+        self.ranks = np.asarray(ranks, dtype=np.int32)
+        self.max_distance = max_distance
+
+        if arrays is not None:
+            self.keys = arrays['fuzzy_keys']
+            self.ids = arrays['fuzzy_ids']
+            return
+
+        keys = []
+        ids = []
+        for i in range(len(words)):
+            for d in _deletes(words[i], max_distance):
+                keys.append(_hash(d))
+                ids.append(i)
+        keys = np.asarray(keys, dtype=np.uint64)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.ids = np.asarray(ids, dtype=np.int32)[order]
+
+    def arrays(self):
+        return {'fuzzy_keys': self.keys, 'fuzzy_ids': self.ids}
+
+    def distance_for(self, query):
+        """Edits allowed for query: none up to 2 letters, one up to 4, then max_distance.
+
+        Two edits of a 1-2 letter query reach every short word, so they would only add noise.
+        """
+        return min(self.max_distance, (len(query) - 1) // 2)
+
+    def lookup_ids(self, query, k=50):
+        """Ids of up to k words within distance_for(query) of query, closest and most frequent first."""
+        return [i for i, _ in self.lookup(query, k)]
+
+    def lookup(self, query, k=50):
+        """Like lookup_ids, but returns (id, edit distance) pairs."""
+        max_distance = self.distance_for(query)
+        if not len(self.keys) or max_distance < 0:
+            return []
+        hashes = np.fromiter((_hash(d) for d in _deletes(query, max_distance)), dtype=np.uint64)
+        lo = np.searchsorted(self.keys, hashes, side='left')
+        hi = np.searchsorted(self.keys, hashes, side='right')
+        found = set()
+        for a, b in zip(lo, hi):
+            found.update(self.ids[a:b].tolist())
+
+        scored = []
+        for i in found:
+            d = _shared_delete_distance(query, self.words[i], max_distance)
+            if d <= max_distance:
+                scored.append((d, int(self.ranks[i]), i))
+        scored.sort()
+        return [(i, d) for d, _, i in scored[:k]]
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def words_digest(words):
+    return hashlib.sha1('\n'.join(words).encode('utf-8')).hexdigest()
+
+
+def _compiled_meta(key, top_k, max_distance):
+    return {'format': COMPILED_FORMAT, 'key': key, 'top_k': top_k, 'max_distance': max_distance}
+
+
+def save_compiled(directory, key, words, ranks, freqs, prefix_index, fuzzy_index):
+    """Write the wordlist, its frequencies and both indexes as .npy files.
+
+    Each build goes into a new subdirectory, and meta.json is replaced last to point at it.
+    Files another engine has memory-mapped are never rewritten, only unlinked once superseded.
+    """
+    os.makedirs(directory, exist_ok=True)
+    target = tempfile.mkdtemp(prefix='set-', dir=directory)
+
+    packed = words if isinstance(words, PackedWords) else PackedWords.from_words(words)
+    arrays = {
+        'word_blob': packed.blob,
+        'word_offsets': packed.offsets,
+        'lengths': np.fromiter((len(w) for w in words), dtype=np.int32, count=len(words)),
+        'ranks': np.asarray(ranks, dtype=np.int32),
+        'freqs': np.asarray(freqs, dtype=np.float32),
+    }
+    arrays.update(prefix_index.arrays())
+    arrays.update(fuzzy_index.arrays())
+    for name, arr in arrays.items():
+        np.save(os.path.join(target, name + '.npy'), arr)
+
+    meta = dict(_compiled_meta(key, prefix_index.top_k, fuzzy_index.max_distance), arrays=os.path.basename(target))
+    meta_path = os.path.join(directory, 'meta.json')
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+    # Older sets; mapped files stay readable after unlinking (or are left for next time on Windows)
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith('set-') and path != target:
+            shutil.rmtree(path, ignore_errors=True)
+        elif name.endswith('.npy'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def load_compiled(directory, key, top_k, max_distance):
+    """Memory-map a compiled wordlist. Returns a CompiledWordlist, or None when missing or stale."""
+    meta_path = os.path.join(directory, 'meta.json')
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    target = meta.pop('arrays', None) if isinstance(meta, dict) else None
+    if target is None or meta != _compiled_meta(key, top_k, max_distance):
+        return None
+    directory = os.path.join(directory, target)
+
+    try:
+        arrays = {}
+        for name in os.listdir(directory):
+            if name.endswith('.npy'):
+                arrays[name[:-4]] = np.load(os.path.join(directory, name), mmap_mode='r').view(np.ndarray)
+        words = PackedWords(arrays['word_blob'], arrays['word_offsets'])
+        ranks = arrays['ranks']
+        return CompiledWordlist(
+            words=words,
+            ranks=ranks,
+            freqs=arrays['freqs'],
+            lengths=arrays['lengths'],
+            index=PrefixIndex(words, ranks, top_k=top_k, arrays=arrays),
+            fuzzy=FuzzyIndex(words, ranks, max_distance=max_distance, arrays=arrays),
+        )
+    except (OSError, ValueError, KeyError):
+        return None